@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+TOO_LARGE_DETAIL = "Request body exceeds the upload limit."
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies over a per-path limit with ``413``.
+
+    A declared ``Content-Length`` over the limit is refused before anything
+    is read. Bodies without one (chunked transfer encoding) are counted as
+    they arrive, and reading stops with ``413`` as soon as the limit is
+    passed, before Starlette spools the rest of a multipart upload to disk.
+    """
+
+    def __init__(self, app: ASGIApp, limit_for: Callable[[str], int | None]) -> None:
+        self.app = app
+        self.limit_for = limit_for
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limit_for(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        declared = Headers(scope=scope).get("content-length")
+        if declared and declared.isdigit() and int(declared) > limit:
+            response = JSONResponse(status_code=413, content={"detail": TOO_LARGE_DETAIL})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Re-raised by FastAPI's body parsing and answered by its
+                    # exception handler
+                    raise HTTPException(status_code=413, detail=TOO_LARGE_DETAIL)
+            return message
+
+        await self.app(scope, limited_receive, send)
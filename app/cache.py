@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field, fields, is_dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from urllib.parse import unquote, urlparse
+
+CACHE_BACKENDS = ("memory", "sqlite", "redis")
+
+EVICTION_POLICIES = ("lru", "fifo")
+
+DEFAULT_CACHE_ENTRIES = 4096
+
+# Budget of the in-process store, shared by all namespaces of one worker
+DEFAULT_CACHE_MEMORY_MB = 256
+
+MiB = 1024 * 1024
+
+# Rough per-object overhead added to the payload when sizing cached values
+OBJECT_OVERHEAD_BYTES = 64
+
+DEFAULT_CACHE_PATH = Path("data") / "cache.sqlite3"
+
+DEFAULT_NAMESPACE = "uipath-md"
+
+# Trimming the SQLite table to max_entries is batched over this many writes
+SQLITE_EVICT_EVERY = 32
+
+REDIS_TIMEOUT_SECONDS = 1.0
+
+
+class CacheBackend(ABC):
+    """
+    Key/value storage behind the result caches.
+
+    Shared backends (``serializes = True``) only store bytes, so values are
+    encoded by the namespace on the way in. Backends never raise on lookup
+    failures: an unreachable store behaves like an empty one.
+    """
+
+    name = "base"
+    serializes = True
+
+    @abstractmethod
+    def get(self, key: str) -> Any | None:
+        """Return the stored value, or None when missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store a value, expiring it after ``ttl`` seconds when given."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored entries."""
+
+
+def approximate_size(value: Any) -> int:
+    """Estimate the memory held by a cached value from its strings and bytes."""
+    if isinstance(value, (str, bytes, bytearray)):
+        return OBJECT_OVERHEAD_BYTES + len(value)
+    if isinstance(value, dict):
+        items = [item for pair in value.items() for item in pair]
+    elif isinstance(value, (list, tuple)):
+        items = value
+    elif is_dataclass(value):
+        items = [getattr(value, f.name) for f in fields(value)]
+    else:
+        return OBJECT_OVERHEAD_BYTES
+    return OBJECT_OVERHEAD_BYTES + sum(approximate_size(item) for item in items)
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process store holding live objects, bounded by entry count and size.
+
+    Sizes are estimated with ``approximate_size``; a value larger than the
+    whole budget is not stored.
+    """
+
+    name = "memory"
+    serializes = False
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_ENTRIES,
+        eviction: str = "lru",
+        max_bytes: int = DEFAULT_CACHE_MEMORY_MB * MiB,
+    ) -> None:
+        self.max_entries = max(max_entries, 0)
+        self.max_bytes = max(max_bytes, 0)
+        self.refresh_on_read = eviction == "lru"
+        self.size_bytes = 0
+        self._entries: OrderedDict[str, Tuple[Any, float | None, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self.size_bytes -= size
+                return None
+            if self.refresh_on_read:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        if not self.max_entries:
+            return
+        size = approximate_size(value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= previous[2]
+            self._entries[key] = (value, expires_at, size)
+            self.size_bytes += size
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.size_bytes -= evicted
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (accessed_at);
+"""
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Store shared by every worker process on one host through a SQLite file.
+
+    Entries are trimmed to ``max_entries`` by access time (``lru``) or
+    insertion time (``fifo``, which also spares a write on every hit).
+    """
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        db_path: Path | str = DEFAULT_CACHE_PATH,
+        max_entries: int = DEFAULT_CACHE_ENTRIES,
+        eviction: str = "lru",
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(max_entries, 0)
+        self.refresh_on_read = eviction == "lru"
+        self._writes = 0
+        with self._connect() as conn:
+            conn.executescript(SQLITE_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection and commit on success."""
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+
+    def get(self, key: str) -> bytes | None:
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] is not None and row[1] <= now:
+                    conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                    return None
+                if self.refresh_on_read:
+                    conn.execute(
+                        "UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+        except sqlite3.Error:
+            return None
+        return bytes(row[0])
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        if not self.max_entries:
+            return
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?)",
+                    (key, value, now + ttl if ttl else None, now),
+                )
+                self._writes += 1
+                if self._writes % SQLITE_EVICT_EVERY == 0:
+                    self._evict(conn, now)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then the oldest beyond ``max_entries``."""
+        conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            "SELECT key FROM cache_entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+
+class RedisError(Exception):
+    """Raised for error replies and malformed data from a Redis server."""
+
+
+class RedisBackend(CacheBackend):
+    """
+    Store shared across hosts through any server speaking the Redis protocol.
+
+    A minimal RESP client over a plain socket (one connection per thread)
+    covers the handful of commands needed, so no client library is required.
+    Expiry uses ``PX``; eviction beyond that is left to the server's
+    ``maxmemory-policy``.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, timeout: float = REDIS_TIMEOUT_SECONDS) -> None:
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported cache URL: {url}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.strip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> Tuple[socket.socket, Any]:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), self.timeout)
+            conn = (sock, sock.makefile("rb"))
+            self._local.conn = conn
+            if self.password:
+                self._call("AUTH", self.password)
+            if self.db:
+                self._call("SELECT", str(self.db))
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+
+    def _call(self, *args: str | bytes) -> Any:
+        """Send one command and return its decoded reply."""
+        sock, reader = self._connection()
+        parts: List[bytes] = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg.encode("utf-8") if isinstance(arg, str) else arg
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        sock.sendall(b"".join(parts))
+        return self._read_reply(reader)
+
+    def _read_reply(self, reader: Any) -> Any:
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise RedisError("Connection closed")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode("utf-8")
+        if prefix == b"-":
+            raise RedisError(payload.decode("utf-8"))
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            count = int(payload)
+            return None if count < 0 else [self._read_reply(reader) for _ in range(count)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def _safe_call(self, *args: str | bytes) -> Any:
+        """Run a command, treating connection and protocol errors as a miss."""
+        try:
+            return self._call(*args)
+        except (OSError, RedisError, ValueError):
+            self._drop_connection()
+            return None
+
+    def get(self, key: str) -> bytes | None:
+        return self._safe_call("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        if ttl:
+            self._safe_call("SET", key, value, "PX", str(int(ttl * 1000)))
+        else:
+            self._safe_call("SET", key, value)
+
+    def __len__(self) -> int:
+        return self._safe_call("DBSIZE") or 0
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    """Which cache backend to use and how entries are named and evicted."""
+
+    backend: str = "memory"
+    namespace: str = DEFAULT_NAMESPACE
+    max_entries: int = DEFAULT_CACHE_ENTRIES
+    max_memory_mb: int = DEFAULT_CACHE_MEMORY_MB
+    eviction: str = "lru"
+    path: str = str(DEFAULT_CACHE_PATH)
+    url: str = "redis://localhost:6379/0"
+    ttl: Dict[str, float] = field(default_factory=dict)
+
+    def ttl_for(self, namespace: str) -> float | None:
+        return self.ttl.get(namespace, self.ttl.get("*"))
+
+
+def create_backend(config: CacheConfig) -> CacheBackend:
+    """Instantiate the backend selected by a cache config."""
+    if config.backend == "sqlite":
+        return SQLiteBackend(config.path, config.max_entries, config.eviction)
+    if config.backend == "redis":
+        return RedisBackend(config.url)
+    return MemoryBackend(config.max_entries, config.eviction, config.max_memory_mb * MiB)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class Cache:
+    """
+    One namespace of a backend, e.g. parse results or LLM summaries.
+
+    Keys are prefixed with ``<prefix>:<namespace>:v<version>:`` so several
+    deployments and result kinds can share one store, and entries written
+    by an older parser or schema are never read back. ``encode``/``decode``
+    turn values into bytes for backends that cannot hold live objects; a
+    value that no longer decodes counts as a miss.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        namespace: str,
+        prefix: str = DEFAULT_NAMESPACE,
+        ttl: float | None = None,
+        encode: Callable[[Any], bytes] = _identity,
+        decode: Callable[[bytes], Any] = _identity,
+        version: str = "1",
+    ) -> None:
+        self.backend = backend
+        self.namespace = namespace
+        self.key_prefix = f"{prefix}:{namespace}:v{version}:"
+        self.ttl = ttl
+        self.encode = encode
+        self.decode = decode
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any | None:
+        value = self.backend.get(self.key_prefix + key)
+        if value is not None and self.backend.serializes:
+            try:
+                value = self.decode(value)
+            except (ValueError, TypeError, KeyError):
+                value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        if self.backend.serializes:
+            value = self.encode(value)
+        self.backend.set(self.key_prefix + key, value, self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend.name, "hits": self.hits, "misses": self.misses}
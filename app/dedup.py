@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict
+from functools import lru_cache
+from typing import Any, Dict
+
+from .cache import Cache, CacheBackend, CacheConfig, create_backend
+from .export import RenderedOutput
+from .etag import RESULT_VERSION
+from .parser import PARSE_VERSION, ActivityRecord, WorkflowData
+from .settings import get_settings
+
+
+# Part of every key, so results of an older parser, WorkflowData schema or
+# renderer in a shared store are not served after a deploy
+NAMESPACE_VERSIONS = {"parse": PARSE_VERSION, "llm": "1", "render": RESULT_VERSION}
+
+
+def encode_workflow(workflow: WorkflowData) -> bytes:
+    return json.dumps(asdict(workflow), ensure_ascii=False).encode("utf-8")
+
+
+def decode_workflow(data: bytes) -> WorkflowData:
+    fields = json.loads(data)
+    fields["logic_flow"] = [tuple(step) for step in fields["logic_flow"]]
+    fields["activities"] = [ActivityRecord(**record) for record in fields["activities"]]
+    return WorkflowData(**fields)
+
+
+def encode_text(text: str) -> bytes:
+    return text.encode("utf-8")
+
+
+def decode_text(data: bytes) -> str:
+    return data.decode("utf-8")
+
+
+def encode_render(output: RenderedOutput) -> bytes:
+    header = json.dumps({"media_type": output.media_type, "filename": output.filename})
+    return header.encode("utf-8") + b"\n" + output.body
+
+
+def decode_render(data: bytes) -> RenderedOutput:
+    header, body = data.split(b"\n", 1)
+    return RenderedOutput(body=body, **json.loads(header))
+
+
+class DedupStore:
+    """
+    Content-addressed results shared by every project on the server.
+
+    ``workflows`` maps the SHA-256 of a XAML body to its location-independent
+    parse, ``summaries`` maps a hash of the full LLM request to its answer
+    and ``renders`` maps an analysis ETag to the rendered output. Identical
+    files vendored into many projects (REFramework and similar libraries) are
+    therefore parsed and summarized once. All three namespaces live in one
+    cache backend, which may be shared between worker processes; values
+    returned from the in-process backend are shared and must be treated as
+    read-only.
+    """
+
+    def __init__(
+        self, config: CacheConfig | None = None, backend: CacheBackend | None = None
+    ) -> None:
+        config = config or CacheConfig()
+        self.backend = backend or create_backend(config)
+
+        def namespace(name: str, encode, decode) -> Cache:
+            ttl = config.ttl_for(name)
+            return Cache(
+                self.backend,
+                name,
+                config.namespace,
+                ttl,
+                encode,
+                decode,
+                NAMESPACE_VERSIONS[name],
+            )
+
+        self.workflows = namespace("parse", encode_workflow, decode_workflow)
+        self.summaries = namespace("llm", encode_text, decode_text)
+        self.renders = namespace("render", encode_render, decode_render)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            cache.namespace: cache.stats()
+            for cache in (self.workflows, self.summaries, self.renders)
+        }
+
+
+def summary_key(model: str, system_prompt: str, user_content: str) -> str:
+    """Hash everything that determines a completion into a cache key."""
+    digest = hashlib.sha256()
+    for part in (model, system_prompt, user_content):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_dedup_store() -> DedupStore:
+    """Return the process-wide store configured by ``CACHE_*`` variables."""
+    return DedupStore(get_settings().cache)
@@ -0,0 +1,212 @@
+"""
+Structural diff between two versions of a UiPath project.
+
+Run with ``python -m app.diff OLD NEW`` where each side is a project
+directory or a .zip/.nupkg archive.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+from .cache import Cache
+from .dedup import DedupStore
+from .parser import (
+    DETAIL_PROFILES,
+    DetailOptions,
+    ParserBackend,
+    WorkflowData,
+    parse_project,
+    safe_extract_archive,
+)
+
+DIFF_FORMATS = ("markdown", "json")
+
+
+@dataclass
+class WorkflowChange:
+    """What changed inside one workflow present in both versions."""
+
+    path: str
+    display_name: Tuple[str, str] | None = None
+    invocations_added: List[str] = field(default_factory=list)
+    invocations_removed: List[str] = field(default_factory=list)
+    steps_added: List[str] = field(default_factory=list)
+    steps_removed: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ProjectDiff:
+    """Workflows added, removed and changed between two project versions."""
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[WorkflowChange] = field(default_factory=list)
+    unchanged: int = 0
+
+
+def _multiset_changes(
+    old: Iterable[Hashable], new: Iterable[Hashable]
+) -> Tuple[List[Hashable], List[Hashable]]:
+    """
+    Return ``(added, removed)`` items between two sequences, counting repeats.
+
+    Both lists keep the order of their source sequence. This is a multiset
+    difference, linear in the input sizes, rather than a minimal edit script.
+    """
+    old, new = list(old), list(new)
+    extra_new = Counter(new) - Counter(old)
+    extra_old = Counter(old) - Counter(new)
+    added: List[Hashable] = []
+    for item in new:
+        if extra_new[item]:
+            extra_new[item] -= 1
+            added.append(item)
+    removed: List[Hashable] = []
+    for item in old:
+        if extra_old[item]:
+            extra_old[item] -= 1
+            removed.append(item)
+    return added, removed
+
+
+def diff_workflows(old: WorkflowData, new: WorkflowData) -> WorkflowChange | None:
+    """Compare two versions of a workflow, returning None when nothing changed."""
+    if old.checksum and old.checksum == new.checksum:
+        return None
+    change = WorkflowChange(path=new.path)
+    if old.display_name != new.display_name:
+        change.display_name = (old.display_name, new.display_name)
+    change.invocations_added, change.invocations_removed = _multiset_changes(
+        old.invoked_workflows, new.invoked_workflows
+    )
+    # Steps are compared with their depth, so a step moved into or out of
+    # a branch body counts as removed and added
+    steps_added, steps_removed = _multiset_changes(old.logic_flow, new.logic_flow)
+    change.steps_added = [step for _, step in steps_added]
+    change.steps_removed = [step for _, step in steps_removed]
+    if (
+        change.display_name is None
+        and not change.invocations_added
+        and not change.invocations_removed
+        and not change.steps_added
+        and not change.steps_removed
+    ):
+        return None
+    return change
+
+
+def diff_projects(
+    old: Dict[str, WorkflowData], new: Dict[str, WorkflowData]
+) -> ProjectDiff:
+    """Compare two parsed projects workflow by workflow."""
+    result = ProjectDiff(
+        added=sorted(path for path in new if path not in old),
+        removed=sorted(path for path in old if path not in new),
+    )
+    for path in sorted(old.keys() & new.keys()):
+        change = diff_workflows(old[path], new[path])
+        if change is None:
+            result.unchanged += 1
+        else:
+            result.changed.append(change)
+    return result
+
+
+def render_diff_json(diff: ProjectDiff) -> str:
+    """Render a diff as a JSON document."""
+    return json.dumps(asdict(diff), ensure_ascii=False, indent=2) + "\n"
+
+
+def _code_list(items: List[str]) -> str:
+    return ", ".join(f"`{item}`" for item in items)
+
+
+def render_diff_markdown(diff: ProjectDiff) -> str:
+    """Render a diff as a compact Markdown change report."""
+    lines: List[str] = [
+        "# UiPath Project Diff",
+        "",
+        f"- Added workflows: {len(diff.added)}",
+        f"- Removed workflows: {len(diff.removed)}",
+        f"- Changed workflows: {len(diff.changed)}",
+        f"- Unchanged workflows: {diff.unchanged}",
+    ]
+    for title, paths in (("Added", diff.added), ("Removed", diff.removed)):
+        if paths:
+            lines.extend(["", f"## {title}", ""])
+            lines.extend(f"- `{path}`" for path in paths)
+    if diff.changed:
+        lines.extend(["", "## Changed"])
+    for change in diff.changed:
+        lines.extend(["", f"### `{change.path}`", ""])
+        if change.display_name:
+            old_name, new_name = change.display_name
+            lines.append(f"- Renamed: {old_name} → {new_name}")
+        if change.invocations_added:
+            lines.append(f"- Invokes added: {_code_list(change.invocations_added)}")
+        if change.invocations_removed:
+            lines.append(f"- Invokes removed: {_code_list(change.invocations_removed)}")
+        if change.steps_added or change.steps_removed:
+            lines.append("- Logic flow:")
+            lines.append("")
+            lines.append("```diff")
+            lines.extend(f"- {step}" for step in change.steps_removed)
+            lines.extend(f"+ {step}" for step in change.steps_added)
+            lines.append("```")
+    return "\n".join(lines) + "\n"
+
+
+def render_diff(diff: ProjectDiff, fmt: str) -> str:
+    """Render a diff in one of ``DIFF_FORMATS``."""
+    if fmt not in DIFF_FORMATS:
+        raise ValueError(f"Unknown diff format: {fmt}")
+    return render_diff_json(diff) if fmt == "json" else render_diff_markdown(diff)
+
+
+def load_project(
+    source: Path,
+    workdir: Path,
+    backend: ParserBackend | str | None = None,
+    cache: Cache | None = None,
+    detail: DetailOptions | None = None,
+) -> Dict[str, WorkflowData]:
+    """Parse a project directory, or an archive extracted into ``workdir``."""
+    if source.is_dir():
+        return parse_project(source, backend, cache, detail)
+    extract_dir = safe_extract_archive(source, workdir / source.stem)
+    return parse_project(extract_dir, backend, cache, detail)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("old", type=Path, help="previous project directory or archive")
+    parser.add_argument("new", type=Path, help="new project directory or archive")
+    parser.add_argument("--format", choices=DIFF_FORMATS, default="markdown")
+    parser.add_argument("--detail", choices=sorted(DETAIL_PROFILES), default="full")
+    parser.add_argument("--parser-backend", default=None)
+    args = parser.parse_args(argv)
+
+    # Shared by both sides, so files identical in both versions parse once
+    store = DedupStore()
+    detail = DETAIL_PROFILES[args.detail]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        projects: List[Dict[str, WorkflowData]] = []
+        for index, source in enumerate((args.old, args.new)):
+            workdir = Path(tmpdir) / str(index)
+            projects.append(
+                load_project(source, workdir, args.parser_backend, store.workflows, detail)
+            )
+    sys.stdout.write(render_diff(diff_projects(*projects), args.format))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Iterable, Tuple
+
+# Bump when parsing or rendering changes so clients stop reusing old results
+RESULT_VERSION = "3"
+
+# Config keys that never change the rendered result
+ETAG_IGNORED_KEYS = {"api_key"}
+
+
+def content_checksum(data: bytes | str) -> str:
+    """Return the SHA-256 hex digest of file content."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def compute_etag(checksums: Iterable[Tuple[str, str]], cfg: dict) -> str:
+    """
+    Derive a deterministic strong ETag for an analysis result.
+
+    The tag covers the ``(path, checksum)`` pairs of the inputs in sorted
+    order and the effective config (minus secrets), so the same project
+    analyzed the same way always maps to the same tag.
+    """
+    digest = hashlib.sha256(RESULT_VERSION.encode())
+    for path, checksum in sorted(checksums):
+        digest.update(f"{path}\0{checksum}\n".encode("utf-8"))
+    relevant: dict[str, Any] = {
+        key: value for key, value in cfg.items() if key not in ETAG_IGNORED_KEYS
+    }
+    digest.update(json.dumps(relevant, sort_keys=True, default=str).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Return True when an ``If-None-Match`` header matches (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == wanted
+        for candidate in if_none_match.split(",")
+    )
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import html
+import json
+from dataclasses import asdict, dataclass
+from functools import cached_property
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from .markdown_gen import build_markdown, build_sequence_markdown
+from .parser import WorkflowData
+
+DEFAULT_FORMAT = "list"
+
+
+@dataclass
+class ExportContext:
+    """
+    Everything the exporters derive from one parse, computed once.
+
+    Roots, reverse invocations, per-workflow records and the invocation tree
+    are built lazily and shared, so producing several formats in one request
+    does not repeat the work for each of them.
+    """
+
+    workflows: Dict[str, WorkflowData]
+    llm_descriptions: Dict[str, str] | None = None
+    max_invoke_depth: int | None = None
+
+    @cached_property
+    def roots(self) -> List[str]:
+        """Workflows not invoked by any other workflow, sorted."""
+        invoked = {t for wf in self.workflows.values() for t in wf.invoked_workflows}
+        roots = [path for path in self.workflows if path not in invoked]
+        return sorted(roots or self.workflows)
+
+    @cached_property
+    def records(self) -> List[Dict[str, Any]]:
+        """One JSON-ready record per workflow, sorted by path."""
+        invoked_by: Dict[str, List[str]] = {}
+        for path, workflow in self.workflows.items():
+            for target in workflow.invoked_workflows:
+                invoked_by.setdefault(target, []).append(path)
+        descriptions = self.llm_descriptions or {}
+        return [
+            {
+                "path": path,
+                "display_name": workflow.display_name,
+                "summary": descriptions.get(path),
+                "error": workflow.error,
+                "invoked_workflows": workflow.invoked_workflows,
+                "invoked_by": sorted(invoked_by.get(path, [])),
+                "key_activities": workflow.key_activities,
+                "logic_flow": [
+                    {"depth": depth, "step": step} for depth, step in workflow.logic_flow
+                ],
+                "components": workflow.components,
+                "activities": [asdict(activity) for activity in workflow.activities],
+            }
+            for path, workflow in sorted(self.workflows.items())
+        ]
+
+    @cached_property
+    def tree(self) -> List[Dict[str, Any]]:
+        """
+        The invocation tree from the roots.
+
+        Like the Markdown list, each workflow is expanded once; later
+        references appear as leaves marked ``"repeated": true``. Nodes at
+        ``max_invoke_depth`` with unexpanded invocations are marked
+        ``"truncated": true``.
+        """
+        visited: Set[str] = set()
+        limit = self.max_invoke_depth
+
+        def node(path: str, depth: int) -> Dict[str, Any]:
+            entry: Dict[str, Any] = {"path": path, "found": path in self.workflows}
+            if path in visited:
+                entry["repeated"] = True
+                return entry
+            visited.add(path)
+            workflow = self.workflows.get(path)
+            children = workflow.invoked_workflows if workflow else []
+            if children and limit is not None and depth >= limit:
+                entry["truncated"] = True
+                return entry
+            entry["children"] = [node(child, depth + 1) for child in children]
+            return entry
+
+        return [node(root, 0) for root in self.roots]
+
+
+def render_json(ctx: ExportContext) -> str:
+    """Render workflows and the invocation tree as one JSON document."""
+    document = {
+        "roots": ctx.roots,
+        "workflows": ctx.records,
+        "invocation_tree": ctx.tree,
+    }
+    return json.dumps(document, ensure_ascii=False, indent=2) + "\n"
+
+
+def iter_ndjson(ctx: ExportContext) -> Iterator[str]:
+    """Yield one JSON line per workflow, flagging roots of the invocation tree."""
+    roots = set(ctx.roots)
+    for record in ctx.records:
+        line = dict(record, root=record["path"] in roots)
+        yield json.dumps(line, ensure_ascii=False) + "\n"
+
+
+HTML_STYLE = """
+body { font-family: system-ui, sans-serif; margin: 2rem; color: #1f2933; }
+h1 { font-size: 1.6rem; } h2 { font-size: 1.2rem; margin-top: 2rem; }
+section { border-top: 1px solid #d9e2ec; padding-top: .5rem; }
+blockquote { margin: .5rem 0; padding-left: 1rem; border-left: 3px solid #9fb3c8; }
+ul.flow { list-style: none; padding-left: 0; } ul.flow li { white-space: pre-wrap; }
+.missing { color: #9b2c2c; }
+"""
+
+
+def _html_tree(nodes: List[Dict[str, Any]], anchors: Dict[str, str]) -> str:
+    """Render invocation tree nodes as nested HTML lists."""
+    items = []
+    for entry in nodes:
+        name = html.escape(entry["path"])
+        if entry["found"]:
+            label = f'<a href="#{anchors[entry["path"]]}">{name}</a>'
+        else:
+            label = f'<span class="missing">{name} (not found)</span>'
+        if entry.get("repeated"):
+            label += " ↺"
+        children = _html_tree(entry.get("children", []), anchors)
+        items.append(f"<li>{label}{children}</li>")
+    return f"<ul>{''.join(items)}</ul>" if items else ""
+
+
+def _html_list(items: Iterable[str]) -> str:
+    """Render strings as an escaped HTML list."""
+    return "<ul>" + "".join(f"<li>{html.escape(item)}</li>" for item in items) + "</ul>"
+
+
+def render_html(ctx: ExportContext) -> str:
+    """Render a self-contained HTML report with inline styles and no scripts."""
+    anchors = {record["path"]: f"wf-{i}" for i, record in enumerate(ctx.records)}
+    sections = []
+    for record in ctx.records:
+        path = html.escape(record["path"])
+        parts = [f'<section id="{anchors[record["path"]]}"><h2>{path}</h2>']
+        if record["summary"]:
+            parts.append(f"<blockquote>{html.escape(record['summary'])}</blockquote>")
+        if record["error"]:
+            parts.append(f"<p><strong>Parse error:</strong> {html.escape(record['error'])}</p>")
+        if record["key_activities"]:
+            parts.append("<h3>Key activities</h3>" + _html_list(record["key_activities"]))
+        if record["logic_flow"]:
+            flow = "".join(
+                f"<li>{'  ' * item['depth']}{html.escape(item['step'])}</li>"
+                for item in record["logic_flow"]
+            )
+            parts.append(f'<h3>Logic flow</h3><ul class="flow">{flow}</ul>')
+        if record["invoked_workflows"]:
+            parts.append("<h3>Invokes</h3>" + _html_list(record["invoked_workflows"]))
+        if record["invoked_by"]:
+            parts.append("<h3>Invoked by</h3>" + _html_list(record["invoked_by"]))
+        parts.append("</section>")
+        sections.append("".join(parts))
+
+    return (
+        "<!DOCTYPE html>\n<html lang=\"en\"><head><meta charset=\"utf-8\">"
+        "<title>UiPath Project Summary</title>"
+        f"<style>{HTML_STYLE}</style></head><body>"
+        "<h1>UiPath Project Summary</h1>"
+        f"<h2>Invocation tree</h2>{_html_tree(ctx.tree, anchors)}"
+        f"{''.join(sections)}</body></html>\n"
+    )
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    """How to render one output format and name the result."""
+
+    render: Callable[[ExportContext], str | Iterator[str]]
+    media_type: str
+    filename: str
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    "list": ExportFormat(
+        lambda ctx: build_markdown(
+            ctx.workflows, ctx.llm_descriptions or None, ctx.max_invoke_depth
+        ),
+        "text/markdown",
+        "analysis.md",
+    ),
+    "sequence": ExportFormat(
+        lambda ctx: build_sequence_markdown(
+            ctx.workflows, ctx.llm_descriptions or None, ctx.max_invoke_depth
+        ),
+        "text/markdown",
+        "analysis-sequence.md",
+    ),
+    "json": ExportFormat(render_json, "application/json", "analysis.json"),
+    "ndjson": ExportFormat(iter_ndjson, "application/x-ndjson", "analysis.ndjson"),
+    "html": ExportFormat(render_html, "text/html", "analysis.html"),
+}
+
+
+def resolve_formats(value: str | List[str] | None) -> List[str]:
+    """
+    Turn the ``format`` config value into a list of known format names.
+
+    Accepts a single name, a comma-separated string or a list. Unknown names
+    are ignored and the Markdown list is used when nothing remains.
+    """
+    if isinstance(value, str):
+        names = value.split(",")
+    elif isinstance(value, list):
+        names = [str(name) for name in value]
+    else:
+        names = []
+    formats: List[str] = []
+    for name in names:
+        name = name.strip().lower()
+        if name in EXPORT_FORMATS and name not in formats:
+            formats.append(name)
+    return formats or [DEFAULT_FORMAT]
+
+
+def render_export(ctx: ExportContext, name: str) -> str | Iterator[str]:
+    """Render one format; NDJSON is returned as a lazy line iterator."""
+    return EXPORT_FORMATS[name].render(ctx)
+
+
+@dataclass(frozen=True)
+class RenderedOutput:
+    """A fully rendered response body, as stored in the render cache."""
+
+    body: bytes
+    media_type: str
+    filename: str
+
+
+def render_bundle(ctx: ExportContext, names: List[str]) -> bytes:
+    """Render several formats from the same context into one zip archive."""
+    buf = BytesIO()
+    with ZipFile(buf, "w", ZIP_DEFLATED) as zf:
+        for name in names:
+            body = render_export(ctx, name)
+            if not isinstance(body, str):
+                body = "".join(body)
+            zf.writestr(EXPORT_FORMATS[name].filename, body)
+    return buf.getvalue()
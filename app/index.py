@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from .parser import WorkflowData
+
+DEFAULT_INDEX_PATH = Path("data") / "project_index.sqlite3"
+
+DEFAULT_QUERY_LIMIT = 200
+
+INDEX_TABLES = ("projects", "activities", "invocations", "expressions")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    project_id TEXT PRIMARY KEY,
+    indexed_at REAL NOT NULL,
+    workflow_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS activities (
+    project_id TEXT NOT NULL,
+    workflow TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    activity_type TEXT NOT NULL,
+    display_name TEXT,
+    detail TEXT,
+    selector TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_activities_type
+    ON activities (project_id, activity_type);
+CREATE TABLE IF NOT EXISTS invocations (
+    project_id TEXT NOT NULL,
+    caller TEXT NOT NULL,
+    target TEXT NOT NULL,
+    target_name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_invocations_target
+    ON invocations (project_id, target_name);
+"""
+
+# Trigram full-text index so substring searches over expressions and
+# selectors do not scan every row
+EXPRESSIONS_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS expressions USING fts5(
+    project_id UNINDEXED, workflow UNINDEXED, activity_type UNINDEXED,
+    display_name UNINDEXED, kind UNINDEXED, text, tokenize = 'trigram'
+)
+"""
+
+# Used when the SQLite build lacks FTS5; substring queries then scan rows
+EXPRESSIONS_PLAIN = """
+CREATE TABLE IF NOT EXISTS expressions (
+    project_id TEXT, workflow TEXT, activity_type TEXT,
+    display_name TEXT, kind TEXT, text TEXT
+)
+"""
+
+
+def _target_name(target: str) -> str:
+    """Normalize an invoked workflow path to its lower-case file name."""
+    return re.split(r"[\\/]", target.strip())[-1].lower()
+
+
+def _like_pattern(text: str) -> str:
+    """Escape a substring for use in a LIKE pattern with ``ESCAPE '\\'``."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class ProjectIndex:
+    """
+    Persistent SQLite index over parsed projects.
+
+    Each project is stored as rows of activities, invocations and expressions
+    with secondary indexes on the queried columns, so support questions are
+    answered without re-parsing or re-uploading the project.
+    """
+
+    def __init__(self, db_path: Path | str) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.full_text = True
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            try:
+                conn.execute(EXPRESSIONS_FTS)
+            except sqlite3.OperationalError:
+                conn.execute(EXPRESSIONS_PLAIN)
+                self.full_text = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection and commit on success."""
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+
+    def add_project(self, project_id: str, workflows: Dict[str, WorkflowData]) -> None:
+        """Replace the indexed contents of a project with freshly parsed workflows."""
+        with self._connect() as conn:
+            for table in INDEX_TABLES:
+                conn.execute(f"DELETE FROM {table} WHERE project_id = ?", (project_id,))
+
+            conn.execute(
+                "INSERT INTO projects VALUES (?, ?, ?)",
+                (project_id, time.time(), len(workflows)),
+            )
+            conn.executemany(
+                "INSERT INTO invocations VALUES (?, ?, ?, ?)",
+                [
+                    (project_id, path, target, _target_name(target))
+                    for path, wf in workflows.items()
+                    for target in wf.invoked_workflows
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO activities VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        project_id,
+                        path,
+                        position,
+                        activity.activity_type,
+                        activity.display_name,
+                        activity.detail,
+                        activity.selector,
+                    )
+                    for path, wf in workflows.items()
+                    for position, activity in enumerate(wf.activities)
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO expressions VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        project_id,
+                        path,
+                        activity.activity_type,
+                        activity.display_name,
+                        kind,
+                        text,
+                    )
+                    for path, wf in workflows.items()
+                    for activity in wf.activities
+                    for kind, text in (
+                        ("detail", activity.detail),
+                        ("selector", activity.selector),
+                    )
+                    if text
+                ],
+            )
+
+    def list_projects(self) -> List[Dict[str, Any]]:
+        """Return indexed projects with their workflow counts."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT project_id, indexed_at, workflow_count FROM projects "
+                "ORDER BY project_id"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def has_project(self, project_id: str) -> bool:
+        """Return True when a project has been indexed."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM projects WHERE project_id = ?", (project_id,)
+            ).fetchone()
+        return row is not None
+
+    def find_invokers(
+        self, project_id: str, target: str, limit: int = DEFAULT_QUERY_LIMIT
+    ) -> List[Dict[str, Any]]:
+        """Return workflows that invoke ``target`` (matched by file name)."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT caller, target FROM invocations "
+                "WHERE project_id = ? AND target_name = ? ORDER BY caller LIMIT ?",
+                (project_id, _target_name(target), limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def find_activities(
+        self,
+        project_id: str,
+        activity_type: str | None = None,
+        display_name: str | None = None,
+        selector: str | None = None,
+        limit: int = DEFAULT_QUERY_LIMIT,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return activities matching every given filter.
+
+        The type matches exactly; display name and selector match as
+        case-insensitive substrings.
+        """
+        clauses = ["project_id = ?"]
+        params: List[Any] = [project_id]
+        if activity_type:
+            clauses.append("activity_type = ?")
+            params.append(activity_type)
+        if display_name:
+            clauses.append("display_name LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(display_name))
+        if selector:
+            clauses.append("selector LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(selector))
+        params.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT workflow, position, activity_type, display_name, detail, selector "
+                f"FROM activities WHERE {' AND '.join(clauses)} "
+                "ORDER BY workflow, position LIMIT ?",
+                params,
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search_expressions(
+        self, project_id: str, text: str, limit: int = DEFAULT_QUERY_LIMIT
+    ) -> List[Dict[str, Any]]:
+        """Return expressions and selectors containing ``text`` (case-insensitive)."""
+        if self.full_text and len(text) >= 3:
+            # A quoted trigram phrase is a substring match served by the index
+            condition = "expressions MATCH ?"
+            term = 'text : "' + text.replace('"', '""') + '"'
+        else:
+            condition = "text LIKE ? ESCAPE '\\'"
+            term = _like_pattern(text)
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT workflow, activity_type, display_name, kind, text "
+                f"FROM expressions WHERE {condition} AND project_id = ? "
+                "ORDER BY workflow LIMIT ?",
+                (term, project_id, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def get_project_index() -> ProjectIndex:
+    """Return the process-wide index stored at ``INDEX_DB_PATH``."""
+    return ProjectIndex(os.getenv("INDEX_DB_PATH") or DEFAULT_INDEX_PATH)
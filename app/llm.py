@@ -1,7 +1,13 @@
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Any, Dict, Hashable, List, Tuple
 
+from .cache import Cache
+from .dedup import DedupStore, get_dedup_store, summary_key
 from .parser import WorkflowData
 
 DEFAULT_SYSTEM_PROMPT = (
@@ -9,6 +15,24 @@ DEFAULT_SYSTEM_PROMPT = (
     "Highlight business purpose, key activities, invoked workflows, and important logic/conditions."
 )
 
+# Prompts longer than this are summarized with a map-reduce pass over the logic flow
+DEFAULT_MAX_PROMPT_CHARS = 12000
+DEFAULT_LLM_CONCURRENCY = 4
+# Room kept free in each chunk prompt for the instructions wrapped around it
+PROMPT_OVERHEAD_CHARS = 400
+
+
+@dataclass
+class _LLMSettings:
+    """Resolved LLM settings shared by every completion in one enrichment run."""
+
+    client: Any
+    model: str
+    system_prompt: str
+    use_source: bool
+    max_prompt_chars: int
+    cache: Cache | None = None
+
 
 def _logic_flow_as_text(logic_flow: List[Tuple[int, str]]) -> str:
     """Render the collected logic flow into a readable text block."""
@@ -19,14 +43,344 @@ def _logic_flow_as_text(logic_flow: List[Tuple[int, str]]) -> str:
     return "\n".join(lines)
 
 
+def _flow_size(steps: List[Tuple[int, str]]) -> int:
+    """Return the rendered character count of a list of logic steps."""
+    return sum(len(step) + 2 * depth + 3 for depth, step in steps)
+
+
+def _split_subtrees(steps: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+    """Group steps into subtrees rooted at the shallowest depth present."""
+    if not steps:
+        return []
+    base = min(depth for depth, _ in steps)
+    subtrees: List[List[Tuple[int, str]]] = []
+    for step in steps:
+        if step[0] <= base or not subtrees:
+            subtrees.append([step])
+        else:
+            subtrees[-1].append(step)
+    return subtrees
+
+
+def split_logic_flow(
+    logic_flow: List[Tuple[int, str]], max_chars: int
+) -> List[List[Tuple[int, str]]]:
+    """
+    Split a logic flow into chunks of whole subtrees that each fit in max_chars.
+
+    Sibling subtrees are packed together while they fit. A subtree that is too
+    large on its own is split at the next depth, repeating its root step at the
+    top of every piece so each chunk keeps its context.
+    """
+    chunks: List[List[Tuple[int, str]]] = []
+    current: List[Tuple[int, str]] = []
+    current_size = 0
+
+    for subtree in _split_subtrees(logic_flow):
+        size = _flow_size(subtree)
+        if size > max_chars and len(subtree) > 1:
+            if current:
+                chunks.append(current)
+                current, current_size = [], 0
+            head = subtree[0]
+            budget = max(max_chars - _flow_size([head]), 1)
+            for part in split_logic_flow(subtree[1:], budget):
+                chunks.append([head] + part)
+            continue
+        if current and current_size + size > max_chars:
+            chunks.append(current)
+            current, current_size = [], 0
+        current.extend(subtree)
+        current_size += size
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Shorten text to a character limit, marking the cut."""
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def _callee_text(callee_summaries: Dict[str, str] | None, limit: int) -> str:
+    """Render summaries of invoked workflows for inclusion in a caller prompt."""
+    if not callee_summaries:
+        return ""
+    lines = [f"- {path}: {summary}" for path, summary in callee_summaries.items()]
+    return "Invoked workflow summaries:\n" + _truncate("\n".join(lines), limit) + "\n"
+
+
+def _workflow_prompt(
+    workflow_path: str,
+    workflow: WorkflowData,
+    settings: _LLMSettings,
+    callee_summaries: Dict[str, str] | None = None,
+) -> str:
+    """Build the single-pass prompt for a workflow."""
+    callees = _callee_text(callee_summaries, settings.max_prompt_chars // 4)
+    if settings.use_source and workflow.raw_xml:
+        return (
+            "Analyze the following UiPath XAML workflow and produce a concise markdown paragraph "
+            "summarizing its purpose, key activities, invoked workflows, and noteworthy conditions. "
+            "Prefer clear bullet-like sentences and keep it short.\n\n"
+            f"Path: {workflow_path}\n"
+            f"{callees}"
+            f"Raw XAML:\n```xml\n{workflow.raw_xml}\n```"
+        )
+    return (
+        "Summarize this UiPath workflow. Describe business purpose, important logic, and key activities.\n"
+        f"Path: {workflow_path}\n"
+        f"Invokes: {', '.join(workflow.invoked_workflows) or 'none'}\n"
+        f"Key activities: {', '.join(workflow.key_activities) or 'none'}\n"
+        f"{callees}"
+        f"Logic flow:\n{_logic_flow_as_text(workflow.logic_flow)}\n\n"
+        "Return a concise markdown paragraph."
+    )
+
+
+def _chunk_prompts(
+    workflow_path: str, workflow: WorkflowData, settings: _LLMSettings
+) -> List[str]:
+    """Build the map-phase prompts, one per logic-flow chunk."""
+    budget = max(settings.max_prompt_chars - PROMPT_OVERHEAD_CHARS, 1)
+    chunks = split_logic_flow(workflow.logic_flow, budget)
+    total = len(chunks)
+    return [
+        "Summarize this part of a larger UiPath workflow. Describe the logic and key activities "
+        "it contains in a few short sentences.\n"
+        f"Path: {workflow_path} (part {index} of {total})\n"
+        f"Logic flow:\n{_logic_flow_as_text(chunk)}"
+        for index, chunk in enumerate(chunks, start=1)
+    ]
+
+
+def _reduce_prompt(
+    workflow_path: str,
+    workflow: WorkflowData,
+    partials: List[str],
+    settings: _LLMSettings,
+    callee_summaries: Dict[str, str] | None,
+    final: bool,
+) -> str:
+    """Build a reduce-phase prompt combining partial summaries."""
+    parts = "\n".join(f"- {partial}" for partial in partials)
+    if not final:
+        return (
+            "Combine these partial summaries of one UiPath workflow into a single shorter summary.\n"
+            f"Path: {workflow_path}\n"
+            f"Partial summaries:\n{parts}"
+        )
+    limit = settings.max_prompt_chars // 4
+    return (
+        "Combine these partial summaries of one UiPath workflow into a concise markdown paragraph. "
+        "Describe business purpose, important logic, and key activities.\n"
+        f"Path: {workflow_path}\n"
+        f"Invokes: {_truncate(', '.join(workflow.invoked_workflows) or 'none', limit)}\n"
+        f"Key activities: {_truncate(', '.join(workflow.key_activities) or 'none', limit)}\n"
+        f"{_callee_text(callee_summaries, limit)}"
+        f"Partial summaries:\n{parts}"
+    )
+
+
+def _group_partials(partials: List[str], max_chars: int) -> List[List[str]]:
+    """Pack partial summaries into groups whose combined length fits max_chars."""
+    groups: List[List[str]] = []
+    size = 0
+    for partial in partials:
+        if groups and size + len(partial) <= max_chars:
+            groups[-1].append(partial)
+            size += len(partial)
+        else:
+            groups.append([partial])
+            size = len(partial)
+    return groups
+
+
+def _complete(settings: _LLMSettings, user_content: str) -> str | None:
+    """
+    Run one chat completion, returning None when the request fails.
+
+    Answers are cached by model, system prompt and content, so the same
+    prompt from another project is not sent again. Failures are not cached.
+    """
+    key = None
+    if settings.cache is not None:
+        key = summary_key(settings.model, settings.system_prompt, user_content)
+        cached = settings.cache.get(key)
+        if cached is not None:
+            return cached
+    try:
+        completion = settings.client.chat.completions.create(
+            model=settings.model,
+            messages=[
+                {"role": "system", "content": settings.system_prompt},
+                {"role": "user", "content": user_content},
+            ],
+            temperature=0.2,
+            max_tokens=200,
+        )
+    except Exception:
+        # Continue without AI content if a request fails
+        return None
+    if not completion.choices:
+        return ""
+    content = (completion.choices[0].message.content or "").strip()
+    if key is not None:
+        settings.cache.put(key, content)
+    return content
+
+
+def _run_completions(
+    executor: ThreadPoolExecutor, settings: _LLMSettings, jobs: Dict[Hashable, str]
+) -> Dict[Hashable, str | None]:
+    """
+    Run a batch of prompts concurrently and return results by job key.
+
+    Identical prompts in the batch (e.g. duplicated workflow files) are only
+    sent once.
+    """
+    futures: Dict[str, Any] = {}
+    for content in jobs.values():
+        if content not in futures:
+            futures[content] = executor.submit(_complete, settings, content)
+    return {key: futures[content].result() for key, content in jobs.items()}
+
+
+def _summarize_batch(
+    executor: ThreadPoolExecutor,
+    settings: _LLMSettings,
+    batch: Dict[str, WorkflowData],
+    callees_for: Dict[str, Dict[str, str]],
+) -> Dict[str, str]:
+    """
+    Summarize independent workflows concurrently.
+
+    Workflows whose prompt fits the budget take a single completion. Larger
+    ones are mapped chunk by chunk, then reduced round by round until one
+    summary remains. Each round is submitted as one batch across all
+    workflows so no task ever waits on another inside the pool.
+    """
+    jobs: Dict[Hashable, str] = {}
+    chunk_counts: Dict[str, int] = {}
+    for path, workflow in batch.items():
+        prompt = _workflow_prompt(path, workflow, settings, callees_for.get(path))
+        if len(prompt) <= settings.max_prompt_chars or not workflow.logic_flow:
+            jobs[(path, None)] = prompt
+            continue
+        prompts = _chunk_prompts(path, workflow, settings)
+        chunk_counts[path] = len(prompts)
+        for index, chunk_prompt in enumerate(prompts):
+            jobs[(path, index)] = chunk_prompt
+
+    results = _run_completions(executor, settings, jobs)
+    summaries: Dict[str, str] = {}
+    partials: Dict[str, List[str]] = {}
+    for path in batch:
+        if path in chunk_counts:
+            parts = [results[(path, i)] for i in range(chunk_counts[path])]
+            partials[path] = [part for part in parts if part]
+        elif results[(path, None)] is not None:
+            summaries[path] = results[(path, None)]
+
+    budget = max(settings.max_prompt_chars - PROMPT_OVERHEAD_CHARS, 1)
+    while partials:
+        jobs = {}
+        group_counts: Dict[str, int] = {}
+        for path, parts in partials.items():
+            if not parts:
+                continue
+            groups = _group_partials(parts, budget)
+            if len(groups) == 1 or len(groups) == len(parts):
+                # Either everything fits, or no grouping makes progress: finish now
+                jobs[(path, "final")] = _reduce_prompt(
+                    path, batch[path], parts, settings, callees_for.get(path), True
+                )
+                continue
+            group_counts[path] = len(groups)
+            for index, group in enumerate(groups):
+                jobs[(path, index)] = _reduce_prompt(
+                    path, batch[path], group, settings, None, False
+                )
+
+        results = _run_completions(executor, settings, jobs)
+        next_partials: Dict[str, List[str]] = {}
+        for path in partials:
+            if path in group_counts:
+                parts = [results[(path, i)] for i in range(group_counts[path])]
+                next_partials[path] = [part for part in parts if part]
+            elif results.get((path, "final")) is not None:
+                summaries[path] = results[(path, "final")]
+        partials = next_partials
+
+    return summaries
+
+
+def _target_key(target: str) -> str:
+    """Normalize a workflow path or invoke target to a lower-case posix path."""
+    return target.strip().replace("\\", "/").removeprefix("./").lower()
+
+
+def _project_callees(parsed_data: Dict[str, WorkflowData]) -> Dict[str, List[str]]:
+    """
+    Resolve each workflow's invoke targets to project paths.
+
+    UiPath writes targets like ``Framework\\SendEmail.xaml``, so targets are
+    matched on their normalized path, falling back to the file name when it
+    is unique in the project. Unknown targets and self-invocations are dropped.
+    """
+    lookup = {_target_key(path): path for path in parsed_data}
+    names = Counter(PurePosixPath(key).name for key in lookup)
+    for key, path in list(lookup.items()):
+        name = PurePosixPath(key).name
+        if names[name] == 1:
+            lookup.setdefault(name, path)
+    callees: Dict[str, List[str]] = {}
+    for path, workflow in parsed_data.items():
+        resolved = (lookup.get(_target_key(target)) for target in workflow.invoked_workflows)
+        callees[path] = list(dict.fromkeys(c for c in resolved if c and c != path))
+    return callees
+
+
+def _invocation_levels(parsed_data: Dict[str, WorkflowData]) -> List[List[str]]:
+    """
+    Order workflows bottom-up along the invoke graph.
+
+    Each level only contains workflows whose known callees sit in earlier
+    levels. Workflows caught in an invocation cycle are emitted together once
+    nothing else is ready.
+    """
+    callees = {path: set(targets) for path, targets in _project_callees(parsed_data).items()}
+    done: set[str] = set()
+    remaining = set(parsed_data)
+    levels: List[List[str]] = []
+    while remaining:
+        ready = sorted(path for path in remaining if callees[path] <= done)
+        if not ready:
+            ready = sorted(remaining)
+        levels.append(ready)
+        done.update(ready)
+        remaining.difference_update(ready)
+    return levels
+
+
 def enrich_with_llm(
-    parsed_data: Dict[str, WorkflowData], config: dict | None
+    parsed_data: Dict[str, WorkflowData],
+    config: dict | None,
+    store: DedupStore | None = None,
 ) -> Dict[str, str]:
     """
     Optionally enrich parsed workflows with LLM-generated summaries.
 
     If config is falsy, missing use_llm flag, or lacks an api_key, an empty
     dictionary is returned so the core functionality works without AI.
+
+    Workflows too large for ``max_prompt_chars`` are summarized hierarchically.
+    With ``summary_rollup`` enabled, callee summaries are fed into their
+    callers, following the invoke graph bottom-up.
+
+    Completions are cached in ``store`` (the process-wide dedup store by
+    default), so summaries of files shared between projects are reused.
     """
     config = config or {}
     if not config.get("use_llm"):
@@ -43,51 +397,40 @@ def enrich_with_llm(
     except ImportError:
         return {}
 
-    client = OpenAI(api_key=api_key, base_url=base_url)
-    model = config.get("model") or "gpt-4o-mini"
-    system_prompt = config.get("prompt") or DEFAULT_SYSTEM_PROMPT
-    use_source = bool(config.get("use_source"))
+    settings = _LLMSettings(
+        client=OpenAI(api_key=api_key, base_url=base_url),
+        model=config.get("model") or "gpt-4o-mini",
+        system_prompt=config.get("prompt") or DEFAULT_SYSTEM_PROMPT,
+        use_source=bool(config.get("use_source")),
+        max_prompt_chars=int(config.get("max_prompt_chars") or DEFAULT_MAX_PROMPT_CHARS),
+        cache=(store or get_dedup_store()).summaries,
+    )
+    concurrency = max(int(config.get("llm_concurrency") or DEFAULT_LLM_CONCURRENCY), 1)
+    # Files that failed to parse have nothing to summarize
+    parsed_data = {path: data for path, data in parsed_data.items() if data.error is None}
 
     summaries: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if not config.get("summary_rollup"):
+            return _summarize_batch(executor, settings, dict(parsed_data), {})
 
-    for workflow_path, workflow in parsed_data.items():
-        logic_text = _logic_flow_as_text(workflow.logic_flow)
-
-        if use_source and workflow.raw_xml:
-            user_content = (
-                "Analyze the following UiPath XAML workflow and produce a concise markdown paragraph "
-                "summarizing its purpose, key activities, invoked workflows, and noteworthy conditions. "
-                "Prefer clear bullet-like sentences and keep it short.\n\n"
-                f"Path: {workflow_path}\n"
-                f"Raw XAML:\n```xml\n{workflow.raw_xml}\n```"
-            )
-        else:
-            user_content = (
-                "Summarize this UiPath workflow. Describe business purpose, important logic, and key activities.\n"
-                f"Path: {workflow_path}\n"
-                f"Invokes: {', '.join(workflow.invoked_workflows) or 'none'}\n"
-                f"Key activities: {', '.join(workflow.key_activities) or 'none'}\n"
-                f"Logic flow:\n{logic_text}\n\n"
-                "Return a concise markdown paragraph."
+        project_callees = _project_callees(parsed_data)
+        for level in _invocation_levels(parsed_data):
+            callees_for = {
+                path: {
+                    callee: summaries[callee]
+                    for callee in project_callees[path]
+                    if callee in summaries
+                }
+                for path in level
+            }
+            summaries.update(
+                _summarize_batch(
+                    executor,
+                    settings,
+                    {path: parsed_data[path] for path in level},
+                    callees_for,
+                )
             )
 
-        try:
-            completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_content},
-                ],
-                temperature=0.2,
-                max_tokens=200,
-            )
-            summaries[workflow_path] = (
-                completion.choices[0].message.content.strip()
-                if completion.choices
-                else ""
-            )
-        except Exception:
-            # Continue without AI content if a request fails
-            continue
-
     return summaries
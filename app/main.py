@@ -1,17 +1,65 @@
 from __future__ import annotations
 
+import hashlib
 import tempfile
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile, Body
-from fastapi.responses import PlainTextResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import (
+    Body,
+    FastAPI,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
 from pydantic import BaseModel
 
+from .index import DEFAULT_QUERY_LIMIT, get_project_index
 from .llm import enrich_with_llm
-from .markdown_gen import build_markdown, build_sequence_markdown
-from .parser import load_config, parse_project, safe_extract_archive, WorkflowData
+from .body_limit import BodySizeLimitMiddleware
+from .compression import CompressionMiddleware
+from .dedup import get_dedup_store
+from .diff import DIFF_FORMATS, diff_projects, render_diff
+from .etag import compute_etag, content_checksum, etag_matches
+from .export import (
+    EXPORT_FORMATS,
+    ExportContext,
+    RenderedOutput,
+    render_bundle,
+    render_export,
+    resolve_formats,
+)
+from .parser import (
+    ArchiveLimitError,
+    get_parser_backend,
+    parse_project,
+    resolve_detail_options,
+    safe_extract_archive,
+    WorkflowData,
+)
+from .parse_pool import get_parse_pool, is_resource_failure
+from .profiling import (
+    ProfilingUnavailable,
+    RequestProfiler,
+    activate,
+    artifact_path,
+    check_profile_token,
+    current_profiler,
+)
+from .settings import ConfigError, get_settings, load_config
+from .static_ui import register_spa_routes
 
 app = FastAPI(
     title="UiPath Flow Visualizer",
@@ -21,43 +69,267 @@ app = FastAPI(
     ),
 )
 
+app.add_middleware(CompressionMiddleware)
+
+ARCHIVE_LIMITS = get_settings().archive_limits
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Allowance for multipart boundaries and the config form field
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _body_limit(path: str) -> int | None:
+    """Largest request body accepted on an upload endpoint, None elsewhere."""
+    limits = {
+        "/analyze/upload/": ARCHIVE_LIMITS.max_upload_bytes + MULTIPART_OVERHEAD_BYTES,
+        "/api/workflows/ingest": ARCHIVE_LIMITS.max_uncompressed_bytes,
+        "/analyze/diff/": 2 * ARCHIVE_LIMITS.max_upload_bytes + MULTIPART_OVERHEAD_BYTES,
+        "/api/workflows/diff": 2 * ARCHIVE_LIMITS.max_uncompressed_bytes,
+    }
+    return limits.get(path)
+
+
+app.add_middleware(BodySizeLimitMiddleware, limit_for=_body_limit)
+
+
+# Analysis endpoints that run the parse/llm/render stages
+PROFILED_PATHS = frozenset({"/analyze/upload/", "/api/workflows/ingest"})
+
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """
+    Profile a request sent with an ``X-Profile-Token`` matching ``PROFILING_TOKEN``.
+
+    The report is stored server-side and its id returned in ``X-Profile-Id``.
+    """
+    token = request.headers.get("x-profile-token")
+    if token is None or request.url.path not in PROFILED_PATHS:
+        return await call_next(request)
+    try:
+        profiler = RequestProfiler.start(token)
+    except ProfilingUnavailable as exc:
+        return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+    activate(profiler)
+    try:
+        response = await call_next(request)
+    finally:
+        profiler.finish()
+    response.headers["X-Profile-Id"] = profiler.profile_id
+    return response
+
+
+async def _spool_upload(file: UploadFile, dest: Path) -> str:
+    """
+    Copy an upload to disk in chunks, stopping once it exceeds the size limit.
+
+    Returns the SHA-256 checksum of the upload, computed along the way.
+    """
+    size = 0
+    digest = hashlib.sha256()
+    with dest.open("wb") as out:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > ARCHIVE_LIMITS.max_upload_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Upload exceeds {ARCHIVE_LIMITS.max_upload_bytes} bytes.",
+                )
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest()
+
+
+def _extract_upload(upload_path: Path, extract_dir: Path) -> None:
+    """Extract a spooled archive, mapping limit violations to 413 and bad archives to 400."""
+    try:
+        safe_extract_archive(upload_path, extract_dir, ARCHIVE_LIMITS)
+    except ArchiveLimitError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except Exception as exc:  # pragma: no cover - defensive
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _check_archive_name(filename: str) -> None:
+    if not filename.lower().endswith((".zip", ".nupkg")):
+        raise HTTPException(
+            status_code=400, detail="Only .zip or .nupkg project archives are supported."
+        )
+
+
+def _config_or_400(config_input: Union[str, Dict[str, Any], None]) -> dict:
+    """Resolve a request's config, mapping invalid JSON or values to 400."""
+    try:
+        return load_config(config_input)
+    except ConfigError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _not_modified(etag: str) -> Response:
+    """Answer a matching If-None-Match without re-running the analysis."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def _parse_or_400(extract_dir: Path, cfg: dict) -> Dict[str, WorkflowData]:
+    """
+    Parse a project with the configured backend and detail, mapping bad config to 400.
+
+    Endpoints call this, like the blocking index write and LLM enrichment,
+    through ``run_in_threadpool`` so it does not hold the event loop.
+    """
+    try:
+        backend = get_parser_backend(cfg.get("parser_backend"))
+        detail = resolve_detail_options(cfg)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    profiler = current_profiler()
+    with profiler.stage("parse"):
+        workflows = parse_project(
+            extract_dir,
+            backend,
+            get_dedup_store().workflows,
+            detail,
+            profiler.file_timings,
+            get_parse_pool(get_settings().parse_pool),
+        )
+    profiler.record_files(extract_dir, workflows)
+    return workflows
+
+
+def _cache_headers(etag: str | None) -> Dict[str, str]:
+    """Revalidation headers, or ``no-store`` for a result that must not be reused."""
+    if etag is None:
+        return {"Cache-Control": "no-store"}
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def _output_response(output: RenderedOutput, etag: str | None) -> Response:
+    headers = {
+        "Content-Disposition": f'attachment; filename="{output.filename}"',
+        **_cache_headers(etag),
+    }
+    return Response(output.body, media_type=output.media_type, headers=headers)
+
+
+def _cached_response(cfg: dict, etag: str) -> Optional[Response]:
+    """Return the output stored under this ETag by any worker, if there is one."""
+    project_id = cfg.get("project_id")
+    if project_id and not get_project_index().has_project(str(project_id)):
+        # The project still has to be parsed to populate this host's index
+        return None
+    output = get_dedup_store().renders.get(etag)
+    return _output_response(output, etag) if output is not None else None
+
+
+def _is_complete(
+    workflows: Dict[str, WorkflowData], llm_descriptions: Dict[str, str], cfg: dict
+) -> bool:
+    """
+    Return True when a result may be reused by the render cache or a client.
+
+    Files that failed on a pool limit or worker crash may parse on a retry,
+    and every parsed workflow must have its summary when the LLM is on;
+    workflows with a parse error are never summarized.
+    """
+    if any(is_resource_failure(workflow) for workflow in workflows.values()):
+        return False
+    if not cfg.get("use_llm"):
+        return True
+    parsed = [path for path, workflow in workflows.items() if workflow.error is None]
+    return all(path in llm_descriptions for path in parsed)
+
+
+def _render_response(
+    workflows: Dict[str, WorkflowData],
+    llm_descriptions: Dict[str, str],
+    cfg: dict,
+    etag: str | None,
+) -> Response:
+    """
+    Render the configured output format(s) from one parse.
+
+    A single format is returned directly (NDJSON is streamed line by line);
+    several formats are rendered from a shared context into one zip archive.
+    Complete results carry their ETag so clients can revalidate with 304s,
+    and non-streamed ones are stored in the render cache under it. Incomplete
+    results (see ``_is_complete``) are sent with ``no-store`` and no ETag,
+    so a retry runs the analysis again.
+    """
+    if not _is_complete(workflows, llm_descriptions, cfg):
+        etag = None
+    formats = resolve_formats(cfg.get("format"))
+    max_invoke_depth = resolve_detail_options(cfg).max_invoke_depth
+    ctx = ExportContext(workflows, llm_descriptions or None, max_invoke_depth)
+    if len(formats) > 1:
+        output = RenderedOutput(
+            render_bundle(ctx, formats), "application/zip", "analysis.zip"
+        )
+    else:
+        export = EXPORT_FORMATS[formats[0]]
+        body = render_export(ctx, formats[0])
+        if not isinstance(body, str):
+            headers = {
+                "Content-Disposition": f'attachment; filename="{export.filename}"',
+                **_cache_headers(etag),
+            }
+            return StreamingResponse(body, media_type=export.media_type, headers=headers)
+        output = RenderedOutput(body.encode("utf-8"), export.media_type, export.filename)
+
+    if etag is not None:
+        get_dedup_store().renders.put(etag, output)
+    return _output_response(output, etag)
+
+
+def _enrich_and_render(
+    workflows: Dict[str, WorkflowData], cfg: dict, etag: str
+) -> Response:
+    """Run LLM enrichment and rendering as separately profiled stages."""
+    profiler = current_profiler()
+    with profiler.stage("llm"):
+        llm_descriptions = enrich_with_llm(workflows, cfg)
+    with profiler.stage("render"):
+        return _render_response(workflows, llm_descriptions, cfg, etag)
+
+
+def _index_project(cfg: dict, workflows: Dict[str, WorkflowData]) -> None:
+    """Store parsed workflows in the project index when a project_id is given."""
+    project_id = cfg.get("project_id")
+    if project_id:
+        get_project_index().add_project(str(project_id), workflows)
+
 
 @app.post("/analyze/upload/", response_class=PlainTextResponse)
 async def analyze_upload(
-    file: UploadFile = File(...), config: Optional[str] = Form(None)
+    file: UploadFile = File(...),
+    config: Optional[str] = Form(None),
+    if_none_match: Optional[str] = Header(None),
 ):
     """Analyze an uploaded UiPath project and return a Markdown document."""
     filename = file.filename or ""
-    if not filename.lower().endswith((".zip", ".nupkg")):
-        raise HTTPException(
-            status_code=400, detail="Only .zip or .nupkg project archives are supported."
-        )
+    _check_archive_name(filename)
+
+    cfg = _config_or_400(config)
 
     with tempfile.TemporaryDirectory() as tmpdir:
-        upload_path = Path(tmpdir) / (filename or "upload.zip")
-        content = await file.read()
-        upload_path.write_bytes(content)
+        upload_path = Path(tmpdir) / (Path(filename).name or "upload.zip")
+        checksum = await _spool_upload(file, upload_path)
+        etag = compute_etag([("archive", checksum)], cfg)
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+        cached = _cached_response(cfg, etag)
+        if cached is not None:
+            return cached
 
         extract_dir = Path(tmpdir) / "extracted"
-        try:
-            safe_extract_archive(upload_path, extract_dir)
-        except Exception as exc:  # pragma: no cover - defensive
-            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        _extract_upload(upload_path, extract_dir)
 
-        workflows = parse_project(extract_dir)
+        workflows = await run_in_threadpool(_parse_or_400, extract_dir, cfg)
         if not workflows:
             raise HTTPException(status_code=400, detail="No XAML workflows found.")
 
-        cfg = load_config(config)
-        llm_descriptions = enrich_with_llm(workflows, cfg)
-        # Choose output format: default list or Mermaid sequence diagram
-        output_format = (cfg or {}).get("format")
-        if output_format == "sequence":
-            markdown = build_sequence_markdown(workflows, llm_descriptions or None)
-        else:
-            markdown = build_markdown(workflows, llm_descriptions or None)
-        headers = {"Content-Disposition": 'attachment; filename="analysis.md"'}
-        return PlainTextResponse(markdown, media_type="text/markdown", headers=headers)
+        await run_in_threadpool(_index_project, cfg, workflows)
+        return await run_in_threadpool(_enrich_and_render, workflows, cfg, etag)
 
 
 class IngestFilePayload(BaseModel):
@@ -75,8 +347,23 @@ class IngestRequest(BaseModel):
     config: Optional[Dict[str, Any]] = None
 
 
+def _write_ingest_files(files: List[IngestFilePayload], dest: Path) -> None:
+    """Write ingested file contents under ``dest``, rejecting paths that escape it."""
+    root = dest.resolve()
+    for file_payload in files:
+        file_path = (root / file_payload.path).resolve()
+        if not file_path.is_relative_to(root):
+            raise HTTPException(
+                status_code=400, detail=f"Invalid file path: {file_payload.path}"
+            )
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(file_payload.content, encoding="utf-8")
+
+
 @app.post("/api/workflows/ingest", response_class=PlainTextResponse)
-async def ingest_workflows(request: IngestRequest = Body(...)):
+async def ingest_workflows(
+    request: IngestRequest = Body(...), if_none_match: Optional[str] = Header(None)
+):
     """
     Accept pre-processed XAML files from the frontend.
     Files include path, size, checksum, and content (raw or LLM-processed).
@@ -85,6 +372,17 @@ async def ingest_workflows(request: IngestRequest = Body(...)):
     if not request.files:
         raise HTTPException(status_code=400, detail="No files provided")
 
+    cfg = _config_or_400(request.config)
+    # Checksum the content actually sent, which may be LLM-processed
+    etag = compute_etag(
+        [(f.path, content_checksum(f.content)) for f in request.files], cfg
+    )
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    cached = _cached_response(cfg, etag)
+    if cached is not None:
+        return cached
+
     # Convert frontend payload to WorkflowData format
     # For simplicity, we'll create a temporary directory and write files
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -92,58 +390,171 @@ async def ingest_workflows(request: IngestRequest = Body(...)):
         extract_dir.mkdir(parents=True, exist_ok=True)
 
         # Write each file to the temporary directory
-        for file_payload in request.files:
-            file_path = extract_dir / file_payload.path
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(file_payload.content, encoding="utf-8")
+        _write_ingest_files(request.files, extract_dir)
 
         # Parse the workflows
-        workflows = parse_project(extract_dir)
+        workflows = await run_in_threadpool(_parse_or_400, extract_dir, cfg)
         if not workflows:
             raise HTTPException(status_code=400, detail="No valid XAML workflows found")
 
-        cfg = load_config(request.config)
-        llm_descriptions = enrich_with_llm(workflows, cfg)
-        output_format = (cfg or {}).get("format")
-        if output_format == "sequence":
-            markdown = build_sequence_markdown(workflows, llm_descriptions or None)
-        else:
-            markdown = build_markdown(workflows, llm_descriptions or None)
-        headers = {"Content-Disposition": 'attachment; filename="analysis.md"'}
-        return PlainTextResponse(markdown, media_type="text/markdown", headers=headers)
+        await run_in_threadpool(_index_project, cfg, workflows)
+        return await run_in_threadpool(_enrich_and_render, workflows, cfg, etag)
+
+
+def _check_diff_format(fmt: str) -> None:
+    if fmt not in DIFF_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown diff format: {fmt}")
+
+
+def _diff_response(
+    old: Dict[str, WorkflowData], new: Dict[str, WorkflowData], fmt: str
+) -> Response:
+    """Render a structural diff of two parsed projects."""
+    body = render_diff(diff_projects(old, new), fmt)
+    media_type, filename = (
+        ("application/json", "diff.json") if fmt == "json" else ("text/markdown", "diff.md")
+    )
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    return Response(body, media_type=media_type, headers=headers)
+
+
+@app.post("/analyze/diff/", response_class=PlainTextResponse)
+async def diff_uploads(
+    base: UploadFile = File(...),
+    head: UploadFile = File(...),
+    config: Optional[str] = Form(None),
+    format: str = Query("markdown"),
+):
+    """
+    Compare two versions of a project uploaded as archives.
+
+    Workflows whose content did not change are recognized by checksum and
+    reuse cached parses.
+    """
+    _check_diff_format(format)
+    for upload in (base, head):
+        _check_archive_name(upload.filename or "")
+    cfg = _config_or_400(config)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        projects = []
+        for name, upload in (("base", base), ("head", head)):
+            upload_path = Path(tmpdir) / f"{name}.zip"
+            await _spool_upload(upload, upload_path)
+            extract_dir = Path(tmpdir) / name
+            _extract_upload(upload_path, extract_dir)
+            projects.append(await run_in_threadpool(_parse_or_400, extract_dir, cfg))
+        return _diff_response(projects[0], projects[1], format)
+
+
+class DiffRequest(BaseModel):
+    """Request payload for the /api/workflows/diff endpoint"""
+    base: List[IngestFilePayload]
+    head: List[IngestFilePayload]
+    config: Optional[Dict[str, Any]] = None
+
+
+@app.post("/api/workflows/diff", response_class=PlainTextResponse)
+async def diff_manifests(request: DiffRequest = Body(...), format: str = Query("markdown")):
+    """Compare two versions of a project sent as file manifests, like ingest."""
+    _check_diff_format(format)
+    cfg = _config_or_400(request.config)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        projects = []
+        for name, files in (("base", request.base), ("head", request.head)):
+            extract_dir = Path(tmpdir) / name
+            extract_dir.mkdir()
+            _write_ingest_files(files, extract_dir)
+            projects.append(await run_in_threadpool(_parse_or_400, extract_dir, cfg))
+        return _diff_response(projects[0], projects[1], format)
+
+
+def _indexed_project(project_id: str):
+    """Return the project index, or 404 when the project was never indexed."""
+    index = get_project_index()
+    if not index.has_project(project_id):
+        raise HTTPException(status_code=404, detail="Project not indexed")
+    return index
+
+
+@app.get("/api/projects")
+async def list_indexed_projects():
+    """List projects stored in the analysis index."""
+    return get_project_index().list_projects()
+
+
+@app.get("/api/projects/{project_id}/invocations")
+async def query_invocations(
+    project_id: str,
+    target: str = Query(..., description="Invoked workflow, e.g. SendEmail.xaml"),
+    limit: int = Query(DEFAULT_QUERY_LIMIT, ge=1, le=5000),
+):
+    """Return the workflows of an indexed project that invoke a given workflow."""
+    return _indexed_project(project_id).find_invokers(project_id, target, limit)
+
+
+@app.get("/api/projects/{project_id}/activities")
+async def query_activities(
+    project_id: str,
+    activity_type: Optional[str] = Query(None, alias="type"),
+    name: Optional[str] = None,
+    selector: Optional[str] = None,
+    limit: int = Query(DEFAULT_QUERY_LIMIT, ge=1, le=5000),
+):
+    """Return activities of an indexed project filtered by type, name or selector."""
+    return _indexed_project(project_id).find_activities(
+        project_id, activity_type, name, selector, limit
+    )
+
+
+@app.get("/api/projects/{project_id}/expressions")
+async def query_expressions(
+    project_id: str,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_QUERY_LIMIT, ge=1, le=5000),
+):
+    """Return expressions and selectors of an indexed project containing a substring."""
+    return _indexed_project(project_id).search_expressions(project_id, q, limit)
+
+
+@app.get("/api/profiles/{profile_id}")
+async def get_profile_report(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    """Return a stored profiling report (stages, allocators, slowest files, functions)."""
+    path = _profile_artifact(profile_id, ".json", x_profile_token)
+    return Response(path.read_bytes(), media_type="application/json")
+
+
+@app.get("/api/profiles/{profile_id}/pstats")
+async def get_profile_pstats(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    """Download the raw cProfile data of a profiled request for ``pstats``/snakeviz."""
+    path = _profile_artifact(profile_id, ".pstats", x_profile_token)
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+
+def _profile_artifact(profile_id: str, suffix: str, token: Optional[str]) -> Path:
+    try:
+        check_profile_token(token)
+    except ProfilingUnavailable as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    path = artifact_path(profile_id, suffix)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return path
+
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Return hit and miss counts of this worker's result caches."""
+    return get_dedup_store().stats()
 
 
 # --- UI SERVING CONFIGURATION FOR PRODUCTION ---
 UI_BUILD_DIR = Path(__file__).resolve().parent.parent / "ui" / "dist"
 
-# Mount static assets (JS, CSS, images from Vite build)
+# Catch-all route for SPA (must be last, after all API routes). The build is
+# loaded into memory once, with precompressed variants and cache headers.
 if UI_BUILD_DIR.exists():
-    assets_dir = UI_BUILD_DIR / "assets"
-    if assets_dir.exists():
-        app.mount(
-            "/assets",
-            StaticFiles(directory=str(assets_dir)),
-            name="ui-assets"
-        )
-    
-    # Catch-all route for SPA (must be last, after all API routes)
-    @app.get("/{full_path:path}", include_in_schema=False)
-    async def serve_spa(full_path: str):
-        # Don't intercept API routes
-        if full_path.startswith("api/") or full_path.startswith("analyze/"):
-            raise HTTPException(status_code=404, detail="Not found")
-        
-        # Check if requesting a specific file in the build directory
-        file_path = UI_BUILD_DIR / full_path
-        if file_path.is_file() and file_path.exists():
-            return FileResponse(file_path)
-        
-        # Default to index.html for client-side routing
-        index_path = UI_BUILD_DIR / "index.html"
-        if index_path.exists():
-            return FileResponse(index_path)
-        
-        return {"error": "UI not built. Run 'npm run build' in /ui directory"}
+    register_spa_routes(app, UI_BUILD_DIR)
 
 
 if __name__ == "__main__":  # pragma: no cover
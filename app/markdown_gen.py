@@ -15,12 +15,15 @@ def generate_markdown(
     level: int,
     llm_descriptions: Dict[str, str] | None = None,
     visited: Set[str] | None = None,
+    max_invoke_depth: int | None = None,
+    invoke_depth: int = 0,
 ) -> List[str]:
     """
     Generate markdown lines for a workflow, integrating optional LLM descriptions.
 
     This matches the updated design contract where llm_descriptions is optional
     and, when provided, an AI-generated summary is shown beneath the workflow name.
+    Below ``max_invoke_depth`` invoked workflows are only listed by name.
     """
     visited = visited or set()
     if workflow_path in visited:
@@ -36,6 +39,9 @@ def generate_markdown(
     if llm_descriptions and workflow_path in llm_descriptions:
         lines.append(f"{prefix}{INDENT}> {llm_descriptions[workflow_path]}")
 
+    if workflow_data and workflow_data.error:
+        lines.append(f"{prefix}{INDENT}- Parse error: {workflow_data.error}")
+
     if workflow_data and workflow_data.key_activities:
         lines.append(
             f"{prefix}{INDENT}- Key activities: {', '.join(workflow_data.key_activities)}"
@@ -52,6 +58,10 @@ def generate_markdown(
             lines.append(f"{prefix}{INDENT * 3}- {comp}")
 
     if workflow_data and workflow_data.invoked_workflows:
+        if max_invoke_depth is not None and invoke_depth >= max_invoke_depth:
+            names = ", ".join(Path(child).name for child in workflow_data.invoked_workflows)
+            lines.append(f"{prefix}{INDENT}- Invokes: {names}")
+            return lines
         lines.append(f"{prefix}{INDENT}- Invokes:")
         for child in workflow_data.invoked_workflows:
             lines.extend(
@@ -61,12 +71,18 @@ def generate_markdown(
                     level + 2,
                     llm_descriptions=llm_descriptions,
                     visited=visited,
+                    max_invoke_depth=max_invoke_depth,
+                    invoke_depth=invoke_depth + 1,
                 )
             )
     return lines
 
 
-def build_markdown(workflows: Dict[str, WorkflowData], llm_descriptions=None) -> str:
+def build_markdown(
+    workflows: Dict[str, WorkflowData],
+    llm_descriptions=None,
+    max_invoke_depth: int | None = None,
+) -> str:
     """Build a full markdown document for parsed workflows."""
     invoked = {
         target for data in workflows.values() for target in data.invoked_workflows
@@ -84,6 +100,7 @@ def build_markdown(workflows: Dict[str, WorkflowData], llm_descriptions=None) ->
                 level=1,
                 llm_descriptions=llm_descriptions,
                 visited=visited,
+                max_invoke_depth=max_invoke_depth,
             )
         )
         lines.append("")
@@ -92,7 +109,9 @@ def build_markdown(workflows: Dict[str, WorkflowData], llm_descriptions=None) ->
 
 
 def build_sequence_markdown(
-    workflows: Dict[str, WorkflowData], llm_descriptions: Dict[str, str] | None = None
+    workflows: Dict[str, WorkflowData],
+    llm_descriptions: Dict[str, str] | None = None,
+    max_invoke_depth: int | None = None,
 ) -> str:
     """
     Build a Mermaid sequence diagram representing workflow invocations.
@@ -101,6 +120,7 @@ def build_sequence_markdown(
     - Each `InvokeWorkflowFile` becomes a message from caller to callee.
     - Key activities of the callee are included as a note.
     - Optional LLM descriptions are appended in the note.
+    - Invocations deeper than ``max_invoke_depth`` are left out.
     """
     # Determine roots to start traversal (workflows that are not invoked by others)
     invoked = {t for d in workflows.values() for t in d.invoked_workflows}
@@ -126,9 +146,11 @@ def build_sequence_markdown(
 
     visited: Set[str] = set()
 
-    def walk(caller_path: str) -> None:
+    def walk(caller_path: str, depth: int = 0) -> None:
         if caller_path in visited:
             return
+        if max_invoke_depth is not None and depth >= max_invoke_depth:
+            return
         visited.add(caller_path)
         caller = workflows.get(caller_path)
         if not caller:
@@ -151,7 +173,7 @@ def build_sequence_markdown(
                         f"Note over {pname(callee_path)}: "
                         + "\\n".join(note_lines).replace("\n", " ")
                     )
-            walk(callee_path)
+            walk(callee_path, depth + 1)
             lines.append(f"{pname(callee_path)} -->> {pname(caller_path)}: Return")
 
     for root in sorted(roots):
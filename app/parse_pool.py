@@ -0,0 +1,295 @@
+"""
+Isolated XAML parsing in a pool of worker processes.
+
+A malformed or giant file can make the XML parser spin or exhaust memory.
+Parsing it in a worker process with CPU-time and address-space limits keeps
+that failure to the one file, which is reported as a workflow with an
+``error`` while the rest of the project is parsed normally.
+"""
+
+from __future__ import annotations
+
+import signal
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+try:  # pragma: no cover - resource limits are POSIX-only
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+from .cache import Cache
+from .etag import content_checksum
+from .parser import (
+    PARSE_ERRORS,
+    DetailOptions,
+    ParserBackend,
+    WorkflowData,
+    describe_parse_error,
+    failed_workflow,
+    get_parser_backend,
+    locate_workflow,
+    parse_cache_key,
+    parse_workflow_content,
+)
+
+MiB = 1024 * 1024
+
+DEFAULT_MAX_TASKS_PER_CHILD = 100
+DEFAULT_CPU_SECONDS = 30
+DEFAULT_MEMORY_MB = 1024
+# Wall-clock time per file, including time spent waiting for a worker
+DEFAULT_TIMEOUT_SECONDS = 60
+
+WORKER_TERMINATED_ERROR = "Parse worker terminated (CPU or memory limit exceeded)"
+
+# Errors caused by the limits or state of the pool rather than by the file
+# alone; a retry, or a later deploy with other limits, may parse it
+RESOURCE_ERROR_PREFIXES = (
+    "CPU time limit",
+    "Parse timed out",
+    "MemoryError",
+    WORKER_TERMINATED_ERROR,
+)
+
+
+class CPULimitExceeded(Exception):
+    """Raised in a worker when a file uses up its CPU-time budget."""
+
+
+def is_resource_failure(workflow: WorkflowData) -> bool:
+    """Return True for a workflow that failed on a resource limit or a worker crash."""
+    return workflow.error is not None and workflow.error.startswith(RESOURCE_ERROR_PREFIXES)
+
+
+@dataclass(frozen=True)
+class ParsePoolConfig:
+    """Size of the parse worker pool and the limits applied to each file."""
+
+    workers: int = 0
+    max_tasks_per_child: int = DEFAULT_MAX_TASKS_PER_CHILD
+    cpu_seconds: int = DEFAULT_CPU_SECONDS
+    memory_mb: int = DEFAULT_MEMORY_MB
+    timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS
+
+
+def _raise_cpu_limit(signum, frame) -> None:
+    raise CPULimitExceeded()
+
+
+def _init_worker(config: ParsePoolConfig) -> None:
+    """
+    Apply the process-wide limits once per worker.
+
+    The CPU hard limit covers every task the worker may run before it is
+    recycled, so a parse stuck in C code that never sees ``SIGXCPU`` is
+    still killed by the kernel. Workers that are never recycled
+    (``max_tasks_per_child=0``) get no lifetime limit; the wall-clock
+    deadline bounds them instead.
+    """
+    if resource is None:
+        return
+    if config.memory_mb:
+        limit = config.memory_mb * MiB
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if config.cpu_seconds:
+        signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+        budget = resource.RLIM_INFINITY
+        if config.max_tasks_per_child:
+            budget = config.cpu_seconds * (config.max_tasks_per_child + 1)
+        resource.setrlimit(resource.RLIMIT_CPU, (budget, budget))
+
+
+def _cpu_used() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _parse_in_worker(
+    data: bytes, backend_name: str, detail: DetailOptions, cpu_seconds: int
+) -> Tuple[WorkflowData | None, str | None, float]:
+    """Parse one file body, returning ``(workflow, error, seconds)``."""
+    start = time.perf_counter()
+    limited = resource is not None and cpu_seconds > 0
+    if limited:
+        # The soft limit is cumulative for the process, so it is moved to
+        # this task's budget; SIGXCPU then interrupts only this file
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = int(_cpu_used()) + cpu_seconds
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    try:
+        parsed = parse_workflow_content(data, get_parser_backend(backend_name), detail)
+    except CPULimitExceeded:
+        return None, f"CPU time limit of {cpu_seconds}s exceeded", time.perf_counter() - start
+    except PARSE_ERRORS as exc:
+        return None, describe_parse_error(exc), time.perf_counter() - start
+    finally:
+        if limited:
+            resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+    return parsed, None, time.perf_counter() - start
+
+
+class ParsePool:
+    """
+    Parses project files in worker processes recycled after a number of tasks.
+
+    Cache lookups happen in the calling process, so only new file bodies are
+    sent to the workers. A worker that dies (killed for its CPU budget, or
+    crashed) breaks the pool; the files that were in flight are then retried
+    one by one in a fresh pool so the failure is pinned on a single file.
+
+    ``SIGXCPU`` is only handled between bytecodes, so a parse stuck in C code
+    is bounded by a wall-clock deadline instead: when it passes, the workers
+    are killed and the files in flight are retried the same way.
+    """
+
+    def __init__(self, config: ParsePoolConfig) -> None:
+        self.config = config
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.config.workers,
+                    max_tasks_per_child=self.config.max_tasks_per_child or None,
+                    initializer=_init_worker,
+                    initargs=(self.config,),
+                )
+            return self._executor
+
+    def _reset(self, broken: ProcessPoolExecutor, terminate: bool = False) -> None:
+        """
+        Drop a broken executor so the next submission starts a fresh one.
+
+        With ``terminate`` its workers are killed first, since ``shutdown``
+        does not interrupt a task that is still running.
+        """
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        if terminate:
+            for process in list((broken._processes or {}).values()):
+                process.kill()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def _timeout(self) -> float | None:
+        return self.config.timeout_seconds or None
+
+    def _submit(
+        self, data: bytes, backend: ParserBackend, detail: DetailOptions
+    ) -> Tuple[Future, ProcessPoolExecutor]:
+        """Submit one parse, returning the future and the executor running it."""
+        args = (_parse_in_worker, data, backend.name, detail, self.config.cpu_seconds)
+        executor = self._get_executor()
+        try:
+            future = executor.submit(*args)
+        except BrokenProcessPool:
+            self._reset(executor)
+            executor = self._get_executor()
+            future = executor.submit(*args)
+        return future, executor
+
+    def _run_alone(
+        self, data: bytes, backend: ParserBackend, detail: DetailOptions
+    ) -> Tuple[WorkflowData | None, str | None, float]:
+        future, executor = self._submit(data, backend, detail)
+        try:
+            return future.result(timeout=self._timeout)
+        except TimeoutError:
+            self._reset(executor, terminate=True)
+            timeout = self.config.timeout_seconds
+            return None, f"Parse timed out after {timeout}s", float(timeout)
+        except (BrokenProcessPool, CancelledError):
+            self._reset(executor)
+            return None, WORKER_TERMINATED_ERROR, 0.0
+
+    def parse_project(
+        self,
+        extracted_dir: Path,
+        backend: ParserBackend,
+        cache: Cache | None = None,
+        detail: DetailOptions | None = None,
+        timings: Dict[str, float] | None = None,
+    ) -> Dict[str, WorkflowData]:
+        """Parse all XAML files in a directory; see ``parser.parse_project``."""
+        detail = detail or DetailOptions()
+        workflows: Dict[str, WorkflowData] = {}
+        pending: List[Tuple[Path, str, bytes, Future, ProcessPoolExecutor]] = []
+        for xaml_path in extracted_dir.rglob("*.xaml"):
+            relative_path = str(xaml_path.relative_to(extracted_dir))
+            data = xaml_path.read_bytes()
+            checksum = content_checksum(data)
+            parsed = cache.get(parse_cache_key(checksum, detail)) if cache is not None else None
+            if parsed is not None:
+                workflows[relative_path] = locate_workflow(
+                    parsed, xaml_path, extracted_dir, checksum
+                )
+                if timings is not None:
+                    timings[relative_path] = 0.0
+                continue
+            # Keep the rglob order in the result, filled in below
+            workflows[relative_path] = None
+            pending.append((xaml_path, checksum, data, *self._submit(data, backend, detail)))
+
+        broken: List[Tuple[Path, str, bytes]] = []
+        for xaml_path, checksum, data, future, executor in pending:
+            try:
+                result = future.result(timeout=self._timeout)
+            except TimeoutError:
+                self._reset(executor, terminate=True)
+                broken.append((xaml_path, checksum, data))
+                continue
+            except (BrokenProcessPool, CancelledError):
+                self._reset(executor)
+                broken.append((xaml_path, checksum, data))
+                continue
+            self._store(workflows, extracted_dir, xaml_path, checksum, result, cache, detail, timings)
+        for xaml_path, checksum, data in broken:
+            result = self._run_alone(data, backend, detail)
+            self._store(workflows, extracted_dir, xaml_path, checksum, result, cache, detail, timings)
+        return workflows
+
+    @staticmethod
+    def _store(
+        workflows: Dict[str, WorkflowData],
+        base_dir: Path,
+        xaml_path: Path,
+        checksum: str,
+        result: Tuple[WorkflowData | None, str | None, float],
+        cache: Cache | None,
+        detail: DetailOptions,
+        timings: Dict[str, float] | None,
+    ) -> None:
+        parsed, error, seconds = result
+        relative_path = str(xaml_path.relative_to(base_dir))
+        if parsed is None:
+            workflows[relative_path] = failed_workflow(xaml_path, base_dir, checksum, error)
+        else:
+            if cache is not None:
+                cache.put(parse_cache_key(checksum, detail), parsed)
+            workflows[relative_path] = locate_workflow(parsed, xaml_path, base_dir, checksum)
+        if timings is not None:
+            timings[relative_path] = seconds
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+@lru_cache(maxsize=None)
+def get_parse_pool(config: ParsePoolConfig) -> ParsePool | None:
+    """Return the process-wide pool for a config, or None when it has no workers."""
+    return ParsePool(config) if config.workers else None
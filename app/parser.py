@@ -1,12 +1,22 @@
 from __future__ import annotations
 
-import json
 import os
-from dataclasses import dataclass, field
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 from xml.etree import ElementTree
-from zipfile import ZipFile
+from zipfile import ZipFile, ZipInfo
+
+from .cache import Cache
+from .etag import content_checksum
+
+if TYPE_CHECKING:
+    from .parse_pool import ParsePool
 
 
 KEY_ACTIVITY_NAMES = {
@@ -22,6 +32,21 @@ KEY_ACTIVITY_NAMES = {
 }
 
 
+# Bump when parsing output or the WorkflowData schema changes, so cached
+# parses from an older version are not reused
+PARSE_VERSION = "3"
+
+
+@dataclass
+class ActivityRecord:
+    """One activity recorded in a workflow's logic flow."""
+
+    activity_type: str
+    display_name: str | None = None
+    detail: str | None = None
+    selector: str | None = None
+
+
 @dataclass
 class WorkflowData:
     """Represents a parsed UiPath workflow."""
@@ -33,6 +58,10 @@ class WorkflowData:
     logic_flow: List[Tuple[int, str]] = field(default_factory=list)
     components: List[str] = field(default_factory=list)
     raw_xml: str | None = None
+    activities: List[ActivityRecord] = field(default_factory=list)
+    checksum: str | None = None
+    error: str | None = None
+    element_count: int | None = None
 
 
 def get_local_name(tag: str) -> str:
@@ -42,25 +71,168 @@ def get_local_name(tag: str) -> str:
     return tag
 
 
-def safe_extract_archive(archive_path: Path, extract_to: Path) -> Path:
-    """Extract a zip/nupkg archive while preventing path traversal."""
+@dataclass(frozen=True)
+class TagInfo:
+    """Precomputed facts about one namespaced XML tag."""
+
+    local_name: str
+    suffix: str
+    is_key_activity: bool
+    is_logic_activity: bool
+    branch_label: str | None
+    is_skipped_component: bool
+
+
+def describe_tag(tag: str) -> TagInfo:
+    """Compute the descriptor for a full ``{ns}Tag`` string."""
+    if not isinstance(tag, str):
+        # Non-element nodes (e.g. unresolved lxml entities) match nothing
+        return TagInfo("", "", False, False, None, False)
+    local_name = get_local_name(tag)
+    return TagInfo(
+        local_name=local_name,
+        suffix=local_name.split(".")[-1],
+        is_key_activity=local_name in KEY_ACTIVITY_NAMES,
+        is_logic_activity=local_name in LOGIC_ACTIVITY_NAMES,
+        branch_label=_branch_label(local_name),
+        is_skipped_component=local_name in SKIP_COMPONENT_NAMES,
+    )
+
+
+class TagCache(Dict[str, TagInfo]):
+    """
+    Per-parse map from full tag strings to their descriptors.
+
+    A XAML file only uses a few hundred distinct tags, so every descriptor is
+    computed once and all collectors share it.
+    """
+
+    def __missing__(self, tag: str) -> TagInfo:
+        info = describe_tag(tag)
+        self[tag] = info
+        return info
+
+
+class FirstTextIndex(Dict[ElementTree.Element, "str | None"]):
+    """
+    Per-parse memo of the first meaningful text within each element.
+
+    The value for a node is its own stripped text, or else the first value
+    among its children in document order. Values are filled in bottom-up the
+    first time a subtree is asked for, so every node is scanned at most once
+    per parse no matter how many ancestors look up their details.
+    """
+
+    def __missing__(self, element: ElementTree.Element) -> str | None:
+        stack: List[Tuple[ElementTree.Element, bool]] = [(element, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if children_done:
+                text = None
+                for child in node:
+                    text = self[child]
+                    if text:
+                        break
+                self[node] = text
+                continue
+            if node in self:
+                continue
+            own = (node.text or "").strip()
+            if own:
+                self[node] = own
+                continue
+            stack.append((node, True))
+            stack.extend((child, False) for child in node)
+        return self[element]
+
+
+MiB = 1024 * 1024
+
+EXTRACT_CHUNK_SIZE = MiB
+
+# Members smaller than this are exempt from the compression-ratio check
+RATIO_CHECK_MIN_BYTES = MiB
+
+
+class ArchiveLimitError(ValueError):
+    """Raised when an upload or archive exceeds a configured limit."""
+
+
+@dataclass(frozen=True)
+class ArchiveLimits:
+    """Size and count limits enforced on uploaded archives."""
+
+    max_upload_bytes: int = 100 * MiB
+    max_uncompressed_bytes: int = 500 * MiB
+    max_members: int = 10000
+    max_compression_ratio: int = 100
+
+
+def _check_archive_members(
+    members: List[ZipInfo], extract_root: Path, limits: ArchiveLimits
+) -> None:
+    """Validate the central directory before anything is decompressed."""
+    if len(members) > limits.max_members:
+        raise ArchiveLimitError(
+            f"Archive has {len(members)} members (limit {limits.max_members})"
+        )
+    total = 0
+    for member in members:
+        dest_path = (extract_root / member.filename).resolve()
+        if not dest_path.is_relative_to(extract_root):
+            raise ValueError("Archive contains unsafe paths")
+        total += member.file_size
+        if total > limits.max_uncompressed_bytes:
+            raise ArchiveLimitError(
+                f"Archive expands beyond {limits.max_uncompressed_bytes} bytes"
+            )
+        if (
+            member.file_size >= RATIO_CHECK_MIN_BYTES
+            and member.file_size > member.compress_size * limits.max_compression_ratio
+        ):
+            raise ArchiveLimitError(
+                f"Archive member {member.filename!r} exceeds the allowed "
+                f"compression ratio of {limits.max_compression_ratio}"
+            )
+
+
+def safe_extract_archive(
+    archive_path: Path, extract_to: Path, limits: ArchiveLimits | None = None
+) -> Path:
+    """
+    Extract a zip/nupkg archive while preventing path traversal and zip bombs.
+
+    Member count, total uncompressed size and compression ratios are checked
+    against the central directory before extraction starts. Members are then
+    copied in chunks; ``zipfile`` never yields more than a member's declared
+    size, so the directory totals bound what lands on disk.
+    """
+    limits = limits or ArchiveLimits()
     extract_to.mkdir(parents=True, exist_ok=True)
+    extract_root = extract_to.resolve()
     with ZipFile(archive_path) as zf:
-        for member in zf.infolist():
-            dest_path = (extract_to / member.filename).resolve()
-            if not str(dest_path).startswith(str(extract_to.resolve())):
-                raise ValueError("Archive contains unsafe paths")
-        zf.extractall(extract_to)
+        members = zf.infolist()
+        _check_archive_members(members, extract_root, limits)
+        for member in members:
+            dest_path = (extract_root / member.filename).resolve()
+            if member.is_dir():
+                dest_path.mkdir(parents=True, exist_ok=True)
+                continue
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            with zf.open(member) as src, dest_path.open("wb") as dst:
+                shutil.copyfileobj(src, dst, EXTRACT_CHUNK_SIZE)
     return extract_to
 
 
-def _collect_key_activities(element: ElementTree.Element, activities: List[str]) -> None:
+def _collect_key_activities(
+    element: ElementTree.Element, activities: List[str], tags: TagCache
+) -> None:
     """Recursively collect key activity names."""
-    name = get_local_name(element.tag)
-    if name in KEY_ACTIVITY_NAMES:
-        activities.append(element.get("DisplayName") or name)
+    info = tags[element.tag]
+    if info.is_key_activity:
+        activities.append(element.get("DisplayName") or info.local_name)
     for child in element:
-        _collect_key_activities(child, activities)
+        _collect_key_activities(child, activities, tags)
 
 
 SKIP_COMPONENT_NAMES = {
@@ -73,15 +245,23 @@ SKIP_COMPONENT_NAMES = {
 }
 
 
-def _collect_components(element: ElementTree.Element, components: List[str]) -> None:
-    """Recursively collect activity/component display names."""
-    name = get_local_name(element.tag)
+def _collect_components(
+    element: ElementTree.Element,
+    components: List[str],
+    tags: TagCache,
+    limit: int | None = None,
+) -> None:
+    """Recursively collect activity/component display names, up to ``limit``."""
+    if limit is not None and len(components) >= limit:
+        return
+    info = tags[element.tag]
+    name = info.local_name
     display = element.get("DisplayName")
 
     should_include = False
     if display:
         should_include = True
-    elif name not in SKIP_COMPONENT_NAMES and name in LOGIC_ACTIVITY_NAMES:
+    elif not info.is_skipped_component and info.is_logic_activity:
         should_include = True
 
     if should_include:
@@ -91,13 +271,14 @@ def _collect_components(element: ElementTree.Element, components: List[str]) ->
         components.append(label)
 
     for child in element:
-        _collect_components(child, components)
+        _collect_components(child, components, tags, limit)
 
 
-def _find_invoked_workflows(element: ElementTree.Element, workflows: List[str]) -> None:
+def _find_invoked_workflows(
+    element: ElementTree.Element, workflows: List[str], tags: TagCache
+) -> None:
     """Recursively collect invoked workflow file names."""
-    name = get_local_name(element.tag)
-    if name == "InvokeWorkflowFile":
+    if tags[element.tag].local_name == "InvokeWorkflowFile":
         target = (
             element.get("WorkflowFileName")
             or element.get("WorkflowFile")
@@ -106,7 +287,7 @@ def _find_invoked_workflows(element: ElementTree.Element, workflows: List[str])
         if target:
             workflows.append(str(target))
     for child in element:
-        _find_invoked_workflows(child, workflows)
+        _find_invoked_workflows(child, workflows, tags)
 
 
 LOGIC_ACTIVITY_NAMES = KEY_ACTIVITY_NAMES | {
@@ -128,10 +309,15 @@ LOGIC_ACTIVITY_NAMES = KEY_ACTIVITY_NAMES | {
 }
 
 
+BRANCH_LABELS = {"Then", "Else", "Case", "Default"}
+
+DETAIL_CHILD_NAMES = {"Condition", "Expression", "Value", "Text", "Code", "Statement"}
+
+
 def _branch_label(name: str) -> str | None:
     """Return a normalized branch label when applicable."""
     label = name.split(".")[-1]
-    return label if label in {"Then", "Else", "Case", "Default"} else None
+    return label if label in BRANCH_LABELS else None
 
 
 DETAIL_ATTRS = (
@@ -146,29 +332,73 @@ DETAIL_ATTRS = (
 
 MAX_DETAIL_LENGTH = 180
 
-CONFIG_KEYS = {
-    "use_llm",
-    "llm_provider",
-    "api_key",
-    "base_url",
-    "model",
-    "format",
-    "prompt",
-    "use_source",
+
+@dataclass(frozen=True)
+class DetailOptions:
+    """
+    What to extract from each workflow.
+
+    Sections that are switched off or cut by a limit are never collected, so
+    smaller outputs are also cheaper to produce. ``max_invoke_depth`` bounds
+    how deep the invocation tree is expanded when rendering.
+    """
+
+    key_activities: bool = True
+    logic_flow: bool = True
+    components: bool = True
+    max_logic_depth: int | None = None
+    max_components: int | None = None
+    max_invoke_depth: int | None = None
+
+    @property
+    def cache_tag(self) -> str:
+        """Identify the parse-affecting options in cache keys ("" for full detail)."""
+        if self == DetailOptions(max_invoke_depth=self.max_invoke_depth):
+            return ""
+        flags = "".join(
+            "1" if on else "0" for on in (self.key_activities, self.logic_flow, self.components)
+        )
+        return f"{flags}-{self.max_logic_depth}-{self.max_components}"
+
+
+DETAIL_PROFILES = {
+    "outline": DetailOptions(key_activities=False, logic_flow=False, components=False),
+    "standard": DetailOptions(max_logic_depth=3, max_components=25),
+    "full": DetailOptions(),
 }
 
+DEFAULT_DETAIL_PROFILE = "full"
 
-def _filter_config(data: Dict[str, Any]) -> Dict[str, Any]:
-    """Return only recognized configuration keys."""
-    return {k: v for k, v in data.items() if k in CONFIG_KEYS}
+DETAIL_LIMIT_KEYS = ("max_logic_depth", "max_components", "max_invoke_depth")
 
 
-def _extract_logic_detail(element: ElementTree.Element) -> str | None:
-    """Extract a concise detail string from common expression-bearing nodes."""
-    tag_name = get_local_name(element.tag)
+def resolve_detail_options(config: Dict[str, Any]) -> DetailOptions:
+    """
+    Build detail options from the ``detail`` profile and per-section limits.
+
+    Raises ValueError for an unknown profile or a limit that is not a
+    non-negative integer.
+    """
+    profile = str(config.get("detail") or DEFAULT_DETAIL_PROFILE).strip().lower()
+    if profile not in DETAIL_PROFILES:
+        raise ValueError(f"Unknown detail profile: {profile}")
+    limits: Dict[str, int] = {}
+    for key in DETAIL_LIMIT_KEYS:
+        value = config.get(key)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            raise ValueError(f"{key} must be a non-negative integer")
+        limits[key] = value
+    return replace(DETAIL_PROFILES[profile], **limits)
+
 
-    if tag_name == "MultipleAssign":
-        detail = _extract_multiple_assign_detail(element)
+def _extract_logic_detail(
+    element: ElementTree.Element, tags: TagCache, texts: FirstTextIndex
+) -> str | None:
+    """Extract a concise detail string from common expression-bearing nodes."""
+    if tags[element.tag].local_name == "MultipleAssign":
+        detail = _extract_multiple_assign_detail(element, tags, texts)
         if detail:
             return detail
 
@@ -178,17 +408,8 @@ def _extract_logic_detail(element: ElementTree.Element) -> str | None:
             return val.strip()
 
     for child in element:
-        child_name = get_local_name(child.tag).split(".")[-1]
-        if child_name in {"Condition", "Expression", "Value", "Text", "Code", "Statement"}:
-            content = (child.text or "").strip()
-            if not content:
-                for grandchild in child.iter():
-                    if grandchild is child:
-                        continue
-                    candidate = (grandchild.text or "").strip()
-                    if candidate:
-                        content = candidate
-                        break
+        if tags[child.tag].suffix in DETAIL_CHILD_NAMES:
+            content = texts[child]
             if content:
                 return content[:MAX_DETAIL_LENGTH] + (
                     "…" if len(content) > MAX_DETAIL_LENGTH else ""
@@ -196,28 +417,19 @@ def _extract_logic_detail(element: ElementTree.Element) -> str | None:
     return None
 
 
-def _first_text(element: ElementTree.Element) -> str | None:
-    """Return the first meaningful text within an element or its descendants."""
-    if element.text and element.text.strip():
-        return element.text.strip()
-    for child in element.iter():
-        if child is element:
-            continue
-        if child.text and child.text.strip():
-            return child.text.strip()
-    return None
-
-
 def _find_child_text(
-    element: ElementTree.Element, target_names: set[str], max_depth: int = 3
+    element: ElementTree.Element,
+    target_names: set[str],
+    tags: TagCache,
+    texts: FirstTextIndex,
+    max_depth: int = 3,
 ) -> str | None:
     """Find the first text content from matching child names up to a depth."""
     stack: List[Tuple[ElementTree.Element, int]] = [(child, 1) for child in element]
     while stack:
         current, depth = stack.pop()
-        child_name = get_local_name(current.tag).split(".")[-1]
-        if child_name in target_names:
-            text = _first_text(current)
+        if tags[current.tag].suffix in target_names:
+            text = texts[current]
             if text:
                 return text
         if depth < max_depth:
@@ -226,24 +438,26 @@ def _find_child_text(
     return None
 
 
-def _extract_multiple_assign_detail(element: ElementTree.Element) -> str | None:
+def _extract_multiple_assign_detail(
+    element: ElementTree.Element, tags: TagCache, texts: FirstTextIndex
+) -> str | None:
     """Collect assignment pairs within a MultipleAssign activity."""
     assignments: List[str] = []
 
     def _walk(node: ElementTree.Element, is_root: bool = False) -> None:
-        node_name = get_local_name(node.tag).split(".")[-1]
+        node_name = tags[node.tag].suffix
         if not is_root and node_name == "MultipleAssign":
             return
 
         if node_name == "Assign":
             target = node.get("To")
             if not target:
-                target = _find_child_text(node, {"To"}) or "[target]"
+                target = _find_child_text(node, {"To"}, tags, texts) or "[target]"
 
             value = node.get("Value")
             if not value:
                 value = _find_child_text(
-                    node, {"Value", "Expression", "ExpressionText"}
+                    node, {"Value", "Expression", "ExpressionText"}, tags, texts
                 )
 
             if value is None:
@@ -268,121 +482,336 @@ def _extract_multiple_assign_detail(element: ElementTree.Element) -> str | None:
 def _collect_logic_flow(
     element: ElementTree.Element,
     steps: List[Tuple[int, str]],
+    activities: List[ActivityRecord],
+    tags: TagCache,
+    texts: FirstTextIndex,
     depth: int = 0,
     branch_label: str | None = None,
+    record: ActivityRecord | None = None,
+    max_depth: int | None = None,
 ) -> None:
-    """Recursively collect a hierarchical logic flow with branch annotations."""
-    tag_name = get_local_name(element.tag)
+    """
+    Recursively collect a hierarchical logic flow with branch annotations.
+
+    Every recorded step also yields an ActivityRecord. A ``Selector`` found on
+    an unrecorded descendant (such as a ``Target``) is attached to the nearest
+    recorded ancestor. Steps at ``max_depth`` or deeper are not visited.
+    """
+    info = tags[element.tag]
+    tag_name = info.local_name
     display = element.get("DisplayName")
-    should_record = tag_name in LOGIC_ACTIVITY_NAMES or (
-        display is not None and tag_name not in {"Activity"}
+    should_record = info.is_logic_activity or (
+        display is not None and tag_name != "Activity"
     )
 
+    if should_record and max_depth is not None and depth >= max_depth:
+        return
+
     current_depth = depth
     if should_record:
         label = f"{branch_label}: " if branch_label else ""
         text = f"{label}{display or tag_name}"
         if display and display != tag_name:
             text = f"{text} [{tag_name}]"
-        detail = _extract_logic_detail(element)
+        detail = _extract_logic_detail(element, tags, texts)
         if detail:
             text = f"{text}: {detail}"
         steps.append((depth, text))
         current_depth = depth + 1
+        record = ActivityRecord(tag_name, display, detail)
+        activities.append(record)
+
+    selector = element.get("Selector")
+    if selector and record is not None and record.selector is None:
+        record.selector = selector
 
     for child in element:
-        child_name = get_local_name(child.tag)
-        label_name = _branch_label(child_name)
+        label_name = tags[child.tag].branch_label
         if label_name:
             for nested in child:
                 _collect_logic_flow(
-                    nested, steps, current_depth, branch_label=label_name
+                    nested,
+                    steps,
+                    activities,
+                    tags,
+                    texts,
+                    current_depth,
+                    branch_label=label_name,
+                    record=record,
+                    max_depth=max_depth,
                 )
         else:
-            _collect_logic_flow(child, steps, current_depth, branch_label=None)
+            _collect_logic_flow(
+                child,
+                steps,
+                activities,
+                tags,
+                texts,
+                current_depth,
+                record=record,
+                max_depth=max_depth,
+            )
+
+
+class ParserBackend(ABC):
+    """Turns raw XAML bytes into an ElementTree-compatible root element."""
+
+    name = "base"
+
+    @abstractmethod
+    def parse(self, data: bytes) -> ElementTree.Element:
+        """Parse a whole document and return its root element."""
+
+
+class StdlibBackend(ParserBackend):
+    """Default backend built on ``xml.etree.ElementTree``."""
+
+    name = "stdlib"
+
+    def parse(self, data: bytes) -> ElementTree.Element:
+        return ElementTree.fromstring(data)
+
+
+class LxmlBackend(ParserBackend):
+    """
+    Optional C-accelerated backend built on lxml.
+
+    Comments and processing instructions are dropped so the tree matches the
+    stdlib one, ``huge_tree`` lifts libxml2's depth and text-size limits, and
+    entity resolution and network access stay off.
+    """
+
+    name = "lxml"
+
+    def __init__(self) -> None:
+        from lxml import etree
+
+        self._etree = etree
+        # lxml parsers must not be shared between threads
+        self._local = threading.local()
+
+    def _parser(self):
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = self._etree.XMLParser(
+                huge_tree=True,
+                remove_comments=True,
+                remove_pis=True,
+                resolve_entities=False,
+                no_network=True,
+            )
+            self._local.parser = parser
+        return parser
+
+    def parse(self, data: bytes) -> ElementTree.Element:
+        return self._etree.fromstring(data, self._parser())
+
+
+PARSER_BACKENDS = {"stdlib": StdlibBackend, "lxml": LxmlBackend}
+
+DEFAULT_PARSER_BACKEND = "stdlib"
+
+
+@lru_cache(maxsize=None)
+def _backend_instance(name: str) -> ParserBackend:
+    """Create a backend once; ``auto`` falls back to stdlib when lxml is missing."""
+    if name != "auto":
+        return PARSER_BACKENDS[name]()
+    try:
+        return LxmlBackend()
+    except ImportError:
+        return StdlibBackend()
+
+
+def get_parser_backend(name: str | None = None) -> ParserBackend:
+    """
+    Resolve a parser backend by name.
+
+    The name comes from the argument, else ``XAML_PARSER_BACKEND``, else the
+    stdlib default. ``auto`` falls back to the stdlib when lxml is not
+    installed; asking for ``lxml`` explicitly without it raises ValueError.
+    """
+    name = (name or os.getenv("XAML_PARSER_BACKEND") or DEFAULT_PARSER_BACKEND)
+    name = name.strip().lower()
+    if name != "auto" and name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name}")
+    try:
+        return _backend_instance(name)
+    except ImportError:
+        raise ValueError(
+            f"Parser backend {name!r} is not available (pip install lxml, or use 'auto')"
+        ) from None
+
+
+def _decode_xml_text(data: bytes) -> str:
+    """Decode file bytes the way ``Path.read_text`` would (universal newlines)."""
+    text = data.decode("utf-8", errors="ignore")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
 
 
-def parse_workflow(xaml_path: Path, base_dir: Path) -> WorkflowData:
-    """Parse a single XAML file into workflow data."""
-    raw_xml = xaml_path.read_text(encoding="utf-8", errors="ignore")
-    tree = ElementTree.parse(xaml_path)
-    root = tree.getroot()
+def parse_workflow_content(
+    data: bytes,
+    backend: ParserBackend | None = None,
+    detail: DetailOptions | None = None,
+) -> WorkflowData:
+    """
+    Parse XAML bytes into workflow data that does not depend on file location.
+
+    ``path`` is left empty and ``display_name`` is only the root DisplayName,
+    so the result can be shared by every copy of the same file body.
+    """
+    backend = backend or get_parser_backend()
+    detail = detail or DetailOptions()
+    raw_xml = _decode_xml_text(data)
+    root = backend.parse(data)
 
     invoked_workflows: List[str] = []
     key_activities: List[str] = []
     logic_flow: List[Tuple[int, str]] = []
     components: List[str] = []
-
-    _find_invoked_workflows(root, invoked_workflows)
-    _collect_key_activities(root, key_activities)
-    _collect_components(root, components)
-    for child in root:
-        _collect_logic_flow(child, logic_flow)
-
-    relative_path = str(xaml_path.relative_to(base_dir))
-    display_name = root.get("DisplayName") or xaml_path.stem
+    activities: List[ActivityRecord] = []
+    tags = TagCache()
+    texts = FirstTextIndex()
+
+    _find_invoked_workflows(root, invoked_workflows, tags)
+    if detail.key_activities:
+        _collect_key_activities(root, key_activities, tags)
+    if detail.components:
+        _collect_components(root, components, tags, detail.max_components)
+    if detail.logic_flow:
+        for child in root:
+            _collect_logic_flow(
+                child,
+                logic_flow,
+                activities,
+                tags,
+                texts,
+                max_depth=detail.max_logic_depth,
+            )
 
     return WorkflowData(
-        path=relative_path,
-        display_name=display_name,
+        path="",
+        display_name=root.get("DisplayName") or "",
         invoked_workflows=invoked_workflows,
         key_activities=key_activities,
         logic_flow=logic_flow,
         components=components,
         raw_xml=raw_xml,
+        activities=activities,
+        element_count=sum(1 for _ in root.iter()),
+    )
+
+
+# Errors that fail a single file rather than the whole project; lxml's
+# XMLSyntaxError and the stdlib ParseError are both SyntaxErrors
+PARSE_ERRORS = (SyntaxError, ValueError, RecursionError, MemoryError)
+
+
+def describe_parse_error(exc: BaseException) -> str:
+    """Short ``Type: message`` text for a file's ``error`` field."""
+    return f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+
+
+def parse_cache_key(checksum: str, detail: DetailOptions) -> str:
+    """Cache key for a file body parsed with the given detail options."""
+    return f"{checksum}:{detail.cache_tag}" if detail.cache_tag else checksum
+
+
+def locate_workflow(
+    parsed: WorkflowData, xaml_path: Path, base_dir: Path, checksum: str
+) -> WorkflowData:
+    """Attach a location-independent parse to the file it came from."""
+    return replace(
+        parsed,
+        path=str(xaml_path.relative_to(base_dir)),
+        display_name=parsed.display_name or xaml_path.stem,
+        checksum=checksum,
+    )
+
+
+def failed_workflow(xaml_path: Path, base_dir: Path, checksum: str, error: str) -> WorkflowData:
+    """Placeholder for a file that could not be parsed, reported in the output."""
+    return WorkflowData(
+        path=str(xaml_path.relative_to(base_dir)),
+        display_name=xaml_path.stem,
+        invoked_workflows=[],
+        key_activities=[],
+        checksum=checksum,
+        error=error,
     )
 
 
-def parse_project(extracted_dir: Path) -> Dict[str, WorkflowData]:
-    """Parse all XAML files in a directory."""
+def parse_workflow(
+    xaml_path: Path,
+    base_dir: Path,
+    backend: ParserBackend | None = None,
+    cache: Cache | None = None,
+    detail: DetailOptions | None = None,
+) -> WorkflowData:
+    """
+    Parse a single XAML file into workflow data.
+
+    With a ``cache``, the parse of an identical file body (by SHA-256) with
+    the same detail options is reused instead of parsing again. Malformed
+    files yield a workflow whose ``error`` describes the failure.
+    """
+    detail = detail or DetailOptions()
+    data = xaml_path.read_bytes()
+    checksum = content_checksum(data)
+    key = parse_cache_key(checksum, detail)
+    parsed = cache.get(key) if cache is not None else None
+    if parsed is None:
+        try:
+            parsed = parse_workflow_content(data, backend, detail)
+        except PARSE_ERRORS as exc:
+            return failed_workflow(xaml_path, base_dir, checksum, describe_parse_error(exc))
+        if cache is not None:
+            cache.put(key, parsed)
+
+    return locate_workflow(parsed, xaml_path, base_dir, checksum)
+
+
+def parse_project(
+    extracted_dir: Path,
+    backend: ParserBackend | str | None = None,
+    cache: Cache | None = None,
+    detail: DetailOptions | None = None,
+    timings: Dict[str, float] | None = None,
+    pool: "ParsePool | None" = None,
+) -> Dict[str, WorkflowData]:
+    """
+    Parse all XAML files in a directory.
+
+    With a ``cache`` (the ``parse`` namespace of the dedup store), files
+    whose body was parsed before, in this or any other project, are reused.
+    When ``timings`` is given, the wall time of each file is recorded in it.
+    With a ``pool``, files are parsed in isolated worker processes under
+    per-file CPU and memory limits. Files that fail are kept as workflows
+    with an ``error`` instead of failing the project.
+    """
+    if not isinstance(backend, ParserBackend):
+        backend = get_parser_backend(backend)
+    if pool is not None:
+        return pool.parse_project(extracted_dir, backend, cache, detail, timings)
     workflows: Dict[str, WorkflowData] = {}
     for xaml_path in extracted_dir.rglob("*.xaml"):
-        workflows[str(xaml_path.relative_to(extracted_dir))] = parse_workflow(
-            xaml_path, extracted_dir
+        relative_path = str(xaml_path.relative_to(extracted_dir))
+        start = time.perf_counter()
+        workflows[relative_path] = parse_workflow(
+            xaml_path, extracted_dir, backend, cache, detail
         )
+        if timings is not None:
+            timings[relative_path] = time.perf_counter() - start
     return workflows
 
 
-def _env_bool(name: str) -> bool | None:
-    """Return a boolean from an environment variable when set."""
-    raw = os.getenv(name)
-    if raw is None:
-        return None
-    return raw.strip().lower() in {"1", "true", "yes", "on"}
+def load_config(config_input: str | Dict[str, Any] | None) -> dict:
+    """
+    Validate a request's config and merge it over the environment defaults.
 
+    Raises ``settings.ConfigError`` for invalid JSON or values; see
+    ``settings.load_config``.
+    """
+    from .settings import load_config as load_settings_config
 
-def load_config(config_input: str | Dict[str, Any] | None) -> dict:
-    """Safely parse optional JSON config string or dict."""
-    if isinstance(config_input, dict):
-        parsed = dict(config_input)
-    elif config_input:
-        try:
-            parsed = json.loads(config_input)
-        except json.JSONDecodeError:
-            parsed = {}
-    else:
-        parsed = {}
-
-    parsed = _filter_config(parsed) if isinstance(parsed, dict) else {}
-
-    env_defaults = {
-        "use_llm": _env_bool("LLM_USE_LLM") or _env_bool("USE_LLM"),
-        "api_key": os.getenv("LLM_API_KEY") or os.getenv("OPENAI_API_KEY"),
-        "base_url": os.getenv("LLM_BASE_URL") or os.getenv("OPENAI_BASE_URL"),
-        "model": os.getenv("LLM_MODEL") or os.getenv("OPENAI_MODEL"),
-        "format": os.getenv("OUTPUT_FORMAT"),
-        "prompt": os.getenv("LLM_PROMPT"),
-        "use_source": _env_bool("LLM_USE_SOURCE"),
-    }
-
-    config: dict = {}
-    for key, value in env_defaults.items():
-        if value is not None:
-            config[key] = value
-
-    config.update(parsed)
-
-    if config.get("use_llm") and not config.get("base_url"):
-        config["base_url"] = "https://api.openai.com/v1"
-
-    return config
+    return load_settings_config(config_input)
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List
+
+from .parser import WorkflowData
+
+DEFAULT_PROFILE_DIR = Path("data") / "profiles"
+
+TOP_FUNCTIONS = 30
+TOP_ALLOCATORS = 10
+SLOWEST_FILES = 10
+
+# Frames kept per allocation; more frames cost more memory while tracing
+TRACEMALLOC_FRAMES = 1
+
+# Profiling hooks into interpreter-wide state (tracemalloc), so at most one
+# request is profiled at a time
+_active = threading.Lock()
+
+
+class ProfilingUnavailable(Exception):
+    """Raised when a profile is requested but cannot be taken."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def profile_dir() -> Path:
+    return Path(os.getenv("PROFILE_DIR") or DEFAULT_PROFILE_DIR)
+
+
+def check_profile_token(token: str | None) -> None:
+    """Accept only the admin token from ``PROFILING_TOKEN``; profiling is off without it."""
+    expected = os.getenv("PROFILING_TOKEN")
+    if not expected:
+        raise ProfilingUnavailable(403, "Profiling is disabled")
+    if not token or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise ProfilingUnavailable(403, "Invalid profiling token")
+
+
+class RequestProfiler:
+    """
+    cProfile and tracemalloc around the stages of one request.
+
+    Each ``stage`` records wall time, peak traced memory and the top
+    allocation sites still alive at its end; cProfile statistics accumulate
+    over all stages. cProfile only sees the request thread, so time spent in
+    LLM worker threads shows up as waiting in ``enrich_with_llm``.
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.profile_id = uuid.uuid4().hex
+        self.profile = cProfile.Profile()
+        self.stages: List[Dict[str, Any]] = []
+        self.file_timings: Dict[str, float] = {}
+        self.slowest_files: List[Dict[str, Any]] = []
+
+    @classmethod
+    def start(cls, token: str | None) -> "RequestProfiler":
+        """Begin profiling for an authorized request."""
+        check_profile_token(token)
+        if not _active.acquire(blocking=False):
+            raise ProfilingUnavailable(409, "Another request is being profiled")
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        return cls()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        self.profile.enable()
+        try:
+            yield
+        finally:
+            self.profile.disable()
+            elapsed = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)]
+            )
+            self.stages.append(
+                {
+                    "stage": name,
+                    "seconds": round(elapsed, 6),
+                    "peak_bytes": tracemalloc.get_traced_memory()[1],
+                    "top_allocators": [
+                        {
+                            "location": str(stat.traceback),
+                            "bytes": stat.size,
+                            "blocks": stat.count,
+                        }
+                        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATORS]
+                    ],
+                }
+            )
+
+    def record_files(self, extract_dir: Path, workflows: Dict[str, WorkflowData]) -> None:
+        """
+        Keep the slowest files of the last parse, with their size and element count.
+
+        The count comes from the parse itself; files are never re-read as XML
+        here, since the slowest ones may be those that hit the pool's limits.
+        """
+        slowest = sorted(self.file_timings.items(), key=lambda item: item[1], reverse=True)
+        self.slowest_files = [
+            {
+                "path": path,
+                "seconds": round(seconds, 6),
+                "bytes": (extract_dir / path).stat().st_size,
+                "elements": workflows[path].element_count if path in workflows else None,
+            }
+            for path, seconds in slowest[:SLOWEST_FILES]
+        ]
+
+    def _top_functions(self) -> List[Dict[str, Any]]:
+        if not self.stages:
+            return []
+        stats = pstats.Stats(self.profile)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "total_seconds": round(total, 6),
+                "cumulative_seconds": round(cumulative, 6),
+            }
+            for (filename, line, name), (_, calls, total, cumulative, _) in rows[
+                :TOP_FUNCTIONS
+            ]
+        ]
+
+    def finish(self) -> Dict[str, Any]:
+        """Stop tracing, store the artifacts and return the report."""
+        try:
+            tracemalloc.stop()
+            report = {
+                "profile_id": self.profile_id,
+                "created_at": time.time(),
+                "stages": self.stages,
+                "slowest_files": self.slowest_files,
+                "top_functions": self._top_functions(),
+            }
+            directory = profile_dir()
+            directory.mkdir(parents=True, exist_ok=True)
+            self.profile.dump_stats(str(directory / f"{self.profile_id}.pstats"))
+            (directory / f"{self.profile_id}.json").write_text(
+                json.dumps(report, indent=2), encoding="utf-8"
+            )
+        finally:
+            _active.release()
+        return report
+
+
+class NullProfiler:
+    """Stand-in used for requests that are not profiled."""
+
+    enabled = False
+    profile_id = None
+    file_timings = None
+
+    def stage(self, name: str) -> ContextManager[None]:
+        return nullcontext()
+
+    def record_files(self, extract_dir: Path, workflows: Dict[str, WorkflowData]) -> None:
+        pass
+
+    def finish(self) -> Dict[str, Any]:
+        return {}
+
+
+_current: ContextVar[RequestProfiler | NullProfiler] = ContextVar(
+    "request_profiler", default=NullProfiler()
+)
+
+
+def current_profiler() -> RequestProfiler | NullProfiler:
+    """Return the profiler of the request being handled (a no-op one by default)."""
+    return _current.get()
+
+
+def activate(profiler: RequestProfiler) -> None:
+    """Make ``profiler`` the current one for the rest of this request's context."""
+    _current.set(profiler)
+
+
+def artifact_path(profile_id: str, suffix: str) -> Path | None:
+    """Return a stored artifact by id, or None when it does not exist."""
+    try:
+        if uuid.UUID(hex=profile_id).hex != profile_id:
+            return None
+    except ValueError:
+        return None
+    path = profile_dir() / f"{profile_id}{suffix}"
+    return path if path.is_file() else None
@@ -0,0 +1,307 @@
+"""
+Typed service settings, resolved once from the environment.
+
+``Settings`` holds the request defaults taken from environment variables and
+the performance knobs (parse workers, cache sizes, LLM concurrency, upload
+limits) in one place. Per-request config is validated against it and merged
+over the defaults by ``Settings.resolve``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Callable, Dict, Mapping, Sequence
+
+from .cache import CACHE_BACKENDS, EVICTION_POLICIES, CacheConfig
+from .export import EXPORT_FORMATS
+from .parse_pool import ParsePoolConfig
+from .parser import ArchiveLimits, get_parser_backend, resolve_detail_options
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+# Upper bound for the per-request ``llm_concurrency``
+DEFAULT_MAX_LLM_CONCURRENCY = 32
+
+
+class ConfigError(ValueError):
+    """Raised for an invalid per-request config or environment default."""
+
+
+def _check_bool(key: str, value: Any, settings: "Settings") -> Any:
+    if not isinstance(value, bool):
+        raise ConfigError(f"{key} must be a boolean")
+    return value
+
+
+def _check_str(key: str, value: Any, settings: "Settings") -> Any:
+    if not isinstance(value, str):
+        raise ConfigError(f"{key} must be a string")
+    return value
+
+
+def _check_positive_int(key: str, value: Any, settings: "Settings") -> Any:
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ConfigError(f"{key} must be a positive integer")
+    return value
+
+
+def _check_concurrency(key: str, value: Any, settings: "Settings") -> Any:
+    _check_positive_int(key, value, settings)
+    if value > settings.max_llm_concurrency:
+        raise ConfigError(f"{key} must be at most {settings.max_llm_concurrency}")
+    return value
+
+
+def _check_format(key: str, value: Any, settings: "Settings") -> Any:
+    if isinstance(value, str):
+        names = value.split(",")
+    elif isinstance(value, list) and all(isinstance(name, str) for name in value):
+        names = value
+    else:
+        raise ConfigError(f"{key} must be a string or a list of strings")
+    for name in names:
+        name = name.strip().lower()
+        if name and name not in EXPORT_FORMATS:
+            known = ", ".join(EXPORT_FORMATS)
+            raise ConfigError(f"Unknown format: {name} (expected one of {known})")
+    return value
+
+
+def _check_parser_backend(key: str, value: Any, settings: "Settings") -> Any:
+    _check_str(key, value, settings)
+    try:
+        get_parser_backend(value)
+    except ValueError as exc:
+        raise ConfigError(str(exc)) from exc
+    return value
+
+
+def _check_non_negative_int(key: str, value: Any, settings: "Settings") -> Any:
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ConfigError(f"{key} must be a non-negative integer")
+    return value
+
+
+VALIDATORS: Dict[str, Callable[[str, Any, "Settings"], Any]] = {
+    "use_llm": _check_bool,
+    "llm_provider": _check_str,
+    "api_key": _check_str,
+    "base_url": _check_str,
+    "model": _check_str,
+    "format": _check_format,
+    "prompt": _check_str,
+    "use_source": _check_bool,
+    "max_prompt_chars": _check_positive_int,
+    "llm_concurrency": _check_concurrency,
+    "summary_rollup": _check_bool,
+    "parser_backend": _check_parser_backend,
+    "project_id": _check_str,
+    # The profile name is checked against DETAIL_PROFILES by _check_detail
+    "detail": _check_str,
+    "max_logic_depth": _check_non_negative_int,
+    "max_components": _check_non_negative_int,
+    "max_invoke_depth": _check_non_negative_int,
+}
+
+
+def _env_bool(name: str) -> bool | None:
+    """Return a boolean from an environment variable when set."""
+    raw = os.getenv(name)
+    if raw is None:
+        return None
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_int(name: str, minimum: int | None = None) -> int | None:
+    """Return an integer from an environment variable when set."""
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return None
+    try:
+        value = int(raw.strip())
+    except ValueError:
+        raise ConfigError(f"{name} must be an integer") from None
+    if minimum is not None and value < minimum:
+        raise ConfigError(f"{name} must be at least {minimum}")
+    return value
+
+
+def _env_float(name: str) -> float | None:
+    """Return a number from an environment variable when set."""
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return None
+    try:
+        return float(raw.strip())
+    except ValueError:
+        raise ConfigError(f"{name} must be a number") from None
+
+
+def _env_choice(name: str, choices: Sequence[str], default: str) -> str:
+    """Return one of ``choices`` from an environment variable, case-insensitively."""
+    value = (os.getenv(name) or default).strip().lower()
+    if value not in choices:
+        raise ConfigError(f"{name} must be one of {', '.join(choices)}, got {value!r}")
+    return value
+
+
+def _with_env(defaults: Any, **values: Any) -> Any:
+    """Override a config dataclass with the environment values that are set."""
+    return replace(defaults, **{key: value for key, value in values.items() if value is not None})
+
+
+def _archive_limits_from_env() -> ArchiveLimits:
+    """Read the upload limits from ``ARCHIVE_MAX_*`` environment variables."""
+    return _with_env(
+        ArchiveLimits(),
+        max_upload_bytes=_env_int("ARCHIVE_MAX_UPLOAD_BYTES", 1),
+        max_uncompressed_bytes=_env_int("ARCHIVE_MAX_UNCOMPRESSED_BYTES", 1),
+        max_members=_env_int("ARCHIVE_MAX_MEMBERS", 1),
+        max_compression_ratio=_env_int("ARCHIVE_MAX_COMPRESSION_RATIO", 1),
+    )
+
+
+def _cache_config_from_env() -> CacheConfig:
+    """
+    Read the cache config from ``CACHE_*`` environment variables.
+
+    ``CACHE_TTL_SECONDS`` applies to every namespace and
+    ``CACHE_TTL_<NAMESPACE>`` (e.g. ``CACHE_TTL_RENDER``) overrides it.
+    """
+    defaults = CacheConfig()
+    ttl: Dict[str, float] = {}
+    for name in os.environ:
+        value = _env_float(name) if name.startswith("CACHE_TTL_") else None
+        if value is not None:
+            namespace = name[len("CACHE_TTL_"):].lower()
+            ttl["*" if namespace == "seconds" else namespace] = value
+    return _with_env(
+        defaults,
+        backend=_env_choice("CACHE_BACKEND", CACHE_BACKENDS, defaults.backend),
+        namespace=os.getenv("CACHE_NAMESPACE") or None,
+        # 0 is valid and disables the memory and SQLite caches
+        max_entries=_env_int("CACHE_MAX_ENTRIES", 0),
+        max_memory_mb=_env_int("CACHE_MAX_MEMORY_MB", 0),
+        eviction=_env_choice("CACHE_EVICTION", EVICTION_POLICIES, defaults.eviction),
+        path=os.getenv("CACHE_PATH") or None,
+        url=os.getenv("CACHE_URL") or None,
+        ttl=ttl,
+    )
+
+
+def _parse_pool_config_from_env() -> ParsePoolConfig:
+    """
+    Read the parse pool config from ``PARSE_*`` environment variables.
+
+    ``PARSE_WORKERS=0`` (the default) parses in the API process.
+    """
+    return _with_env(
+        ParsePoolConfig(),
+        workers=_env_int("PARSE_WORKERS", 0),
+        max_tasks_per_child=_env_int("PARSE_MAX_TASKS_PER_CHILD", 0),
+        cpu_seconds=_env_int("PARSE_CPU_SECONDS", 0),
+        memory_mb=_env_int("PARSE_MEMORY_MB", 0),
+        timeout_seconds=_env_int("PARSE_TIMEOUT_SECONDS", 0),
+    )
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Environment defaults and performance knobs of one API process."""
+
+    defaults: Mapping[str, Any] = field(default_factory=dict)
+    archive_limits: ArchiveLimits = field(default_factory=ArchiveLimits)
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    parse_pool: ParsePoolConfig = field(default_factory=ParsePoolConfig)
+    max_llm_concurrency: int = DEFAULT_MAX_LLM_CONCURRENCY
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Read and validate every setting; invalid values fail at startup."""
+        env_defaults = {
+            "use_llm": _env_bool("LLM_USE_LLM") or _env_bool("USE_LLM"),
+            "api_key": os.getenv("LLM_API_KEY") or os.getenv("OPENAI_API_KEY"),
+            "base_url": os.getenv("LLM_BASE_URL") or os.getenv("OPENAI_BASE_URL"),
+            "model": os.getenv("LLM_MODEL") or os.getenv("OPENAI_MODEL"),
+            "format": os.getenv("OUTPUT_FORMAT"),
+            "prompt": os.getenv("LLM_PROMPT"),
+            "use_source": _env_bool("LLM_USE_SOURCE"),
+            "max_prompt_chars": _env_int("LLM_MAX_PROMPT_CHARS"),
+            "llm_concurrency": _env_int("LLM_CONCURRENCY"),
+            "summary_rollup": _env_bool("LLM_SUMMARY_ROLLUP"),
+            "parser_backend": os.getenv("XAML_PARSER_BACKEND"),
+            "detail": os.getenv("OUTPUT_DETAIL"),
+        }
+        settings = cls(
+            archive_limits=_archive_limits_from_env(),
+            cache=_cache_config_from_env(),
+            parse_pool=_parse_pool_config_from_env(),
+            max_llm_concurrency=_env_int("LLM_MAX_CONCURRENCY") or DEFAULT_MAX_LLM_CONCURRENCY,
+        )
+        defaults = settings.validate(env_defaults)
+        _check_detail(defaults)
+        return replace(settings, defaults=defaults)
+
+    def validate(self, config: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Type-check a config, dropping ``None`` values.
+
+        Raises ``ConfigError`` listing unknown keys, or naming the first
+        invalid value.
+        """
+        unknown = sorted(key for key in config if key not in VALIDATORS)
+        if unknown:
+            raise ConfigError(f"Unknown config keys: {', '.join(unknown)}")
+        return {
+            key: VALIDATORS[key](key, value, self)
+            for key, value in config.items()
+            if value is not None
+        }
+
+    def resolve(self, overrides: Mapping[str, Any] | None = None) -> dict:
+        """Merge validated per-request overrides over the environment defaults."""
+        config = dict(self.defaults)
+        if overrides:
+            config.update(self.validate(overrides))
+            _check_detail(config)
+        if config.get("use_llm") and not config.get("base_url"):
+            config["base_url"] = DEFAULT_BASE_URL
+        return config
+
+
+def _check_detail(config: Mapping[str, Any]) -> None:
+    try:
+        detail = resolve_detail_options(config)
+    except ValueError as exc:
+        raise ConfigError(str(exc)) from exc
+    # Index rows come from the logic-flow walk, which a reduced profile cuts
+    if config.get("project_id") and detail.cache_tag:
+        raise ConfigError("project_id requires the full detail profile without section limits")
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, read from the environment once."""
+    return Settings.from_env()
+
+
+def parse_config_input(config_input: str | Mapping[str, Any] | None) -> Dict[str, Any]:
+    """Decode the ``config`` form field or body value into a dict."""
+    if config_input is None or config_input == "":
+        return {}
+    if isinstance(config_input, str):
+        try:
+            config_input = json.loads(config_input)
+        except json.JSONDecodeError as exc:
+            raise ConfigError(f"config is not valid JSON: {exc.msg}") from exc
+    if not isinstance(config_input, Mapping):
+        raise ConfigError("config must be a JSON object")
+    return dict(config_input)
+
+
+def load_config(config_input: str | Mapping[str, Any] | None) -> dict:
+    """Validate a request's config and merge it over the environment defaults."""
+    return get_settings().resolve(parse_config_input(config_input))
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Dict
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+from .compression import (
+    COMPRESSIBLE_TYPES,
+    available_encodings,
+    compress_bytes,
+    negotiate_encoding,
+)
+from .etag import etag_matches
+
+# Vite emits content-hashed file names under assets/, so they never change
+HASHED_ASSET_PREFIX = "assets/"
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+SHORT_CACHE = "public, max-age=3600"
+REVALIDATE_CACHE = "no-cache"
+
+# Files above this are streamed from disk instead of being held in memory
+MAX_IN_MEMORY_BYTES = 4 * 1024 * 1024
+
+PRECOMPRESSED_SUFFIXES = {".br": "br", ".gz": "gzip"}
+
+# Encodings in order of preference when a client accepts several
+ENCODING_PREFERENCE = ["br", "gzip"]
+
+API_PREFIXES = ("api/", "analyze/")
+
+
+@dataclass
+class StaticAsset:
+    """One file of the UI build with its headers and encoded variants."""
+
+    path: Path
+    content_type: str
+    etag: str
+    cache_control: str
+    body: bytes | None = None
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+
+class StaticManifest:
+    """
+    In-memory manifest of the built UI.
+
+    The build directory is walked once. Every file is read, hashed for its
+    ETag and, when compressible, stored with gzip/brotli variants (taken from
+    ``.gz``/``.br`` siblings when the build produced them, otherwise
+    compressed here). Requests are then answered without touching the disk.
+    """
+
+    def __init__(self, dist_dir: Path) -> None:
+        self.dist_dir = dist_dir.resolve()
+        self.assets: Dict[str, StaticAsset] = {}
+        for file_path in sorted(self.dist_dir.rglob("*")):
+            if not file_path.is_file() or file_path.suffix in PRECOMPRESSED_SUFFIXES:
+                continue
+            rel = file_path.relative_to(self.dist_dir).as_posix()
+            self.assets[rel] = self._load(rel, file_path)
+        self.index = self.assets.get("index.html")
+
+    def _load(self, rel: str, file_path: Path) -> StaticAsset:
+        """Read one file and prepare its encoded variants."""
+        content_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        if rel.startswith(HASHED_ASSET_PREFIX):
+            cache_control = IMMUTABLE_CACHE
+        elif rel == "index.html":
+            cache_control = REVALIDATE_CACHE
+        else:
+            cache_control = SHORT_CACHE
+
+        data = file_path.read_bytes()
+        asset = StaticAsset(
+            path=file_path,
+            content_type=content_type,
+            etag=f'"{hashlib.sha256(data).hexdigest()[:32]}"',
+            cache_control=cache_control,
+        )
+        if len(data) > MAX_IN_MEMORY_BYTES:
+            return asset
+        asset.body = data
+
+        for suffix, encoding in PRECOMPRESSED_SUFFIXES.items():
+            sibling = file_path.with_name(file_path.name + suffix)
+            if sibling.is_file():
+                asset.variants[encoding] = sibling.read_bytes()
+        if content_type.startswith(COMPRESSIBLE_TYPES):
+            for encoding in available_encodings():
+                if encoding not in asset.variants:
+                    asset.variants[encoding] = compress_bytes(data, encoding)
+        # Keep only variants that are actually smaller
+        asset.variants = {
+            encoding: body
+            for encoding, body in asset.variants.items()
+            if len(body) < len(data)
+        }
+        return asset
+
+    def lookup(self, url_path: str) -> StaticAsset | None:
+        """Return the asset for a URL path, falling back to index.html for routes."""
+        rel = PurePosixPath(url_path.lstrip("/")).as_posix()
+        if rel in self.assets:
+            return self.assets[rel]
+        # A missing hashed asset is a stale reference, not a client-side route
+        if rel.startswith(HASHED_ASSET_PREFIX):
+            return None
+        return self.index
+
+    def respond(self, asset: StaticAsset, request: Request) -> Response:
+        """Serve an asset, honoring If-None-Match and Accept-Encoding."""
+        offered = [e for e in ENCODING_PREFERENCE if e in asset.variants]
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"), offered)
+        # An encoded variant is not byte-identical to the file, so its ETag is weak
+        etag = f"W/{asset.etag}" if encoding else asset.etag
+        headers = {"ETag": etag, "Cache-Control": asset.cache_control}
+        if asset.variants:
+            headers["Vary"] = "Accept-Encoding"
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        if asset.body is None:
+            return FileResponse(asset.path, media_type=asset.content_type, headers=headers)
+
+        body = asset.body
+        if encoding:
+            body = asset.variants[encoding]
+            headers["Content-Encoding"] = encoding
+        return Response(body, media_type=asset.content_type, headers=headers)
+
+
+def register_spa_routes(app: FastAPI, dist_dir: Path) -> StaticManifest:
+    """Build the manifest and add the SPA catch-all route (register it last)."""
+    manifest = StaticManifest(dist_dir)
+
+    @app.get("/{full_path:path}", include_in_schema=False)
+    async def serve_spa(full_path: str, request: Request):
+        # Don't intercept API routes
+        if full_path.startswith(API_PREFIXES):
+            raise HTTPException(status_code=404, detail="Not found")
+        asset = manifest.lookup(full_path)
+        if asset is None and full_path.startswith(HASHED_ASSET_PREFIX):
+            raise HTTPException(status_code=404, detail="Not found")
+        if asset is None:
+            return {"error": "UI not built. Run 'npm run build' in /ui directory"}
+        return manifest.respond(asset, request)
+
+    return manifest
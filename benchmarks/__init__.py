@@ -0,0 +1 @@
+"""Benchmarks and load-generation helpers (not shipped with the app)."""
@@ -0,0 +1,130 @@
+"""
+Parser microbenchmarks.
+
+Run with ``python -m benchmarks.bench_parser``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from xml.etree import ElementTree
+
+from app.dedup import DedupStore
+from app.parser import PARSER_BACKENDS, TagCache, describe_tag, parse_project, parse_workflow
+
+from .synthetic import deep_nesting_xaml, workflow_xaml, write_project
+
+
+def _best_of(repeat: int, func) -> float:
+    """Return the fastest wall time of ``repeat`` calls."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_tag_lookup(root: ElementTree.Element, repeat: int) -> None:
+    """Compare per-node descriptor computation with cached lookups."""
+    elements = list(root.iter())
+
+    def uncached() -> None:
+        for element in elements:
+            describe_tag(element.tag)
+
+    def cached() -> None:
+        tags = TagCache()
+        for element in elements:
+            tags[element.tag]
+
+    nodes = len(elements)
+    base = _best_of(repeat, uncached)
+    fast = _best_of(repeat, cached)
+    print(f"tag descriptors: {nodes} nodes, {len({e.tag for e in elements})} distinct tags")
+    print(f"  recomputed per node: {base / nodes * 1e9:8.1f} ns/node")
+    print(f"  tag cache lookup:    {fast / nodes * 1e9:8.1f} ns/node")
+
+
+def bench_parse(path: Path, nodes: int, repeat: int) -> None:
+    """Time a full ``parse_workflow`` call with every available backend."""
+    for name, backend_cls in PARSER_BACKENDS.items():
+        try:
+            backend = backend_cls()
+        except ImportError:
+            print(f"parse_workflow [{name}]: not installed")
+            continue
+        data = path.read_bytes()
+        tree_only = _best_of(repeat, lambda: backend.parse(data))
+        elapsed = _best_of(repeat, lambda: parse_workflow(path, path.parent, backend))
+        print(
+            f"parse_workflow [{name}]: {elapsed * 1000:8.1f} ms total "
+            f"({tree_only * 1000:.1f} ms building the tree), "
+            f"{elapsed / nodes * 1e6:6.2f} us/node"
+        )
+
+
+def bench_deep_nesting(tmpdir: Path, depths: list[int], repeat: int) -> None:
+    """Show per-node cost on pathological nesting; it stays flat when linear."""
+    print("deep nesting (nested Assign.Value chains):")
+    for depth in depths:
+        path = tmpdir / f"Deep{depth}.xaml"
+        path.write_text(deep_nesting_xaml(depth), encoding="utf-8")
+        nodes = sum(1 for _ in ElementTree.parse(path).getroot().iter())
+        elapsed = _best_of(repeat, lambda: parse_workflow(path, tmpdir))
+        print(
+            f"  depth {depth:4d}: {elapsed * 1000:8.2f} ms, "
+            f"{elapsed / nodes * 1e6:6.2f} us/node"
+        )
+
+
+def bench_dedup(tmpdir: Path, workflows: int) -> None:
+    """Compare a second project sharing every file body with a cold parse."""
+    first, second = tmpdir / "ProjectA", tmpdir / "ProjectB"
+    write_project(first, workflows=workflows)
+    write_project(second, workflows=workflows)
+    store = DedupStore().workflows
+
+    start = time.perf_counter()
+    parse_project(first, cache=store)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    parse_project(second, cache=store)
+    warm = time.perf_counter() - start
+    print(f"project of {workflows} shared workflows:")
+    print(f"  first project (cold):     {cold * 1000:8.1f} ms")
+    print(f"  second project (deduped): {warm * 1000:8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=400, help="top-level activities")
+    parser.add_argument("--depth", type=int, default=5, help="container nesting depth")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workflows", type=int, default=200, help="project size for dedup")
+    parser.add_argument(
+        "--deep",
+        default="50,100,200",
+        help="comma-separated nesting depths for the pathological case",
+    )
+    args = parser.parse_args()
+
+    xaml = workflow_xaml("Large", args.steps, [], max_depth=args.depth)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "Large.xaml"
+        path.write_text(xaml, encoding="utf-8")
+        root = ElementTree.parse(path).getroot()
+        nodes = sum(1 for _ in root.iter())
+        print(f"file size: {len(xaml) / 1024:.0f} KiB")
+        bench_tag_lookup(root, args.repeat)
+        bench_parse(path, nodes, args.repeat)
+        depths = [int(value) for value in args.deep.split(",") if value]
+        bench_deep_nesting(Path(tmpdir), depths, args.repeat)
+        bench_dedup(Path(tmpdir), args.workflows)
+
+
+if __name__ == "__main__":
+    main()
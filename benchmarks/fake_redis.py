@@ -0,0 +1,117 @@
+"""
+In-memory stand-in for a Redis server.
+
+Speaks enough of the RESP protocol (PING, GET, SET with EX/PX, DEL, DBSIZE,
+FLUSHDB, SELECT, AUTH) to run the ``redis`` cache backend locally and in
+tests without a real server. Run with ``python -m benchmarks.fake_redis``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """Threaded TCP server sharing one dict of ``key -> (value, expires_at)``."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int] = ("127.0.0.1", 0)) -> None:
+        super().__init__(address, _RESPHandler)
+        self.data: Dict[bytes, Tuple[bytes, float | None]] = {}
+        self.lock = threading.Lock()
+        self.commands: List[str] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "FakeRedisServer":
+        """Serve from a daemon thread and return self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def execute(self, args: List[bytes]) -> Any:
+        command = args[0].decode().upper()
+        self.commands.append(command)
+        with self.lock:
+            if command == "PING":
+                return "PONG"
+            if command in {"AUTH", "SELECT"}:
+                return "OK"
+            if command == "GET":
+                entry = self.data.get(args[1])
+                if entry and entry[1] is not None and entry[1] <= time.time():
+                    del self.data[args[1]]
+                    entry = None
+                return entry[0] if entry else None
+            if command == "SET":
+                expires_at = None
+                options = [arg.decode().upper() for arg in args[3:]]
+                if "PX" in options:
+                    expires_at = time.time() + int(options[options.index("PX") + 1]) / 1000
+                elif "EX" in options:
+                    expires_at = time.time() + int(options[options.index("EX") + 1])
+                self.data[args[1]] = (args[2], expires_at)
+                return "OK"
+            if command == "DEL":
+                return sum(self.data.pop(key, None) is not None for key in args[1:])
+            if command == "DBSIZE":
+                return len(self.data)
+            if command == "FLUSHDB":
+                self.data.clear()
+                return "OK"
+        return RuntimeError(f"ERR unknown command '{command}'")
+
+
+class _RESPHandler(socketserver.StreamRequestHandler):
+    server: FakeRedisServer
+
+    def handle(self) -> None:
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            self.wfile.write(_encode(self.server.execute(args)))
+
+    def _read_command(self) -> List[bytes] | None:
+        line = self.rfile.readline()
+        if not line.startswith(b"*"):
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+
+def _encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RuntimeError):
+        return b"-%s\r\n" % str(value).encode()
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    server = FakeRedisServer((args.host, args.port))
+    print(f"fake redis listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
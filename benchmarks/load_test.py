@@ -0,0 +1,421 @@
+"""
+Load test for the HTTP API.
+
+Starts the app under uvicorn together with a stub OpenAI-compatible server,
+drives a mix of ``/analyze/upload/`` and ``/api/workflows/ingest`` requests
+built from synthetic projects, and reports latency percentiles, throughput,
+error rate and server memory.
+
+Run with ``python -m benchmarks.load_test --concurrency 8 --requests 200 --llm both``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import httpx
+
+from .stub_llm import StubLLMServer
+from .synthetic import project_files, project_zip
+
+ENDPOINTS = {"upload": "/analyze/upload/", "ingest": "/api/workflows/ingest"}
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class Sample:
+    """Outcome of one request."""
+
+    kind: str
+    seconds: float
+    status: int | None
+    error: str | None = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None or self.status is None or self.status >= 400
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Parse ``upload=3,ingest=1`` into request weights."""
+    mix: Dict[str, int] = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in ENDPOINTS:
+            raise ValueError(f"Unknown request kind: {kind}")
+        mix[kind] = int(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("The request mix needs at least one positive weight")
+    return mix
+
+
+def build_requests(
+    kind: str, variants: int, workflows: int, steps: int, config: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Build httpx request arguments for ``variants`` distinct synthetic projects.
+
+    Distinct seeds keep file bodies apart, so the dedup caches do not turn
+    repeated requests into cache hits unless the server is run warm.
+    """
+    requests: List[Dict[str, Any]] = []
+    for seed in range(variants):
+        if kind == "upload":
+            archive = project_zip(workflows=workflows, steps=steps, seed=seed)
+            requests.append(
+                {
+                    "url": ENDPOINTS[kind],
+                    "files": {"file": ("project.zip", archive, "application/zip")},
+                    "data": {"config": json.dumps(config)},
+                }
+            )
+        else:
+            files = [
+                {"path": path, "size": len(content), "checksum": "", "content": content}
+                for path, content in project_files(
+                    workflows=workflows, steps=steps, seed=seed
+                ).items()
+            ]
+            requests.append({"url": ENDPOINTS[kind], "json": {"files": files, "config": config}})
+    return requests
+
+
+def schedule(mix: Dict[str, int], total: int, seed: int = 0) -> List[str]:
+    """Return ``total`` request kinds drawn with the mix weights, reproducibly."""
+    rng = random.Random(seed)
+    kinds = [kind for kind, weight in mix.items() if weight > 0]
+    weights = [mix[kind] for kind in kinds]
+    return rng.choices(kinds, weights, k=total)
+
+
+async def drive(
+    base_url: str,
+    plan: List[str],
+    requests: Dict[str, List[Dict[str, Any]]],
+    concurrency: int,
+    timeout: float,
+) -> List[Sample]:
+    """Send the planned requests with at most ``concurrency`` in flight."""
+    samples: List[Sample] = []
+    queue: Iterator[Tuple[int, str]] = iter(enumerate(plan))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        for index, kind in queue:
+            variants = requests[kind]
+            start = time.perf_counter()
+            try:
+                response = await client.post(**variants[index % len(variants)])
+                samples.append(Sample(kind, time.perf_counter() - start, response.status_code))
+            except httpx.HTTPError as exc:
+                samples.append(
+                    Sample(kind, time.perf_counter() - start, None, type(exc).__name__)
+                )
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return samples
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(-(-pct * len(ordered) // 100)), 1)
+    return ordered[rank - 1]
+
+
+def _stats(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    latencies = [sample.seconds for sample in samples]
+    errors = sum(sample.failed for sample in samples)
+    stats: Dict[str, Any] = {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+    }
+    for pct in PERCENTILES:
+        stats[f"p{pct}_ms"] = round(percentile(latencies, pct) * 1000, 1)
+    return stats
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    """Overall and per-endpoint statistics for one run."""
+    kinds = sorted({sample.kind for sample in samples})
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "overall": _stats(samples, elapsed),
+        "by_kind": {
+            kind: _stats([sample for sample in samples if sample.kind == kind], elapsed)
+            for kind in kinds
+        },
+    }
+
+
+def _process_tree(pid: int) -> List[int]:
+    pids = [pid]
+    for task in Path(f"/proc/{pid}/task").glob("*/children"):
+        try:
+            children = task.read_text().split()
+        except OSError:
+            continue
+        for child in children:
+            pids.extend(_process_tree(int(child)))
+    return pids
+
+
+def rss_bytes(pid: int) -> int | None:
+    """Resident memory of a process and its children, or None off Linux."""
+    total = 0
+    for member in _process_tree(pid):
+        try:
+            status = Path(f"/proc/{member}/status").read_text()
+        except OSError:
+            if member == pid:
+                return None
+            continue
+        for line in status.splitlines():
+            if line.startswith("VmRSS:"):
+                total += int(line.split()[1]) * 1024
+    return total
+
+
+class MemorySampler:
+    """Polls the server's resident memory in the background and keeps the peak."""
+
+    def __init__(self, pid: int, interval: float = 0.1) -> None:
+        self.pid = pid
+        self.interval = interval
+        self.peak: int | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            current = rss_bytes(self.pid)
+            if current is not None and (self.peak is None or current > self.peak):
+                self.peak = current
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "MemorySampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# Server environment without the dedup caches, so every request does the work
+COLD_CACHE_ENV = {"CACHE_MAX_ENTRIES": "0"}
+
+
+class AppServer:
+    """The API running under uvicorn in a child process."""
+
+    def __init__(self, env: Dict[str, str], workers: int = 1) -> None:
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", "127.0.0.1", "--port", str(self.port),
+                "--workers", str(workers), "--log-level", "warning",
+            ],
+            env={**os.environ, **env},
+        )
+
+    def wait_ready(self, timeout: float = 30.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("The API server exited during startup")
+            try:
+                httpx.get(f"{self.url}/api/cache/stats", timeout=1.0)
+                return
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        raise RuntimeError("The API server did not become ready")
+
+    def close(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def run_phase(
+    server_url: str,
+    pid: int | None,
+    mix: Dict[str, int],
+    total: int,
+    concurrency: int,
+    requests: Dict[str, List[Dict[str, Any]]],
+    timeout: float,
+) -> Dict[str, Any]:
+    """Run one load phase and return its report."""
+    plan = schedule(mix, total)
+    rss_before = rss_bytes(pid) if pid else None
+    start = time.perf_counter()
+    if pid:
+        with MemorySampler(pid) as sampler:
+            samples = asyncio.run(drive(server_url, plan, requests, concurrency, timeout))
+        peak = sampler.peak
+    else:
+        samples = asyncio.run(drive(server_url, plan, requests, concurrency, timeout))
+        peak = None
+    report = summarize(samples, time.perf_counter() - start)
+    report["concurrency"] = concurrency
+    report["rss_before_bytes"] = rss_before
+    report["rss_peak_bytes"] = peak
+    return report
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Describe regressions of p95 latency, throughput or error rate against a baseline."""
+    problems: List[str] = []
+    for phase, current in report["phases"].items():
+        previous = baseline.get("phases", {}).get(phase)
+        if not previous:
+            continue
+        now, then = current["overall"], previous["overall"]
+        if now["p95_ms"] > then["p95_ms"] * (1 + tolerance):
+            problems.append(f"{phase}: p95 {then['p95_ms']} ms -> {now['p95_ms']} ms")
+        if now["throughput_rps"] < then["throughput_rps"] * (1 - tolerance):
+            problems.append(
+                f"{phase}: throughput {then['throughput_rps']} -> {now['throughput_rps']} req/s"
+            )
+        if now["error_rate"] > then["error_rate"] + tolerance / 10:
+            problems.append(f"{phase}: error rate {then['error_rate']} -> {now['error_rate']}")
+    return problems
+
+
+def _mib(value: int | None) -> str:
+    return "n/a" if value is None else f"{value / (1024 * 1024):.0f} MiB"
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines: List[str] = []
+    for phase, result in report["phases"].items():
+        lines.append(
+            f"{phase}: concurrency {result['concurrency']}, "
+            f"{result['elapsed_seconds']:.2f}s, "
+            f"memory {_mib(result['rss_before_bytes'])} -> peak {_mib(result['rss_peak_bytes'])}"
+        )
+        if "llm" in result:
+            llm = result["llm"]
+            lines.append(f"  stub LLM: {llm['requests']} completions, {llm['errors']} failed")
+        rows = [("overall", result["overall"]), *result["by_kind"].items()]
+        for name, stats in rows:
+            lines.append(
+                f"  {name:<8} {stats['requests']:>5} req  {stats['throughput_rps']:>7.2f} req/s  "
+                f"p50 {stats['p50_ms']:>7.1f}  p95 {stats['p95_ms']:>7.1f}  "
+                f"p99 {stats['p99_ms']:>7.1f} ms  errors {stats['error_rate']:.1%}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100, help="requests per phase")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--mix", default="upload=1,ingest=1", help="request weights")
+    parser.add_argument("--llm", choices=("off", "on", "both"), default="off")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per completion")
+    parser.add_argument("--llm-jitter", type=float, default=0.05)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--workflows", type=int, default=20, help="workflows per project")
+    parser.add_argument("--steps", type=int, default=20, help="top-level activities per workflow")
+    parser.add_argument("--variants", type=int, default=8, help="distinct projects per endpoint")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds per request")
+    parser.add_argument(
+        "--warm-cache", action="store_true", help="keep the dedup caches enabled on the server"
+    )
+    parser.add_argument("--uvicorn-workers", type=int, default=1)
+    parser.add_argument(
+        "--env", action="append", default=[], metavar="NAME=VALUE",
+        help="extra server environment, e.g. PARSE_WORKERS=2",
+    )
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--json", type=Path, help="write the report to this file")
+    parser.add_argument("--baseline", type=Path, help="fail on regressions against this report")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    env = dict(item.split("=", 1) for item in args.env)
+    if not args.warm_cache:
+        env = {**COLD_CACHE_ENV, **env}
+    phases = {"off": ["no_llm"], "on": ["llm"], "both": ["no_llm", "llm"]}[args.llm]
+
+    stub = StubLLMServer(
+        latency=args.llm_latency, jitter=args.llm_jitter, error_rate=args.llm_error_rate, seed=0
+    ).start()
+    settings = {key: value for key, value in vars(args).items() if key not in {"json", "baseline"}}
+    report: Dict[str, Any] = {"settings": settings, "phases": {}}
+    server = None if args.url else AppServer(env, args.uvicorn_workers)
+    try:
+        if server:
+            server.wait_ready()
+        url = args.url or server.url
+        pid = server.process.pid if server else None
+        for phase in phases:
+            config: Dict[str, Any] = {"use_llm": False}
+            if phase == "llm":
+                config = {"use_llm": True, "api_key": "stub", "base_url": stub.url}
+            requests = {
+                kind: build_requests(kind, args.variants, args.workflows, args.steps, config)
+                for kind, weight in mix.items()
+                if weight
+            }
+            completions, failures = stub.requests, stub.errors
+            result = run_phase(
+                url, pid, mix, args.requests, args.concurrency, requests, args.timeout
+            )
+            if phase == "llm":
+                result["llm"] = {
+                    "requests": stub.requests - completions,
+                    "errors": stub.errors - failures,
+                }
+            report["phases"][phase] = result
+    finally:
+        if server:
+            server.close()
+        stub.shutdown()
+
+    print(format_report(report))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    if args.baseline:
+        problems = compare(
+            report, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance
+        )
+        for problem in problems:
+            print(f"regression: {problem}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Stub OpenAI-compatible chat completions server.
+
+Answers ``POST /v1/chat/completions`` with a canned summary after a
+configurable latency, and fails a configurable share of requests with a
+``500``, so LLM enrichment can be load-tested without a real provider.
+Run with ``python -m benchmarks.stub_llm --latency 0.5 --error-rate 0.05``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    """Threaded HTTP server counting the completions it answered and failed."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        super().__init__(address, _CompletionHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as the ``base_url`` of an OpenAI client."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubLLMServer":
+        """Serve from a daemon thread and return self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def next_outcome(self) -> Tuple[float, bool]:
+        """Return ``(delay, fail)`` for the next request."""
+        with self.lock:
+            self.requests += 1
+            delay = max(self.latency + self.rng.uniform(-self.jitter, self.jitter), 0.0)
+            fail = self.rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+
+class _CompletionHandler(BaseHTTPRequestHandler):
+    server: StubLLMServer
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._reply(404, {"error": {"message": "not found"}})
+            return
+        delay, fail = self.server.next_outcome()
+        time.sleep(delay)
+        if fail:
+            self._reply(500, {"error": {"message": "stub failure", "type": "server_error"}})
+            return
+        request = json.loads(body or b"{}")
+        self._reply(
+            200,
+            {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {
+                            "role": "assistant",
+                            "content": "Stub summary of the workflow.",
+                        },
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            },
+        )
+
+    def _reply(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 500 replies")
+    args = parser.parse_args()
+    server = StubLLMServer(
+        (args.host, args.port), args.latency, args.jitter, args.error_rate
+    )
+    print(f"stub LLM listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
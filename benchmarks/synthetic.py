@@ -0,0 +1,119 @@
+"""Generate synthetic UiPath projects for benchmarks and load tests."""
+
+from __future__ import annotations
+
+import random
+from io import BytesIO
+from pathlib import Path
+from typing import Dict
+from zipfile import ZIP_DEFLATED, ZipFile
+
+XAML_HEADER = (
+    '<?xml version="1.0" encoding="utf-8"?>\n'
+    '<Activity x:Class="{name}" '
+    'xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities" '
+    'xmlns:s="clr-namespace:System;assembly=mscorlib" '
+    'xmlns:ui="http://schemas.uipath.com/workflow/activities" '
+    'xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">\n'
+)
+
+
+def _activity(rng: random.Random, index: int, depth: int, max_depth: int) -> str:
+    """Return one randomly chosen activity, nesting containers up to max_depth."""
+    kind = rng.choice(("Assign", "Click", "TypeInto", "If", "Sequence", "ForEach"))
+    if depth >= max_depth or kind in {"Assign", "Click", "TypeInto"}:
+        if kind == "Assign":
+            return (
+                f'<ui:Assign DisplayName="Assign {index}">'
+                f"<ui:Assign.To><OutArgument>[value_{index}]</OutArgument></ui:Assign.To>"
+                f"<ui:Assign.Value><InArgument>value_{index} + 1</InArgument></ui:Assign.Value>"
+                "</ui:Assign>"
+            )
+        return (
+            f'<ui:{kind} DisplayName="{kind} {index}">'
+            f'<ui:{kind}.Target><ui:Target Selector="&lt;webctrl id=\'field{index}\' /&gt;" />'
+            f"</ui:{kind}.Target></ui:{kind}>"
+        )
+    children = "".join(
+        _activity(rng, index * 10 + i, depth + 1, max_depth) for i in range(2)
+    )
+    if kind == "If":
+        return (
+            f'<If DisplayName="If {index}">'
+            f"<If.Condition><s:String>counter &gt; {index}</s:String></If.Condition>"
+            f'<If.Then><Sequence DisplayName="Then {index}">{children}</Sequence></If.Then>'
+            f'<If.Else><Sequence DisplayName="Else {index}">{children}</Sequence></If.Else>'
+            "</If>"
+        )
+    if kind == "ForEach":
+        return f'<ui:ForEach DisplayName="For Each {index}">{children}</ui:ForEach>'
+    return f'<Sequence DisplayName="Sequence {index}">{children}</Sequence>'
+
+
+def workflow_xaml(
+    name: str, steps: int, invokes: list[str], seed: int = 0, max_depth: int = 4
+) -> str:
+    """Build one workflow with ``steps`` top-level activities and invocations."""
+    rng = random.Random(f"{name}-{seed}")
+    body = [_activity(rng, i, 0, max_depth) for i in range(steps)]
+    body.extend(
+        f'<ui:InvokeWorkflowFile DisplayName="Invoke {target}" WorkflowFileName="{target}" />'
+        for target in invokes
+    )
+    return (
+        XAML_HEADER.format(name=name)
+        + f'  <Sequence DisplayName="{name} Main">{"".join(body)}</Sequence>\n'
+        + "</Activity>\n"
+    )
+
+
+def deep_nesting_xaml(depth: int) -> str:
+    """
+    Build a pathological workflow of nested Assigns.
+
+    Every level records a logic step whose detail lives at the very bottom of
+    the tree, which is the worst case for naive first-text scanning.
+    """
+    opening = "".join(
+        f'<ui:Assign DisplayName="Level {level}"><ui:Assign.Value>'
+        f'<Sequence DisplayName="Nested {level}">'
+        for level in range(depth)
+    )
+    closing = "</Sequence></ui:Assign.Value></ui:Assign>" * depth
+    return (
+        XAML_HEADER.format(name="Deep")
+        + f"{opening}<s:String>bottom</s:String>{closing}\n"
+        + "</Activity>\n"
+    )
+
+
+def project_files(
+    workflows: int = 20, steps: int = 20, seed: int = 0, max_depth: int = 4
+) -> Dict[str, str]:
+    """Return ``{relative_path: xaml}`` for a project with a layered invoke graph."""
+    names = [f"Workflow{i:04d}.xaml" for i in range(workflows)]
+    files: Dict[str, str] = {}
+    for i, name in enumerate(names):
+        # Each workflow invokes up to two later ones, giving a DAG rooted at the first
+        invokes = [names[j] for j in (2 * i + 1, 2 * i + 2) if j < workflows]
+        files[name] = workflow_xaml(name[:-5], steps, invokes, seed, max_depth)
+    return files
+
+
+def write_project(dest: Path, **kwargs) -> Dict[str, str]:
+    """Write a synthetic project to ``dest`` and return its files."""
+    files = project_files(**kwargs)
+    for rel_path, content in files.items():
+        path = dest / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    return files
+
+
+def project_zip(**kwargs) -> bytes:
+    """Return a synthetic project as zip archive bytes."""
+    buf = BytesIO()
+    with ZipFile(buf, "w", ZIP_DEFLATED) as zf:
+        for rel_path, content in project_files(**kwargs).items():
+            zf.writestr(rel_path, content)
+    return buf.getvalue()
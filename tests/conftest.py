@@ -1,7 +1,41 @@
 import sys
 from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from app.dedup import get_dedup_store  # noqa: E402
+from app.settings import get_settings  # noqa: E402
+
+ACTIVITY_OPEN = (
+    '<Activity xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities"\n'
+    '    xmlns:ui="http://schemas.uipath.com/workflow/activities">'
+)
+
+
+def workflow_xaml(*lines: str, name: str = "Main") -> str:
+    """A workflow whose root Sequence holds the given activity lines."""
+    body = "".join(f"    {line}\n" for line in lines)
+    return f'{ACTIVITY_OPEN}\n  <Sequence DisplayName="{name}">\n{body}  </Sequence>\n</Activity>\n'
+
+
+def manifest(files: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Ingest payload entries for ``{path: content}``, shaped like the UI sends them."""
+    return [
+        {"path": path, "size": len(content), "checksum": "x", "content": content}
+        for path, content in files.items()
+    ]
+
+
+@pytest.fixture(autouse=True)
+def fresh_dedup_store():
+    """Give every test an empty process-wide dedup store and fresh settings."""
+    get_settings.cache_clear()
+    get_dedup_store.cache_clear()
+    yield
+    get_settings.cache_clear()
+    get_dedup_store.cache_clear()
@@ -0,0 +1,164 @@
+import pytest
+from conftest import manifest, workflow_xaml
+from fastapi.testclient import TestClient
+
+from app import main as main_module
+from app.cache import (
+    Cache,
+    CacheConfig,
+    MemoryBackend,
+    RedisBackend,
+    SQLiteBackend,
+    approximate_size,
+)
+from app.dedup import NAMESPACE_VERSIONS, DedupStore
+from app.main import app
+from app.parser import parse_project
+from app.settings import ConfigError, Settings
+from benchmarks.fake_redis import FakeRedisServer
+
+XAML = workflow_xaml(
+    '<Assign DisplayName="Set total"><Assign.Value>total + 1</Assign.Value></Assign>',
+    '<ui:Click DisplayName="Submit" />',
+)
+
+
+@pytest.fixture
+def fake_redis():
+    server = FakeRedisServer().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_memory_backend_eviction_policies():
+    lru = MemoryBackend(2, "lru")
+    fifo = MemoryBackend(2, "fifo")
+    for backend in (lru, fifo):
+        backend.set("a", 1)
+        backend.set("b", 2)
+        backend.get("a")
+        backend.set("c", 3)
+
+    assert lru.get("a") == 1 and lru.get("b") is None
+    assert fifo.get("a") is None and fifo.get("b") == 2
+
+    expiring = MemoryBackend(2)
+    expiring.set("gone", 1, ttl=-1)
+    assert expiring.get("gone") is None
+
+
+def test_memory_backend_is_bounded_by_size():
+    backend = MemoryBackend(100, max_bytes=1000)
+    for key in "abc":
+        backend.set(key, "x" * 400)
+    backend.set("huge", b"x" * 2000)
+
+    assert backend.get("a") is None and backend.get("c") is not None
+    assert backend.get("huge") is None
+    assert len(backend) == 2 and backend.size_bytes <= 1000
+
+    # Replacing an entry releases the size of the old value
+    backend.set("c", "y")
+    assert backend.size_bytes == approximate_size("x" * 400) + approximate_size("y")
+
+
+def test_sqlite_backend_is_shared_between_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.cache.SQLITE_EVICT_EVERY", 1)
+    path = tmp_path / "cache.sqlite3"
+    worker_a = SQLiteBackend(path, max_entries=2)
+    worker_b = SQLiteBackend(path, max_entries=2)
+
+    worker_a.set("a", b"1")
+    assert worker_b.get("a") == b"1"
+    worker_b.set("b", b"2")
+    worker_b.set("c", b"3")
+
+    assert len(worker_a) == 2
+    assert worker_a.get("b") == b"2" and worker_a.get("c") == b"3"
+    worker_a.set("short", b"x", ttl=-1)
+    assert worker_b.get("short") is None
+
+
+def test_redis_backend_round_trips_namespaced_results(tmp_path, fake_redis):
+    (tmp_path / "Main.xaml").write_text(XAML, encoding="utf-8")
+    config = CacheConfig(backend="redis", url=fake_redis.url, namespace="team-a")
+    worker_a = DedupStore(config)
+    worker_b = DedupStore(config)
+
+    first = parse_project(tmp_path, cache=worker_a.workflows)["Main.xaml"]
+    second = parse_project(tmp_path, cache=worker_b.workflows)["Main.xaml"]
+    worker_a.summaries.put("prompt-hash", "A summary")
+
+    assert worker_b.workflows.stats() == {"backend": "redis", "hits": 1, "misses": 0}
+    assert second == first
+    assert worker_b.summaries.get("prompt-hash") == "A summary"
+    assert {key.split(b":")[1] for key in fake_redis.data} == {b"parse", b"llm"}
+    assert all(key.startswith(b"team-a:") for key in fake_redis.data)
+
+
+def test_unreachable_redis_behaves_like_an_empty_cache(fake_redis):
+    url = fake_redis.url
+    fake_redis.shutdown()
+    fake_redis.server_close()
+    cache = Cache(RedisBackend(url, timeout=0.2), "llm")
+
+    cache.put("key", b"value")
+    assert cache.get("key") is None
+
+
+def test_entries_of_another_version_or_schema_are_misses(tmp_path, monkeypatch):
+    (tmp_path / "Main.xaml").write_text(XAML, encoding="utf-8")
+    config = CacheConfig(backend="sqlite", path=str(tmp_path / "cache.sqlite3"))
+    old = DedupStore(config)
+    parse_project(tmp_path, cache=old.workflows)
+
+    monkeypatch.setitem(NAMESPACE_VERSIONS, "parse", "next")
+    upgraded = DedupStore(config)
+    parse_project(tmp_path, cache=upgraded.workflows)
+
+    assert upgraded.workflows.stats()["hits"] == 0
+    assert upgraded.workflows.key_prefix == "uipath-md:parse:vnext:"
+
+    # A payload that no longer decodes is treated like a missing entry
+    upgraded.backend.set(upgraded.workflows.key_prefix + "broken", b'{"path": "x"}')
+    assert upgraded.workflows.get("broken") is None
+
+
+def test_cache_config_from_env(monkeypatch):
+    monkeypatch.setenv("CACHE_BACKEND", "sqlite")
+    monkeypatch.setenv("CACHE_EVICTION", "fifo")
+    monkeypatch.setenv("CACHE_TTL_SECONDS", "60")
+    monkeypatch.setenv("CACHE_TTL_RENDER", "5")
+
+    config = Settings.from_env().cache
+
+    assert config.backend == "sqlite" and config.eviction == "fifo"
+    assert config.ttl_for("render") == 5 and config.ttl_for("parse") == 60
+
+    monkeypatch.setenv("CACHE_BACKEND", "memcached")
+    with pytest.raises(ConfigError):
+        Settings.from_env()
+
+
+def test_rendered_output_is_served_from_cache(monkeypatch):
+    calls = []
+    original = main_module.parse_project
+
+    def counting_parse(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr("app.main.parse_project", counting_parse)
+    client = TestClient(app)
+    payload = {"files": manifest({"Main.xaml": XAML}), "config": {"format": "html"}}
+
+    first = client.post("/api/workflows/ingest", json=payload)
+    second = client.post("/api/workflows/ingest", json=payload)
+
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers["content-disposition"] == first.headers["content-disposition"]
+    assert len(calls) == 1
+    assert client.get("/api/cache/stats").json()["render"]["hits"] == 1
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+from app.dedup import DedupStore
+from app.llm import enrich_with_llm
+from app import parser as parser_module
+from app.parser import parse_project
+
+SHARED_XAML = """<Activity xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities"
+    xmlns:ui="http://schemas.uipath.com/workflow/activities">
+  <Sequence DisplayName="Kill processes">
+    <ui:KillProcess DisplayName="Kill Excel" />
+  </Sequence>
+</Activity>
+"""
+
+MAIN_XAML = """<Activity DisplayName="{name}"
+    xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities"
+    xmlns:ui="http://schemas.uipath.com/workflow/activities">
+  <Sequence DisplayName="Main">
+    <ui:InvokeWorkflowFile WorkflowFileName="Framework\\KillAllProcesses.xaml" />
+    <ui:Click DisplayName="Open {name}" />
+  </Sequence>
+</Activity>
+"""
+
+
+def _write_project(root, name):
+    (root / "Framework").mkdir(parents=True)
+    (root / "Framework" / "KillAllProcesses.xaml").write_text(SHARED_XAML, encoding="utf-8")
+    (root / "Main.xaml").write_text(MAIN_XAML.format(name=name), encoding="utf-8")
+    return root
+
+
+def test_identical_files_are_parsed_once_across_projects(tmp_path, monkeypatch):
+    store = DedupStore()
+    first = parse_project(_write_project(tmp_path / "a", "A"), cache=store.workflows)
+
+    # Only the project-specific Main.xaml may still be parsed
+    original = parser_module.parse_workflow_content
+    calls = []
+
+    def counting(data, *args):
+        calls.append(data)
+        return original(data, *args)
+
+    monkeypatch.setattr("app.parser.parse_workflow_content", counting)
+    project_b = _write_project(tmp_path / "b", "B")
+    (project_b / "Copy.xaml").write_text(SHARED_XAML, encoding="utf-8")
+    second = parse_project(project_b, cache=store.workflows)
+
+    assert len(calls) == 1 and b'DisplayName="B"' in calls[0]
+    shared = "Framework/KillAllProcesses.xaml"
+    assert second[shared].logic_flow == first[shared].logic_flow
+    assert second[shared].checksum == first[shared].checksum
+    # Location-dependent fields still come from the file being parsed
+    assert second["Copy.xaml"].path == "Copy.xaml"
+    assert second["Copy.xaml"].display_name == "Copy"
+    assert second[shared].display_name == "KillAllProcesses"
+    assert second["Main.xaml"].display_name == "B"
+    assert store.workflows.stats()["hits"] == 2
+
+
+def test_summaries_are_reused_across_projects(tmp_path, monkeypatch):
+    prompts = []
+
+    class FakeOpenAI:
+        def __init__(self, api_key=None, base_url=None):
+            self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+        def _create(self, model, messages, temperature, max_tokens):
+            prompts.append(messages[-1]["content"])
+            message = SimpleNamespace(content=f"summary-{len(prompts)}")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    monkeypatch.setattr("openai.OpenAI", FakeOpenAI)
+    store = DedupStore()
+    cfg = {"use_llm": True, "api_key": "k"}
+
+    first = enrich_with_llm(
+        parse_project(_write_project(tmp_path / "a", "A"), cache=store.workflows), cfg, store
+    )
+    assert len(prompts) == 2
+    second = enrich_with_llm(
+        parse_project(_write_project(tmp_path / "b", "B"), cache=store.workflows), cfg, store
+    )
+
+    shared = "Framework/KillAllProcesses.xaml"
+    assert len(prompts) == 3
+    assert second[shared] == first[shared]
+    assert second["Main.xaml"] != first["Main.xaml"]
@@ -0,0 +1,139 @@
+import json
+
+import pytest
+from conftest import manifest
+from fastapi.testclient import TestClient
+
+from app.dedup import DedupStore
+from app.export import ExportContext, render_json
+from app.index import ProjectIndex
+from app.main import app
+from app.markdown_gen import build_markdown
+from app.parser import (
+    DETAIL_PROFILES,
+    DetailOptions,
+    WorkflowData,
+    parse_project,
+    resolve_detail_options,
+)
+
+NESTED_XAML = """<Activity xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities"
+    xmlns:ui="http://schemas.uipath.com/workflow/activities">
+  <Sequence DisplayName="Level 0">
+    <Sequence DisplayName="Level 1">
+      <If DisplayName="Level 2" Condition="ready">
+        <If.Then>
+          <ui:Click DisplayName="Level 3">
+            <ui:Click.Target><ui:Target Selector="&lt;webctrl id='go' /&gt;" /></ui:Click.Target>
+          </ui:Click>
+        </If.Then>
+      </If>
+    </Sequence>
+    <ui:InvokeWorkflowFile DisplayName="Call child" WorkflowFileName="Child.xaml" />
+  </Sequence>
+</Activity>
+"""
+
+
+def _project(tmp_path):
+    (tmp_path / "Main.xaml").write_text(NESTED_XAML, encoding="utf-8")
+    return tmp_path
+
+
+def test_outline_skips_sections_but_keeps_invocations(tmp_path):
+    workflow = parse_project(_project(tmp_path), detail=DETAIL_PROFILES["outline"])["Main.xaml"]
+
+    assert workflow.invoked_workflows == ["Child.xaml"]
+    assert workflow.key_activities == []
+    assert workflow.logic_flow == [] and workflow.activities == []
+    assert workflow.components == []
+
+
+def test_limits_are_applied_while_collecting(tmp_path):
+    detail = DetailOptions(max_logic_depth=2, max_components=3)
+    limited = parse_project(_project(tmp_path), detail=detail)["Main.xaml"]
+    full = parse_project(tmp_path)["Main.xaml"]
+
+    assert max(depth for depth, _ in full.logic_flow) == 3
+    assert {depth for depth, _ in limited.logic_flow} == {0, 1}
+    assert len(limited.activities) == len(limited.logic_flow)
+    assert limited.components == full.components[:3]
+    # Selectors of kept activities are still attached
+    click = next(a for a in full.activities if a.activity_type == "Click")
+    assert click.selector
+
+
+def test_parse_cache_keeps_detail_levels_apart(tmp_path):
+    store = DedupStore()
+    _project(tmp_path)
+
+    full = parse_project(tmp_path, cache=store.workflows)["Main.xaml"]
+    outline = parse_project(
+        tmp_path, cache=store.workflows, detail=DETAIL_PROFILES["outline"]
+    )["Main.xaml"]
+    again = parse_project(tmp_path, cache=store.workflows)["Main.xaml"]
+
+    assert full.logic_flow and not outline.logic_flow
+    assert again.logic_flow == full.logic_flow
+    assert store.workflows.hits == 1
+
+
+def test_resolve_detail_options_validates_config():
+    detail = resolve_detail_options({"detail": "standard", "max_invoke_depth": 1})
+    assert detail.max_logic_depth == 3 and detail.max_invoke_depth == 1
+    assert resolve_detail_options({}) == DetailOptions()
+    # The invoke depth only affects rendering, so it does not split parse caches
+    assert DetailOptions(max_invoke_depth=2).cache_tag == ""
+
+    with pytest.raises(ValueError):
+        resolve_detail_options({"detail": "verbose"})
+    with pytest.raises(ValueError):
+        resolve_detail_options({"max_components": "10"})
+
+
+def test_max_invoke_depth_bounds_rendered_tree():
+    workflows = {
+        "A.xaml": WorkflowData("A.xaml", "A", ["B.xaml"], []),
+        "B.xaml": WorkflowData("B.xaml", "B", ["C.xaml"], []),
+        "C.xaml": WorkflowData("C.xaml", "C", [], []),
+    }
+
+    markdown = build_markdown(workflows, max_invoke_depth=1)
+    tree = json.loads(render_json(ExportContext(workflows, None, 1)))["invocation_tree"]
+
+    assert "**B.xaml**" in markdown and "- Invokes: C.xaml" in markdown
+    assert "**C.xaml**" not in markdown
+    assert tree[0]["children"][0] == {"path": "B.xaml", "found": True, "truncated": True}
+
+
+def test_ingest_rejects_unknown_detail_profile():
+    client = TestClient(app)
+    files = manifest({"Main.xaml": NESTED_XAML})
+
+    response = client.post(
+        "/api/workflows/ingest", json={"files": files, "config": {"detail": "verbose"}}
+    )
+    outline = client.post(
+        "/api/workflows/ingest", json={"files": files, "config": {"detail": "outline"}}
+    )
+
+    assert response.status_code == 400
+    assert "detail profile" in response.json()["detail"]
+    assert outline.status_code == 200
+    assert "Logic flow" not in outline.text and "Child.xaml" in outline.text
+
+
+def test_indexing_requires_full_detail(tmp_path, monkeypatch):
+    index = ProjectIndex(tmp_path / "index.sqlite3")
+    monkeypatch.setattr("app.main.get_project_index", lambda: index)
+    client = TestClient(app)
+    files = manifest({"Main.xaml": NESTED_XAML})
+
+    for config in (
+        {"project_id": "p1", "detail": "outline"},
+        {"project_id": "p1", "max_logic_depth": 1},
+    ):
+        response = client.post("/api/workflows/ingest", json={"files": files, "config": config})
+        assert response.status_code == 400
+        assert "project_id requires the full detail profile" in response.json()["detail"]
+    assert not index.has_project("p1")
@@ -0,0 +1,139 @@
+import json
+from io import BytesIO
+from zipfile import ZipFile
+
+from conftest import manifest, workflow_xaml
+from fastapi.testclient import TestClient
+
+from app.diff import diff_projects, main as diff_main, render_diff_markdown
+from app.main import app
+from app.parser import WorkflowData
+
+CLICK = '<ui:Click DisplayName="{name}" />'
+INVOKE = '<ui:InvokeWorkflowFile DisplayName="Call {name}" WorkflowFileName="{name}" />'
+
+BASE = {
+    "Main.xaml": workflow_xaml(CLICK.format(name="Login"), INVOKE.format(name="Old.xaml")),
+    "Old.xaml": workflow_xaml(CLICK.format(name="Legacy")),
+    "Shared.xaml": workflow_xaml(CLICK.format(name="Shared")),
+}
+HEAD = {
+    "Main.xaml": workflow_xaml(
+        CLICK.format(name="Login"),
+        CLICK.format(name="Login"),
+        INVOKE.format(name="New.xaml"),
+    ),
+    "New.xaml": workflow_xaml(CLICK.format(name="Fresh")),
+    "Shared.xaml": BASE["Shared.xaml"],
+}
+
+
+def _workflow(path, invokes, steps, checksum=None):
+    flow = [(0, step) for step in steps]
+    return WorkflowData(path, path, invokes, [], flow, checksum=checksum)
+
+
+def test_diff_projects_reports_structural_changes():
+    old = {
+        "A.xaml": _workflow("A.xaml", ["B.xaml"], ["Open", "Click", "Close"]),
+        "B.xaml": _workflow("B.xaml", [], ["Work"], checksum="same"),
+        "Gone.xaml": _workflow("Gone.xaml", [], []),
+    }
+    new = {
+        "A.xaml": _workflow("A.xaml", ["B.xaml", "C.xaml"], ["Open", "Click", "Click"]),
+        "B.xaml": _workflow("B.xaml", [], ["Different but same checksum"], checksum="same"),
+        "C.xaml": _workflow("C.xaml", [], []),
+    }
+
+    diff = diff_projects(old, new)
+
+    assert diff.added == ["C.xaml"] and diff.removed == ["Gone.xaml"]
+    assert diff.unchanged == 1
+    [change] = diff.changed
+    assert change.path == "A.xaml"
+    assert change.invocations_added == ["C.xaml"] and change.invocations_removed == []
+    # Repeated steps are counted, not collapsed
+    assert change.steps_added == ["Click"] and change.steps_removed == ["Close"]
+
+    markdown = render_diff_markdown(diff)
+    assert "- Invokes added: `C.xaml`" in markdown
+    assert "+ Click" in markdown and "- Close" in markdown
+
+
+def test_step_moved_into_a_branch_is_a_change():
+    old = _workflow("A.xaml", [], ["If ready", "Click"], checksum="1")
+    new = WorkflowData("A.xaml", "A.xaml", [], [], [(0, "If ready"), (1, "Click")], checksum="2")
+
+    diff = diff_projects({"A.xaml": old}, {"A.xaml": new})
+
+    assert diff.unchanged == 0
+    [change] = diff.changed
+    assert change.steps_added == ["Click"] and change.steps_removed == ["Click"]
+
+
+def _write(root, files):
+    root.mkdir()
+    for path, content in files.items():
+        (root / path).write_text(content, encoding="utf-8")
+    return root
+
+
+def test_cli_diffs_project_directories(tmp_path, capsys):
+    old = _write(tmp_path / "old", BASE)
+    new = _write(tmp_path / "new", HEAD)
+
+    assert diff_main([str(old), str(new), "--format", "json"]) == 0
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["added"] == ["New.xaml"] and report["removed"] == ["Old.xaml"]
+    assert report["unchanged"] == 1
+    [main] = report["changed"]
+    assert main["invocations_added"] == ["New.xaml"]
+    assert main["invocations_removed"] == ["Old.xaml"]
+    assert main["steps_added"] == ["Login [Click]", "Call New.xaml [InvokeWorkflowFile]"]
+
+
+def _zip(files):
+    buf = BytesIO()
+    with ZipFile(buf, "w") as zf:
+        for path, content in files.items():
+            zf.writestr(path, content)
+    return buf.getvalue()
+
+
+def test_diff_endpoints_accept_archives_and_manifests():
+    client = TestClient(app)
+
+    uploaded = client.post(
+        "/analyze/diff/",
+        files={
+            "base": ("base.zip", _zip(BASE), "application/zip"),
+            "head": ("head.zip", _zip(HEAD), "application/zip"),
+        },
+    )
+
+    posted = client.post(
+        "/api/workflows/diff?format=json",
+        json={"base": manifest(BASE), "head": manifest(HEAD)},
+    )
+
+    assert uploaded.status_code == 200
+    assert uploaded.headers["content-type"].startswith("text/markdown")
+    assert "## Added\n\n- `New.xaml`" in uploaded.text
+    assert posted.status_code == 200
+    assert posted.json()["removed"] == ["Old.xaml"]
+
+    bad_format = client.post(
+        "/api/workflows/diff?format=pdf",
+        json={"base": manifest(BASE), "head": manifest(HEAD)},
+    )
+    assert bad_format.status_code == 400
+
+
+def test_manifest_paths_cannot_escape_the_work_directory():
+    client = TestClient(app)
+    files = manifest({"../evil.xaml": BASE["Old.xaml"]})
+
+    response = client.post("/api/workflows/diff", json={"base": files, "head": files})
+
+    assert response.status_code == 400
@@ -0,0 +1,108 @@
+import json
+from io import BytesIO
+from zipfile import ZipFile
+
+from conftest import manifest
+from fastapi.testclient import TestClient
+
+from app import main as main_module
+from app.export import (
+    ExportContext,
+    iter_ndjson,
+    render_html,
+    render_json,
+    resolve_formats,
+)
+from app.main import app
+from app.parser import WorkflowData
+
+MAIN_XAML = """<?xml version="1.0" encoding="utf-8"?>
+<Activity xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities" xmlns:ui="http://schemas.uipath.com/workflow/activities">
+  <Sequence DisplayName="Main Sequence">
+    <ui:InvokeWorkflowFile DisplayName="Call Child" WorkflowFileName="Child.xaml" />
+  </Sequence>
+</Activity>
+"""
+
+CHILD_XAML = """<?xml version="1.0" encoding="utf-8"?>
+<Activity xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities" xmlns:ui="http://schemas.uipath.com/workflow/activities">
+  <Sequence DisplayName="Child Sequence">
+    <ui:Click DisplayName="Click &lt;OK&gt;" />
+  </Sequence>
+</Activity>
+"""
+
+
+def _workflows():
+    return {
+        "Main.xaml": WorkflowData(
+            "Main.xaml", "Main", ["Child.xaml", "Gone.xaml"], ["Main"]
+        ),
+        "Child.xaml": WorkflowData(
+            "Child.xaml", "Child", [], ["<script>"], logic_flow=[(0, "Click <OK>")]
+        ),
+    }
+
+
+def test_json_and_ndjson_share_records_and_tree():
+    ctx = ExportContext(_workflows(), {"Main.xaml": "Entry point"})
+
+    document = json.loads(render_json(ctx))
+    lines = [json.loads(line) for line in iter_ndjson(ctx)]
+
+    assert document["roots"] == ["Main.xaml"]
+    assert [record["path"] for record in lines] == ["Child.xaml", "Main.xaml"]
+    assert lines[0]["invoked_by"] == ["Main.xaml"] and not lines[0]["root"]
+    assert lines[1]["summary"] == "Entry point" and lines[1]["root"]
+    tree = document["invocation_tree"][0]
+    assert [child["path"] for child in tree["children"]] == ["Child.xaml", "Gone.xaml"]
+    assert tree["children"][1]["found"] is False
+
+
+def test_html_report_is_self_contained_and_escaped():
+    report = render_html(ExportContext(_workflows()))
+
+    assert report.startswith("<!DOCTYPE html>")
+    assert "<script>" not in report
+    assert "&lt;script&gt;" in report
+    assert "Click &lt;OK&gt;" in report
+    assert "Gone.xaml (not found)" in report
+
+
+def test_resolve_formats_accepts_lists_and_ignores_unknown():
+    assert resolve_formats(None) == ["list"]
+    assert resolve_formats("sequence") == ["sequence"]
+    assert resolve_formats("json, html,json") == ["json", "html"]
+    assert resolve_formats(["pdf"]) == ["list"]
+
+
+def test_ingest_returns_several_formats_from_one_parse(monkeypatch):
+    calls = []
+    original = main_module.parse_project
+
+    def counting_parse(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr("app.main.parse_project", counting_parse)
+    client = TestClient(app)
+    files = manifest({"Main.xaml": MAIN_XAML, "Child.xaml": CHILD_XAML})
+    payload = {"files": files, "config": {"format": ["list", "ndjson", "html"]}}
+
+    response = client.post("/api/workflows/ingest", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert len(calls) == 1
+    with ZipFile(BytesIO(response.content)) as zf:
+        assert sorted(zf.namelist()) == ["analysis.html", "analysis.md", "analysis.ndjson"]
+        assert "UiPath Project Summary" in zf.read("analysis.md").decode()
+        assert len(zf.read("analysis.ndjson").decode().splitlines()) == 2
+
+    payload["config"] = {"format": "ndjson"}
+    response = client.post("/api/workflows/ingest", json=payload)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["path"] for line in response.text.splitlines()] == [
+        "Child.xaml",
+        "Main.xaml",
+    ]
@@ -0,0 +1,144 @@
+import gzip
+from io import BytesIO
+from zipfile import ZipFile
+
+import pytest
+from conftest import manifest, workflow_xaml
+from fastapi.testclient import TestClient
+
+from app import main as main_module
+from app.compression import negotiate_encoding
+from app.etag import etag_matches
+from app.main import app
+
+XAML = workflow_xaml(
+    *(f'<ui:Click DisplayName="Click button number {i}" />' for i in range(40)),
+    name="Main Sequence",
+)
+
+
+def _payload(config=None):
+    return {"files": manifest({"Main.xaml": XAML}), "config": config or {}}
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    calls = []
+    original = main_module.parse_project
+
+    def counting_parse(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr("app.main.parse_project", counting_parse)
+    return calls
+
+
+def test_matching_etag_returns_304_without_reanalysis(parse_calls):
+    client = TestClient(app)
+
+    first = client.post("/api/workflows/ingest", json=_payload())
+    etag = first.headers["etag"]
+    again = client.post(
+        "/api/workflows/ingest", json=_payload(), headers={"If-None-Match": etag}
+    )
+    other_config = client.post(
+        "/api/workflows/ingest",
+        json=_payload({"format": "json"}),
+        headers={"If-None-Match": etag},
+    )
+
+    assert first.status_code == 200
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert other_config.status_code == 200
+    assert other_config.headers["etag"] != etag
+    assert len(parse_calls) == 2
+
+
+def test_incomplete_results_are_not_reused(parse_calls, monkeypatch):
+    # Every LLM request failed, so no workflow got its summary
+    monkeypatch.setattr(main_module, "enrich_with_llm", lambda workflows, cfg: {})
+    client = TestClient(app)
+    payload = _payload({"use_llm": True, "api_key": "k"})
+
+    first = client.post("/api/workflows/ingest", json=payload)
+    again = client.post("/api/workflows/ingest", json=payload)
+
+    assert first.status_code == again.status_code == 200
+    assert "etag" not in first.headers
+    assert first.headers["cache-control"] == "no-store"
+    assert len(parse_calls) == 2
+
+
+def test_upload_etag_is_derived_from_archive_checksum(parse_calls):
+    buf = BytesIO()
+    with ZipFile(buf, "w") as zf:
+        zf.writestr("Main.xaml", XAML)
+    archive = buf.getvalue()
+    client = TestClient(app)
+
+    def upload(headers=None):
+        files = {"file": ("project.zip", archive, "application/zip")}
+        return client.post("/analyze/upload/", files=files, headers=headers or {})
+
+    first = upload()
+    second = upload({"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert len(parse_calls) == 1
+
+
+def test_analysis_responses_are_compressed(parse_calls):
+    client = TestClient(app)
+
+    compressed = client.post(
+        "/api/workflows/ingest", json=_payload(), headers={"Accept-Encoding": "gzip"}
+    )
+    plain = client.post(
+        "/api/workflows/ingest", json=_payload(), headers={"Accept-Encoding": "identity"}
+    )
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in compressed.headers["vary"].lower()
+    assert "content-encoding" not in plain.headers
+    assert compressed.text == plain.text
+    assert int(compressed.headers["content-length"]) < len(plain.content)
+    # Encoded variants get a weak tag that still revalidates
+    assert compressed.headers["etag"] == f"W/{plain.headers['etag']}"
+    revalidated = client.post(
+        "/api/workflows/ingest",
+        json=_payload(),
+        headers={"If-None-Match": compressed.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+
+
+def test_streamed_ndjson_is_compressed_incrementally():
+    client = TestClient(app)
+    with client.stream(
+        "POST",
+        "/api/workflows/ingest",
+        json=_payload({"format": "ndjson"}),
+        headers={"Accept-Encoding": "gzip"},
+    ) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw).decode().count("\n") == 1
+
+
+def test_encoding_negotiation_and_etag_matching(monkeypatch):
+    monkeypatch.setattr("app.compression.brotli", None)
+    assert negotiate_encoding("gzip, br") == "gzip"
+    assert negotiate_encoding("gzip;q=0, deflate") is None
+    assert negotiate_encoding(None) is None
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"c"')
+    assert not etag_matches('"a"', '"b"')
+
+
+def test_brotli_preferred_when_available():
+    pytest.importorskip("brotli")
+    assert negotiate_encoding("gzip, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0") == "gzip"
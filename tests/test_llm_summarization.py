@@ -0,0 +1,116 @@
+import threading
+from types import SimpleNamespace
+
+from app.llm import enrich_with_llm, split_logic_flow
+from app.parser import WorkflowData
+
+
+class FakeOpenAI:
+    """Records prompts and answers every completion with a short summary."""
+
+    prompts = []
+    lock = threading.Lock()
+
+    def __init__(self, api_key=None, base_url=None):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, temperature, max_tokens):
+        prompt = messages[-1]["content"]
+        with self.lock:
+            FakeOpenAI.prompts.append(prompt)
+            number = len(FakeOpenAI.prompts)
+        if prompt.startswith("Combine"):
+            content = f"reduced-{number}"
+        elif "(part " in prompt:
+            content = f"partial-{number}"
+        else:
+            content = f"summary-{number}"
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _install_fake(monkeypatch):
+    FakeOpenAI.prompts = []
+    monkeypatch.setattr("openai.OpenAI", FakeOpenAI)
+
+
+def test_split_logic_flow_keeps_subtrees_and_context():
+    flow = [(0, "Root [Sequence]")]
+    for i in range(6):
+        flow.append((1, f"Branch {i} [If]"))
+        flow.append((2, f"Step {i} [Assign]: value_{i} = {'x' * 40}"))
+
+    chunks = split_logic_flow(flow, 200)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk[0] == (0, "Root [Sequence]")
+    # Every original step lands in exactly one chunk (the root is repeated)
+    body = [step for chunk in chunks for step in chunk[1:]]
+    assert body == flow[1:]
+    # Branches are never separated from their nested step
+    for chunk in chunks:
+        for index, (depth, text) in enumerate(chunk):
+            if text.startswith("Branch"):
+                assert chunk[index + 1][0] == 2
+
+
+def test_oversized_workflow_is_map_reduced(monkeypatch):
+    _install_fake(monkeypatch)
+    flow = [(0, "Main [Sequence]")] + [
+        (1, f"Step {i} [Assign]: {'v' * 100}") for i in range(60)
+    ]
+    workflows = {
+        "Big.xaml": WorkflowData(
+            path="Big.xaml",
+            display_name="Big",
+            invoked_workflows=[],
+            key_activities=["Main"],
+            logic_flow=flow,
+        )
+    }
+
+    result = enrich_with_llm(
+        workflows, {"use_llm": True, "api_key": "k", "max_prompt_chars": 1500}
+    )
+
+    assert result["Big.xaml"].startswith("reduced-")
+    assert all(len(prompt) <= 1500 for prompt in FakeOpenAI.prompts)
+    assert sum("(part " in prompt for prompt in FakeOpenAI.prompts) > 1
+
+
+def test_summary_rollup_feeds_callees_into_callers(monkeypatch):
+    _install_fake(monkeypatch)
+    workflows = {
+        "Main.xaml": WorkflowData("Main.xaml", "Main", ["Child.xaml", "Leaf.xaml"], []),
+        "Child.xaml": WorkflowData("Child.xaml", "Child", ["Leaf.xaml"], []),
+        "Leaf.xaml": WorkflowData("Leaf.xaml", "Leaf", [], []),
+    }
+
+    result = enrich_with_llm(
+        workflows, {"use_llm": True, "api_key": "k", "summary_rollup": True}
+    )
+
+    assert set(result) == set(workflows)
+    assert len(FakeOpenAI.prompts) == 3
+    leaf_prompt, child_prompt, main_prompt = FakeOpenAI.prompts
+    assert "Path: Leaf.xaml" in leaf_prompt
+    assert f"Leaf.xaml: {result['Leaf.xaml']}" in child_prompt
+    assert f"Child.xaml: {result['Child.xaml']}" in main_prompt
+    assert f"Leaf.xaml: {result['Leaf.xaml']}" in main_prompt
+
+
+def test_summary_rollup_resolves_callees_in_subfolders(monkeypatch):
+    _install_fake(monkeypatch)
+    workflows = {
+        "Main.xaml": WorkflowData("Main.xaml", "Main", ["Framework\\SendEmail.xaml"], []),
+        "Framework/SendEmail.xaml": WorkflowData("Framework/SendEmail.xaml", "Send", [], []),
+    }
+
+    result = enrich_with_llm(
+        workflows, {"use_llm": True, "api_key": "k", "summary_rollup": True}
+    )
+
+    callee_prompt, main_prompt = FakeOpenAI.prompts
+    assert "Path: Framework/SendEmail.xaml" in callee_prompt
+    assert f"Framework/SendEmail.xaml: {result['Framework/SendEmail.xaml']}" in main_prompt
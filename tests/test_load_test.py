@@ -0,0 +1,73 @@
+import httpx
+import pytest
+
+from app.llm import enrich_with_llm
+from app.parser import WorkflowData
+from benchmarks.load_test import (
+    COLD_CACHE_ENV,
+    AppServer,
+    Sample,
+    parse_mix,
+    percentile,
+    schedule,
+    summarize,
+)
+from benchmarks.stub_llm import StubLLMServer
+
+
+def test_percentiles_and_summary():
+    assert percentile([0.3, 0.1, 0.2, 0.4], 50) == 0.2
+    assert percentile([float(i) for i in range(1, 101)], 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+    samples = [
+        Sample("upload", 0.1, 200),
+        Sample("ingest", 0.3, 500),
+        Sample("ingest", 0.2, None, "ReadTimeout"),
+    ]
+    report = summarize(samples, elapsed=1.5)
+
+    assert report["overall"]["requests"] == 3 and report["overall"]["errors"] == 2
+    assert report["overall"]["throughput_rps"] == 2.0
+    assert report["by_kind"]["upload"]["p99_ms"] == 100.0
+
+
+def test_request_mix_is_weighted_and_reproducible():
+    mix = parse_mix("upload=3,ingest=1")
+
+    plan = schedule(mix, 400)
+
+    assert plan == schedule(mix, 400)
+    assert 250 < plan.count("upload") < 350
+    with pytest.raises(ValueError):
+        parse_mix("delete=1")
+
+
+def test_stub_llm_server_answers_openai_client():
+    server = StubLLMServer(error_rate=0.0).start()
+    failing = StubLLMServer(error_rate=1.0).start()
+    workflows = {"Main.xaml": WorkflowData("Main.xaml", "Main", [], ["Click"], [(0, "Login")])}
+    try:
+        ok = enrich_with_llm(workflows, {"use_llm": True, "api_key": "stub", "base_url": server.url})
+        failed = enrich_with_llm(
+            workflows,
+            {"use_llm": True, "api_key": "stub", "base_url": failing.url, "model": "other"},
+        )
+    finally:
+        server.shutdown()
+        failing.shutdown()
+
+    assert ok == {"Main.xaml": "Stub summary of the workflow."}
+    assert failed == {}
+    assert server.requests == 1 and failing.errors == failing.requests >= 1
+
+
+def test_app_server_starts_with_the_default_cold_cache_env():
+    server = AppServer(COLD_CACHE_ENV)
+    try:
+        server.wait_ready()
+        stats = httpx.get(f"{server.url}/api/cache/stats", timeout=5.0)
+    finally:
+        server.close()
+
+    assert stats.status_code == 200
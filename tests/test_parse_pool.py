@@ -0,0 +1,131 @@
+from dataclasses import replace
+
+from conftest import manifest, workflow_xaml
+from fastapi.testclient import TestClient
+
+from app import main as main_module
+from app.dedup import DedupStore
+from app.main import app
+from app.parse_pool import WORKER_TERMINATED_ERROR, ParsePool, ParsePoolConfig
+from app.parser import parse_project
+
+GOOD = workflow_xaml('<ui:Click DisplayName="Login" />')
+MALFORMED = "<Activity><Sequence>"
+PROJECT = {"Main.xaml": GOOD, "Broken.xaml": MALFORMED}
+
+
+def test_malformed_file_is_reported_without_failing_the_project(tmp_path):
+    (tmp_path / "Main.xaml").write_text(GOOD, encoding="utf-8")
+    (tmp_path / "Broken.xaml").write_text(MALFORMED, encoding="utf-8")
+
+    workflows = parse_project(tmp_path)
+
+    assert workflows["Main.xaml"].error is None
+    assert workflows["Main.xaml"].logic_flow
+    assert workflows["Broken.xaml"].error.startswith("ParseError")
+    assert workflows["Broken.xaml"].display_name == "Broken"
+
+
+def test_ingest_renders_parse_errors_as_partial_results():
+    client = TestClient(app)
+
+    response = client.post("/api/workflows/ingest", json={"files": manifest(PROJECT)})
+
+    assert response.status_code == 200
+    assert "- **Broken.xaml**\n    - Parse error: ParseError" in response.text
+    assert "Login [Click]" in response.text
+
+
+def _write_huge(path):
+    # Far more than a second of CPU time to parse and walk
+    path.write_text(workflow_xaml(*['<ui:Click DisplayName="c" />'] * 400_000), encoding="utf-8")
+
+
+def _ingest_payload(config=None):
+    return {"files": manifest(PROJECT), "config": config or {}}
+
+
+def test_render_cache_skips_only_transient_failures(monkeypatch):
+    calls = []
+    crash = []
+
+    def fake_parse(*args):
+        calls.append(args)
+        workflows = parse_project(*args)
+        if crash:
+            workflows["Main.xaml"] = replace(workflows["Main.xaml"], error=WORKER_TERMINATED_ERROR)
+        return workflows
+
+    def fake_enrich(workflows, cfg):
+        return {path: "Summary" for path, data in workflows.items() if data.error is None}
+
+    monkeypatch.setattr("app.main.parse_project", fake_parse)
+    monkeypatch.setattr(main_module, "enrich_with_llm", fake_enrich)
+    client = TestClient(app)
+    payload = _ingest_payload({"use_llm": True, "api_key": "k"})
+
+    # A file with a parse error has no summary but the result is complete
+    for _ in range(2):
+        assert client.post("/api/workflows/ingest", json=payload).status_code == 200
+    assert len(calls) == 1
+
+    crash.append(True)
+    payload = _ingest_payload({"format": "json"})
+    for _ in range(2):
+        assert client.post("/api/workflows/ingest", json=payload).status_code == 200
+    assert len(calls) == 3
+
+
+def test_pool_enforces_cpu_limit_per_file(tmp_path):
+    _write_huge(tmp_path / "Huge.xaml")
+    (tmp_path / "Main.xaml").write_text(GOOD, encoding="utf-8")
+    (tmp_path / "Broken.xaml").write_text(MALFORMED, encoding="utf-8")
+    store = DedupStore()
+    pool = ParsePool(ParsePoolConfig(workers=2, max_tasks_per_child=2, cpu_seconds=1))
+    timings = {}
+
+    try:
+        workflows = parse_project(tmp_path, None, store.workflows, None, timings, pool)
+    finally:
+        pool.close()
+
+    assert workflows["Huge.xaml"].error == "CPU time limit of 1s exceeded"
+    assert workflows["Broken.xaml"].error.startswith("ParseError")
+    assert workflows["Main.xaml"].error is None
+    assert (1, "Login [Click]") in workflows["Main.xaml"].logic_flow
+    assert set(timings) == set(workflows)
+    # Only successful parses are cached
+    assert store.workflows.get(workflows["Main.xaml"].checksum) is not None
+    assert store.workflows.get(workflows["Broken.xaml"].checksum) is None
+
+
+def test_pool_kills_workers_past_the_wall_clock_deadline(tmp_path):
+    _write_huge(tmp_path / "Huge.xaml")
+    (tmp_path / "Main.xaml").write_text(GOOD, encoding="utf-8")
+    # No CPU limit, so only the deadline stops the huge file
+    pool = ParsePool(ParsePoolConfig(workers=2, cpu_seconds=0, timeout_seconds=1))
+
+    try:
+        workflows = parse_project(tmp_path, None, None, None, None, pool)
+    finally:
+        pool.close()
+
+    assert workflows["Huge.xaml"].error == "Parse timed out after 1s"
+    assert workflows["Main.xaml"].error is None
+
+
+def test_workers_that_are_never_recycled_keep_a_per_file_budget(tmp_path):
+    _write_huge(tmp_path / "Huge.xaml")
+    (tmp_path / "Main.xaml").write_text(GOOD, encoding="utf-8")
+    pool = ParsePool(ParsePoolConfig(workers=1, max_tasks_per_child=0, cpu_seconds=1))
+
+    try:
+        first = parse_project(tmp_path, None, None, None, None, pool)
+        (tmp_path / "Huge.xaml").unlink()
+        second = parse_project(tmp_path, None, None, None, None, pool)
+    finally:
+        pool.close()
+
+    assert first["Huge.xaml"].error == "CPU time limit of 1s exceeded"
+    # The same long-lived worker still parses healthy files
+    assert second["Main.xaml"].error is None
@@ -0,0 +1,135 @@
+import sys
+from xml.etree import ElementTree
+
+import pytest
+
+from app.parser import (
+    FirstTextIndex,
+    LxmlBackend,
+    StdlibBackend,
+    TagCache,
+    _backend_instance,
+    describe_tag,
+    get_parser_backend,
+    parse_project,
+)
+
+
+def test_tag_cache_describes_each_tag_once(monkeypatch):
+    calls = []
+
+    def counting_describe(tag):
+        calls.append(tag)
+        return describe_tag(tag)
+
+    monkeypatch.setattr("app.parser.describe_tag", counting_describe)
+    tags = TagCache()
+    ui = "{http://schemas.uipath.com/workflow/activities}"
+    wf = "{http://schemas.microsoft.com/netfx/2009/xaml/activities}"
+
+    assign = tags[f"{ui}Assign"]
+    tags[f"{ui}Assign"]
+    branch = tags[f"{wf}If.Then"]
+    skipped = tags["String"]
+
+    assert calls == [f"{ui}Assign", f"{wf}If.Then", "String"]
+    assert assign.local_name == "Assign"
+    assert assign.is_key_activity and assign.is_logic_activity
+    assert branch.branch_label == "Then" and branch.suffix == "Then"
+    assert not branch.is_logic_activity
+    assert skipped.is_skipped_component
+
+
+def test_first_text_index_fills_each_node_once():
+    depth = 40
+    xml = (
+        "".join(f"<Level{i}><Level{i}.Value>" for i in range(depth))
+        + "<String>bottom</String>"
+        + "".join(f"</Level{i}.Value></Level{i}>" for i in reversed(range(depth)))
+    )
+    root = ElementTree.fromstring(xml)
+    texts = FirstTextIndex()
+
+    assert texts[root] == "bottom"
+    assert len(texts) == sum(1 for _ in root.iter())
+    # Later lookups from any ancestor are served from the memo
+    assert all(texts[node] == "bottom" for node in root.iter())
+    assert len(texts) == sum(1 for _ in root.iter())
+
+
+def test_deeply_nested_details_are_extracted(tmp_path):
+    depth = 60
+    opening = "".join(
+        f'<ui:Assign DisplayName="Level {i}"><ui:Assign.Value>' for i in range(depth)
+    )
+    closing = "</ui:Assign.Value></ui:Assign>" * depth
+    xaml = (
+        '<Activity xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities" '
+        'xmlns:ui="http://schemas.uipath.com/workflow/activities">'
+        f"<Sequence>{opening}<String>result</String>{closing}</Sequence></Activity>"
+    )
+    (tmp_path / "Deep.xaml").write_text(xaml, encoding="utf-8")
+
+    workflow = parse_project(tmp_path)["Deep.xaml"]
+
+    assert len(workflow.logic_flow) == depth + 1
+    assert workflow.logic_flow[1] == (1, "Level 0 [Assign]: result")
+    assert workflow.logic_flow[-1] == (depth, f"Level {depth - 1} [Assign]: result")
+
+
+PARITY_XAML = (
+    '<?xml version="1.0" encoding="utf-8"?>\r\n'
+    "<!-- generated by Studio -->\r\n"
+    '<Activity x:Class="Parity" '
+    'xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities" '
+    'xmlns:s="clr-namespace:System;assembly=mscorlib" '
+    'xmlns:ui="http://schemas.uipath.com/workflow/activities" '
+    'xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">\r\n'
+    '  <Sequence DisplayName="Root">\r\n'
+    "    <!-- a comment between activities -->\r\n"
+    "    <?pi ignored?>\r\n"
+    '    <If DisplayName="Check &amp; Go">\r\n'
+    "      <If.Condition><s:String>count &lt; 5</s:String></If.Condition>\r\n"
+    '      <If.Then><ui:Click DisplayName="Click" /></If.Then>\r\n'
+    '      <If.Else><ui:InvokeWorkflowFile WorkflowFileName="Other.xaml" /></If.Else>\r\n'
+    "    </If>\r\n"
+    '    <ui:MultipleAssign DisplayName="Many">\r\n'
+    "      <ui:MultipleAssign.Assignments>\r\n"
+    '        <ui:Assign><ui:Assign.To><OutArgument>[a]</OutArgument></ui:Assign.To>'
+    "<ui:Assign.Value><InArgument>1</InArgument></ui:Assign.Value></ui:Assign>\r\n"
+    "      </ui:MultipleAssign.Assignments>\r\n"
+    "    </ui:MultipleAssign>\r\n"
+    "  </Sequence>\r\n"
+    "</Activity>\r\n"
+)
+
+
+def test_parser_backends_produce_identical_workflow_data(tmp_path):
+    pytest.importorskip("lxml")
+    (tmp_path / "Parity.xaml").write_bytes(PARITY_XAML.encode("utf-8"))
+
+    stdlib = parse_project(tmp_path, "stdlib")
+    lxml = parse_project(tmp_path, LxmlBackend())
+
+    assert isinstance(get_parser_backend("lxml"), LxmlBackend)
+    assert stdlib == lxml
+    workflow = stdlib["Parity.xaml"]
+    assert "\r" not in workflow.raw_xml
+    assert workflow.invoked_workflows == ["Other.xaml"]
+    assert (1, "Check & Go [If]: count < 5") in workflow.logic_flow
+
+
+def test_unknown_parser_backend_is_rejected():
+    with pytest.raises(ValueError):
+        get_parser_backend("sax")
+
+
+def test_explicit_lxml_backend_without_lxml_is_rejected(monkeypatch):
+    _backend_instance.cache_clear()
+    monkeypatch.setitem(sys.modules, "lxml", None)
+    try:
+        with pytest.raises(ValueError, match="not available"):
+            get_parser_backend("lxml")
+        assert isinstance(get_parser_backend("auto"), StdlibBackend)
+    finally:
+        _backend_instance.cache_clear()
@@ -0,0 +1,73 @@
+import pstats
+
+import pytest
+from conftest import manifest, workflow_xaml
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.parser import parse_project
+from app.profiling import RequestProfiler
+
+XAML = workflow_xaml('<ui:Click DisplayName="Login" />')
+
+FILES = manifest({"Main.xaml": XAML})
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROFILING_TOKEN", "secret")
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    return TestClient(app)
+
+
+def _ingest(client, token):
+    return client.post(
+        "/api/workflows/ingest", json={"files": FILES}, headers={"X-Profile-Token": token}
+    )
+
+
+def test_profiling_requires_the_admin_token(client, monkeypatch):
+    assert _ingest(client, "wrong").status_code == 403
+
+    monkeypatch.delenv("PROFILING_TOKEN")
+    assert _ingest(client, "secret").status_code == 403
+
+    # Requests without the header are not affected
+    plain = client.post("/api/workflows/ingest", json={"files": FILES})
+    assert plain.status_code == 200 and "X-Profile-Id" not in plain.headers
+
+
+def test_profiled_request_stores_report_and_pstats(client, tmp_path):
+    response = _ingest(client, "secret")
+
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    headers = {"X-Profile-Token": "secret"}
+
+    report = client.get(f"/api/profiles/{profile_id}", headers=headers).json()
+    assert [stage["stage"] for stage in report["stages"]] == ["parse", "llm", "render"]
+    assert all(stage["peak_bytes"] >= 0 for stage in report["stages"])
+    [slowest] = report["slowest_files"]
+    assert slowest["path"] == "Main.xaml" and slowest["elements"] == 3
+    assert report["top_functions"]
+
+    raw = client.get(f"/api/profiles/{profile_id}/pstats", headers=headers)
+    assert raw.status_code == 200
+    (tmp_path / "copy.pstats").write_bytes(raw.content)
+    assert pstats.Stats(str(tmp_path / "copy.pstats")).total_calls > 0
+
+    assert client.get(f"/api/profiles/{profile_id}").status_code == 403
+    assert client.get("/api/profiles/../secret", headers=headers).status_code == 404
+    assert client.get(f"/api/profiles/{'0' * 32}", headers=headers).status_code == 404
+
+
+def test_slowest_files_take_element_counts_from_the_parse(tmp_path):
+    (tmp_path / "Main.xaml").write_text(XAML, encoding="utf-8")
+    (tmp_path / "Broken.xaml").write_text("<Activity><Sequence>", encoding="utf-8")
+    profiler = RequestProfiler()
+    workflows = parse_project(tmp_path, timings=profiler.file_timings)
+    profiler.file_timings.update({"Main.xaml": 0.2, "Broken.xaml": 0.1})
+
+    profiler.record_files(tmp_path, workflows)
+
+    counts = [(entry["path"], entry["elements"]) for entry in profiler.slowest_files]
+    assert counts == [("Main.xaml", 3), ("Broken.xaml", None)]
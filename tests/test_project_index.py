@@ -0,0 +1,85 @@
+from conftest import manifest, workflow_xaml
+from fastapi.testclient import TestClient
+
+from app.index import ProjectIndex
+from app.main import app
+from app.parser import WorkflowData
+
+MAIN_XAML = """<?xml version="1.0" encoding="utf-8"?>
+<Activity xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities" xmlns:ui="http://schemas.uipath.com/workflow/activities" xmlns:s="clr-namespace:System;assembly=mscorlib">
+  <Sequence DisplayName="Main Sequence">
+    <ui:TypeInto DisplayName="Type Username" Text="[username]">
+      <ui:TypeInto.Target>
+        <ui:Target Selector="&lt;webctrl id='user' tag='INPUT' /&gt;" />
+      </ui:TypeInto.Target>
+    </ui:TypeInto>
+    <If DisplayName="Needs Mail">
+      <If.Condition><s:String>retryCount &gt; 3</s:String></If.Condition>
+      <If.Then>
+        <ui:InvokeWorkflowFile DisplayName="Send" WorkflowFileName="Framework\\SendEmail.xaml" />
+      </If.Then>
+    </If>
+  </Sequence>
+</Activity>
+"""
+
+MAIL_XAML = workflow_xaml(
+    '<ui:InvokeWorkflowFile DisplayName="Log" WorkflowFileName="Log.xaml" />', name="Mail"
+)
+
+
+def _ingest(client, project_id):
+    sources = {"Main.xaml": MAIN_XAML, "Framework/SendEmail.xaml": MAIL_XAML}
+    payload = {"files": manifest(sources), "config": {"project_id": project_id}}
+    response = client.post("/api/workflows/ingest", json=payload)
+    assert response.status_code == 200
+
+
+def test_ingest_builds_queryable_project_index(tmp_path, monkeypatch):
+    index = ProjectIndex(tmp_path / "index.sqlite3")
+    monkeypatch.setattr("app.main.get_project_index", lambda: index)
+    client = TestClient(app)
+    _ingest(client, "demo")
+
+    projects = client.get("/api/projects").json()
+    assert [p["project_id"] for p in projects] == ["demo"]
+    assert projects[0]["workflow_count"] == 2
+
+    invokers = client.get(
+        "/api/projects/demo/invocations", params={"target": "sendemail.xaml"}
+    ).json()
+    assert invokers == [{"caller": "Main.xaml", "target": "Framework\\SendEmail.xaml"}]
+
+    typed = client.get(
+        "/api/projects/demo/activities",
+        params={"type": "TypeInto", "selector": "id='user'"},
+    ).json()
+    assert len(typed) == 1
+    assert typed[0]["display_name"] == "Type Username"
+    assert typed[0]["detail"] == "[username]"
+
+    found = client.get("/api/projects/demo/expressions", params={"q": "RETRYCOUNT"}).json()
+    assert found == [
+        {
+            "workflow": "Main.xaml",
+            "activity_type": "If",
+            "display_name": "Needs Mail",
+            "kind": "detail",
+            "text": "retryCount > 3",
+        }
+    ]
+
+    assert client.get(
+        "/api/projects/missing/invocations", params={"target": "x"}
+    ).status_code == 404
+
+
+def test_reindexing_replaces_project_rows(tmp_path):
+    index = ProjectIndex(tmp_path / "index.sqlite3")
+    first = {"A.xaml": WorkflowData("A.xaml", "A", ["B.xaml"], [])}
+    second = {"A.xaml": WorkflowData("A.xaml", "A", ["C.xaml"], [])}
+    index.add_project("p", first)
+    index.add_project("p", second)
+
+    assert index.find_invokers("p", "B.xaml") == []
+    assert index.find_invokers("p", "C.xaml") == [{"caller": "A.xaml", "target": "C.xaml"}]
@@ -0,0 +1,92 @@
+import pytest
+from conftest import manifest, workflow_xaml
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.settings import ConfigError, Settings, get_settings, load_config
+
+FILES = manifest({"Main.xaml": workflow_xaml()})
+
+
+def test_settings_are_read_once(monkeypatch):
+    monkeypatch.setenv("LLM_MODEL", "first")
+    settings = get_settings()
+
+    monkeypatch.setenv("LLM_MODEL", "second")
+
+    assert get_settings() is settings
+    assert load_config(None)["model"] == "first"
+    # Overrides are merged into a copy, never into the shared defaults
+    assert load_config({"model": "override"})["model"] == "override"
+    assert settings.defaults["model"] == "first"
+
+
+@pytest.mark.parametrize(
+    "config, message",
+    [
+        ({"format": "pdf"}, "Unknown format: pdf"),
+        ({"format": ["json", 3]}, "format must be a string or a list of strings"),
+        ({"use_llm": "yes"}, "use_llm must be a boolean"),
+        ({"max_prompt_chars": "100"}, "max_prompt_chars must be a positive integer"),
+        ({"llm_concurrency": 1000}, "llm_concurrency must be at most 32"),
+        ({"parser_backend": "sax"}, "Unknown parser backend: sax"),
+        ({"detail": "verbose"}, "detail profile"),
+        ({"max_components": -1}, "max_components must be a non-negative integer"),
+        ({"fromat": "json", "modle": "x"}, "Unknown config keys: fromat, modle"),
+        ("{not json", "config is not valid JSON"),
+        ("[1, 2]", "config must be a JSON object"),
+    ],
+)
+def test_invalid_config_is_rejected(config, message):
+    with pytest.raises(ConfigError, match=message):
+        load_config(config)
+
+
+def test_valid_config_drops_unset_values():
+    cfg = Settings().resolve({"format": "json,html", "use_llm": True, "model": None})
+
+    assert cfg == {"format": "json,html", "use_llm": True, "base_url": "https://api.openai.com/v1"}
+
+
+def test_invalid_environment_fails_at_startup(monkeypatch):
+    monkeypatch.setenv("OUTPUT_FORMAT", "docx")
+    with pytest.raises(ConfigError, match="Unknown format"):
+        Settings.from_env()
+
+    monkeypatch.delenv("OUTPUT_FORMAT")
+    monkeypatch.setenv("LLM_CONCURRENCY", "many")
+    with pytest.raises(ConfigError, match="LLM_CONCURRENCY must be an integer"):
+        Settings.from_env()
+
+
+@pytest.mark.parametrize(
+    "name, value, message",
+    [
+        ("ARCHIVE_MAX_UPLOAD_BYTES", "lots", "ARCHIVE_MAX_UPLOAD_BYTES must be an integer"),
+        ("CACHE_MAX_ENTRIES", "1e3", "CACHE_MAX_ENTRIES must be an integer"),
+        ("CACHE_TTL_RENDER", "soon", "CACHE_TTL_RENDER must be a number"),
+        ("CACHE_BACKEND", "memcached", "CACHE_BACKEND must be one of"),
+        ("PARSE_WORKERS", "-1", "PARSE_WORKERS must be at least 0"),
+    ],
+)
+def test_invalid_performance_settings_name_the_variable(monkeypatch, name, value, message):
+    monkeypatch.setenv(name, value)
+
+    with pytest.raises(ConfigError, match=message):
+        Settings.from_env()
+
+
+def test_endpoints_return_400_for_bad_config():
+    client = TestClient(app)
+
+    ingest = client.post(
+        "/api/workflows/ingest", json={"files": FILES, "config": {"format": "pdf"}}
+    )
+    upload = client.post(
+        "/analyze/upload/",
+        files={"file": ("project.zip", b"not read", "application/zip")},
+        data={"config": "{broken"},
+    )
+
+    assert ingest.status_code == 400 and "Unknown format: pdf" in ingest.json()["detail"]
+    assert upload.status_code == 400 and "not valid JSON" in upload.json()["detail"]
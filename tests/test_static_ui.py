@@ -0,0 +1,97 @@
+import gzip
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.static_ui import (
+    IMMUTABLE_CACHE,
+    REVALIDATE_CACHE,
+    StaticManifest,
+    register_spa_routes,
+)
+
+APP_JS = "console.log('hello from the bundle');\n" * 50
+
+
+def _client(tmp_path: Path) -> TestClient:
+    dist = tmp_path / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / "index.html").write_text("<!DOCTYPE html><div id=root></div>", encoding="utf-8")
+    (dist / "assets" / "index-abc123.js").write_text(APP_JS, encoding="utf-8")
+    (dist / "favicon.png").write_bytes(b"\x89PNG" + bytes(200))
+
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    def ping():
+        return {"ok": True}
+
+    register_spa_routes(app, dist)
+    return TestClient(app)
+
+
+def test_hashed_assets_are_immutable_and_compressed(tmp_path):
+    client = _client(tmp_path)
+
+    response = client.get("/assets/index-abc123.js", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == APP_JS
+
+    plain = client.get("/assets/index-abc123.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.text == APP_JS
+    assert response.headers["etag"] == f"W/{plain.headers['etag']}"
+    assert not plain.headers["etag"].startswith("W/")
+
+    revalidated = client.get(
+        "/assets/index-abc123.js",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == response.headers["etag"]
+
+
+def test_prebuilt_variants_are_preferred(tmp_path):
+    dist = tmp_path / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / "assets" / "app-1.js").write_text(APP_JS, encoding="utf-8")
+    prebuilt = gzip.compress(APP_JS.encode(), compresslevel=1, mtime=1)
+    (dist / "assets" / "app-1.js.gz").write_bytes(prebuilt)
+
+    manifest = StaticManifest(dist)
+
+    assert set(manifest.assets) == {"assets/app-1.js"}
+    assert manifest.assets["assets/app-1.js"].variants["gzip"] == prebuilt
+    assert manifest.index is None
+
+
+def test_spa_routes_fall_back_to_index_and_revalidate(tmp_path):
+    client = _client(tmp_path)
+
+    response = client.get("/projects/42")
+    assert response.status_code == 200
+    assert "id=root" in response.text
+    assert response.headers["cache-control"] == REVALIDATE_CACHE
+
+    cached = client.get("/", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_binary_files_are_not_recompressed_and_api_paths_are_untouched(tmp_path):
+    client = _client(tmp_path)
+
+    icon = client.get("/favicon.png", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in icon.headers
+    assert icon.headers["content-type"] == "image/png"
+
+    assert client.get("/api/ping").json() == {"ok": True}
+    assert client.get("/api/missing").status_code == 404
+    assert client.get("/assets/index-stale.js").status_code == 404
+    # Only files in the manifest are served, so traversal gets the SPA shell
+    assert "id=root" in client.get("/%2e%2e/%2e%2e/etc/passwd").text
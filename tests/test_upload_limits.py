@@ -0,0 +1,106 @@
+from io import BytesIO
+from zipfile import ZIP_DEFLATED, ZipFile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.parser import ArchiveLimitError, ArchiveLimits, safe_extract_archive
+
+XAML = (
+    '<Activity xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities">'
+    '<Sequence DisplayName="Main" /></Activity>'
+)
+
+
+def _zip(members):
+    buf = BytesIO()
+    with ZipFile(buf, "w", ZIP_DEFLATED) as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+    return buf.getvalue()
+
+
+def test_extract_rejects_too_many_members(tmp_path):
+    archive = tmp_path / "many.zip"
+    archive.write_bytes(_zip({f"f{i}.xaml": XAML for i in range(5)}))
+
+    with pytest.raises(ArchiveLimitError):
+        safe_extract_archive(archive, tmp_path / "out", ArchiveLimits(max_members=4))
+    assert not any((tmp_path / "out").iterdir())
+
+
+def test_extract_rejects_compression_bombs(tmp_path):
+    archive = tmp_path / "bomb.zip"
+    archive.write_bytes(_zip({"zeros.bin": b"\0" * (4 * 1024 * 1024)}))
+
+    with pytest.raises(ArchiveLimitError, match="compression ratio"):
+        safe_extract_archive(archive, tmp_path / "out")
+    with pytest.raises(ArchiveLimitError, match="expands beyond"):
+        safe_extract_archive(
+            archive,
+            tmp_path / "out",
+            ArchiveLimits(max_uncompressed_bytes=1024, max_compression_ratio=10**6),
+        )
+
+
+def test_extract_rejects_path_traversal(tmp_path):
+    archive = tmp_path / "evil.zip"
+    archive.write_bytes(_zip({"../escape.xaml": XAML}))
+
+    with pytest.raises(ValueError, match="unsafe"):
+        safe_extract_archive(archive, tmp_path / "out")
+    assert not (tmp_path / "escape.xaml").exists()
+
+
+def test_upload_over_size_limit_is_rejected(monkeypatch):
+    monkeypatch.setattr("app.main.ARCHIVE_LIMITS", ArchiveLimits(max_upload_bytes=64))
+    client = TestClient(app)
+    payload = _zip({"Main.xaml": XAML})
+
+    response = client.post(
+        "/analyze/upload/", files={"file": ("project.zip", payload, "application/zip")}
+    )
+    assert response.status_code == 413
+
+    response = client.post(
+        "/analyze/upload/",
+        content=b"x" * 10,
+        headers={"content-length": str(10**9), "content-type": "application/zip"},
+    )
+    assert response.status_code == 413
+
+
+def test_chunked_upload_is_cut_off_at_the_limit(monkeypatch):
+    monkeypatch.setattr("app.main.ARCHIVE_LIMITS", ArchiveLimits(max_upload_bytes=64))
+    client = TestClient(app)
+    boundary = "limit-test"
+    head = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="project.zip"\r\n'
+        "Content-Type: application/zip\r\n\r\n"
+    ).encode()
+    spooled = []
+
+    async def spool(file, dest):
+        spooled.append(file)
+        return "x"
+
+    monkeypatch.setattr("app.main._spool_upload", spool)
+
+    def chunks():
+        yield head
+        # Far past the multipart allowance, with no Content-Length declared
+        for _ in range(64):
+            yield b"x" * 4096
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        "/analyze/upload/",
+        content=chunks(),
+        headers={"content-type": f"multipart/form-data; boundary={boundary}"},
+    )
+
+    assert response.status_code == 413
+    # Rejected while the multipart body was being parsed, before the endpoint
+    assert spooled == []